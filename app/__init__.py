@@ -2,33 +2,78 @@ from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
 from flask_mail import Mail
-from flask_migrate import Migrate
 from flask_wtf.csrf import CSRFProtect
+import click
 from config import Config
 import os
 
 db = SQLAlchemy()
 login_manager = LoginManager()
 mail = Mail()
-migrate = Migrate()
 csrf = CSRFProtect()
 
+def init_migrate(app):
+    """Set up Flask-Migrate only for `flask` CLI commands; importing alembic slows worker start-up"""
+    if click.get_current_context(silent=True) is None:
+        return None
+    from flask_migrate import Migrate
+    return Migrate(app, db)
+
 def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
     
+    # Jinja bytecode cache (configured before anything touches app.jinja_env)
+    from app import templating
+    templating.init_app(app)
+    
     # Initialize extensions
+    from app.database import apply_engine_options, register_pragmas
+    apply_engine_options(app)
     db.init_app(app)
+    register_pragmas(app, db)
     login_manager.init_app(app)
     mail.init_app(app)
-    migrate.init_app(app, db)
+    init_migrate(app)
     csrf.init_app(app)
     
+    # Opt-in per-request profiling (Server-Timing headers, slow request/query log)
+    from app import profiling
+    profiling.init_app(app, db)
+    
+    # Prometheus metrics on /metrics (requires prometheus_client)
+    from app import metrics
+    metrics.init_app(app, db)
+    
     # Configure login manager
     login_manager.login_view = 'auth.login'
     login_manager.login_message = 'Please log in to access this page.'
     login_manager.login_message_category = 'info'
     
+    # Cache user snapshots for the Flask-Login user loader
+    from app.services.user_cache import user_cache
+    user_cache.init_app(app)
+    
+    # Full-page cache for anonymous listing/home views
+    from app.services.page_cache import page_cache
+    page_cache.init_app(app)
+    
+    # Buffered Property.favorite_count updates
+    from app.services.favorite_counts import favorite_counts
+    favorite_counts.init_app(app)
+    
+    # In-memory "similar listings" index (built lazily per worker)
+    from app.services.similar_listings import similar_listings
+    similar_listings.init_app(app)
+    
+    # Amenity tags decoded from Property.amenity_mask in templates
+    from app.services import amenities
+    amenities.init_app(app)
+    
+    # Location/title autocomplete tries (built lazily per worker)
+    from app.services.autocomplete import autocomplete
+    autocomplete.init_app(app)
+    
     # Create upload directory
     upload_dir = os.path.join(app.instance_path, 'uploads')
     os.makedirs(upload_dir, exist_ok=True)
@@ -49,6 +94,22 @@ def create_app(config_class=Config):
     from app.routes.customer import bp as customer_bp
     app.register_blueprint(customer_bp, url_prefix='/customer')
     
+    # Maintenance CLI commands
+    from app import commands
+    commands.init_app(app)
+    
+    # gzip/brotli for text responses
+    from app import compression
+    compression.init_app(app)
+    
+    # Fingerprinted static assets (asset_url() in templates)
+    from app import assets
+    assets.init_app(app)
+    
+    # Optionally compile all templates before the worker accepts traffic
+    if app.config.get('TEMPLATE_PRELOAD'):
+        templating.preload_templates(app)
+    
     return app
 
 from app import models
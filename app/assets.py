@@ -0,0 +1,296 @@
+"""
+Fingerprinted static assets.
+
+`python build_assets.py` minifies the files in ASSET_SOURCES, writes them to
+app/static/dist/ under a content-hashed name with .gz (and .br when the
+brotli package is installed) siblings, and records the mapping in
+dist/manifest.json. Templates link assets through asset_url(), which
+resolves to the hashed file when a manifest exists and to the plain static
+file otherwise. Hashed files are served with the best precompressed variant
+the client accepts and an immutable one-year Cache-Control.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+
+from flask import request, send_from_directory, url_for
+
+ASSET_SOURCES = ['css/style.css', 'js/main.js', 'js/favorites.js', 'js/autocomplete.js', 'js/admin_gallery.js']
+DIST_DIR = 'dist'
+MANIFEST_NAME = 'manifest.json'
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+# Preferred first
+PRECOMPRESSED = [('br', '.br'), ('gzip', '.gz')]
+
+
+CSS_STRING = r'"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\''
+# At-rules whose block holds rules rather than declarations
+NESTING_AT_RULES = {'media', 'supports', 'document', 'container', 'layer', 'scope', 'keyframes',
+                    '-webkit-keyframes', '-moz-keyframes'}
+
+
+def minify_css(text):
+    """Strip comments and collapse whitespace outside strings (around : only inside declaration blocks)"""
+    text = re.sub(rf'({CSS_STRING})|/\*.*?\*/', lambda m: m.group(1) or '', text, flags=re.S)
+    out = []
+    blocks = []  # per open {: True when it holds declarations
+    statement = 0  # where the current selector or at-rule prelude starts
+    for m in re.finditer(rf'({CSS_STRING})|([{{}}])|([^"\'{{}}]+|["\'])', text):
+        string, brace, chunk = m.groups()
+        if string:
+            out.append(string)
+        elif brace == '{':
+            prelude = text[statement:m.start()].rsplit(';', 1)[-1].strip()
+            at_rule = re.match(r'@([\w-]+)', prelude)
+            blocks.append(not (at_rule and at_rule.group(1).lower() in NESTING_AT_RULES))
+            out.append(brace)
+            statement = m.end()
+        elif brace == '}':
+            if out and out[-1].endswith(';') and not re.fullmatch(CSS_STRING, out[-1]):
+                out[-1] = out[-1][:-1]
+            if blocks:
+                blocks.pop()
+            out.append(brace)
+            statement = m.end()
+        else:
+            chunk = re.sub(r'\s+', ' ', chunk)
+            chunk = re.sub(r'\s*([;,>])\s*', r'\1', chunk)
+            if blocks and blocks[-1]:
+                chunk = re.sub(r'\s*:\s*', ':', chunk)
+            if m.start() == 0 or text[m.start() - 1] in '{}':
+                chunk = chunk.lstrip()
+            if text[m.end():m.end() + 1] in ('', '{', '}'):
+                chunk = chunk.rstrip()
+            out.append(chunk)
+    return ''.join(out).strip()
+
+
+# A / after one of these (or at the start) begins a regex literal, not a division.
+# After } it could be either (block vs object literal), so such files are left unminified.
+REGEX_PRECEDERS = set('(,=:[!&|?{;+-*%<>~^')
+REGEX_KEYWORDS = {'return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'new', 'delete', 'void', 'throw',
+                  'instanceof', 'yield', 'await'}
+
+
+def minify_js(text):
+    """Drop comments, indentation and blank lines (line breaks are kept, so ASI is unaffected)
+
+    Strings, regex literals and template literals are copied verbatim, so comment markers inside them
+    are left alone and the lines of a multi-line template keep their whitespace. Source the scanner
+    cannot follow (an ambiguous /, an unterminated literal) is returned unminified.
+    """
+    try:
+        return _strip_js(text)
+    except ValueError:
+        return text
+
+
+def _strip_js(text):
+    lines = []
+    line = []
+    verbatim = False  # the current line started inside a template literal
+    braces = []  # open { count per ${ expression being scanned
+    last = ''  # last significant code character, for the regex/division decision
+    i, n = 0, len(text)
+
+    def end_line(keep):
+        nonlocal line, verbatim
+        code = ''.join(line)
+        if not verbatim:
+            code = code.lstrip()
+        if not keep:
+            code = code.rstrip()  # whitespace at the end of a template line is part of the string
+        if code or verbatim or keep:
+            lines.append(code)
+        line = []
+        verbatim = keep
+
+    def starts_regex():
+        code = ''.join(line).rstrip()
+        if last in '+-' and code.endswith(last * 2):
+            return False  # x++ / 2
+        if last == '}':
+            raise ValueError('Ambiguous / after }')
+        if not last or last in REGEX_PRECEDERS:
+            return True
+        word = re.search(r'[\w$]+$', code)
+        return word is not None and word.group() in REGEX_KEYWORDS
+
+    def scan_template(i):
+        """Copy template text from i; returns the index after the closing ` or the ${"""
+        while i < n:
+            ch = text[i]
+            if ch == '\\':
+                line.append(text[i:i + 2])
+                i += 2
+            elif ch == '`':
+                line.append(ch)
+                return i + 1
+            elif text.startswith('${', i):
+                line.append('${')
+                braces.append(0)
+                return i + 2
+            elif ch == '\n':
+                end_line(keep=True)
+                i += 1
+            else:
+                line.append(ch)
+                i += 1
+        raise ValueError('Unterminated template literal')
+
+    while i < n:
+        ch = text[i]
+        if ch == '\n':
+            end_line(keep=False)
+            i += 1
+        elif text.startswith('//', i):
+            i = text.find('\n', i)
+            i = n if i < 0 else i
+        elif text.startswith('/*', i):
+            end = text.find('*/', i + 2)
+            if end < 0:
+                raise ValueError('Unterminated block comment')
+            if '\n' in text[i:end]:
+                end_line(keep=False)
+            else:
+                line.append(' ')
+            i = end + 2
+        elif ch in '\'"' or (ch == '/' and starts_regex()):
+            # String or regex literal: copy through the closing quote/slash
+            start, in_class = i, False
+            i += 1
+            while i < n and (text[i] != ch or in_class):
+                if text[i] == '\\':
+                    i += 1
+                elif text[i] == '\n':
+                    raise ValueError(f'Unterminated literal at offset {start}')
+                elif ch == '/':
+                    in_class = (in_class or text[i] == '[') and text[i] != ']'
+                i += 1
+            if i >= n:
+                raise ValueError(f'Unterminated literal at offset {start}')
+            line.append(text[start:i + 1])
+            last = ch
+            i += 1
+        elif ch == '`':
+            line.append(ch)
+            i = scan_template(i + 1)
+            last = '`'
+        elif ch == '}' and braces and braces[-1] == 0:
+            braces.pop()
+            line.append(ch)
+            i = scan_template(i + 1)
+            last = '`'
+        else:
+            if braces and ch in '{}':
+                braces[-1] += 1 if ch == '{' else -1
+            if not ch.isspace():
+                last = ch
+            line.append(ch)
+            i += 1
+    end_line(keep=False)
+    return '\n'.join(lines) + '\n'
+
+
+MINIFIERS = {'.css': minify_css, '.js': minify_js}
+
+
+def _write_compressed(path, data):
+    with open(path + '.gz', 'wb') as f:
+        # mtime=0 keeps builds byte-for-byte reproducible
+        with gzip.GzipFile(fileobj=f, mode='wb', compresslevel=9, mtime=0) as gz:
+            gz.write(data)
+    try:
+        import brotli
+    except ImportError:
+        return
+    with open(path + '.br', 'wb') as f:
+        f.write(brotli.compress(data, quality=11))
+
+
+def build(static_folder, sources=None):
+    """Minify, fingerprint and precompress assets into <static>/dist; returns the manifest"""
+    dist = os.path.join(static_folder, DIST_DIR)
+    shutil.rmtree(dist, ignore_errors=True)
+
+    manifest = {}
+    for source in sources or ASSET_SOURCES:
+        source_path = os.path.join(static_folder, source)
+        if not os.path.exists(source_path):
+            continue
+        base, ext = os.path.splitext(source)
+        with open(source_path, encoding='utf-8') as f:
+            text = f.read()
+        minify = MINIFIERS.get(ext)
+        data = (minify(text) if minify else text).encode('utf-8')
+
+        digest = hashlib.sha256(data).hexdigest()[:12]
+        hashed = f'{base}.{digest}{ext}'
+        target = os.path.join(dist, hashed)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, 'wb') as f:
+            f.write(data)
+        _write_compressed(target, data)
+        manifest[source] = hashed
+
+    os.makedirs(dist, exist_ok=True)
+    with open(os.path.join(dist, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def load_manifest(static_folder):
+    try:
+        with open(os.path.join(static_folder, DIST_DIR, MANIFEST_NAME)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def init_app(app):
+    """Register asset_url() and serve fingerprinted files precompressed"""
+    manifest = load_manifest(app.static_folder)
+    app.extensions['asset_manifest'] = manifest
+
+    def asset_url(filename):
+        hashed = manifest.get(filename)
+        if hashed:
+            return url_for('static', filename=f'{DIST_DIR}/{hashed}')
+        return url_for('static', filename=filename)
+
+    app.add_template_global(asset_url)
+
+    default_static = app.view_functions['static']
+    hashed_files = {f'{DIST_DIR}/{hashed}' for hashed in manifest.values()}
+
+    def static(filename):
+        if filename not in hashed_files:
+            return default_static(filename=filename)
+
+        directory = app.static_folder
+        response = None
+        for encoding, suffix in PRECOMPRESSED:
+            if request.accept_encodings.quality(encoding) > 0 and \
+                    os.path.exists(os.path.join(directory, filename + suffix)):
+                response = send_from_directory(directory, filename + suffix,
+                                               mimetype=_mimetype(filename), max_age=IMMUTABLE_MAX_AGE)
+                response.headers['Content-Encoding'] = encoding
+                break
+        if response is None:
+            response = send_from_directory(directory, filename, max_age=IMMUTABLE_MAX_AGE)
+
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        response.vary.add('Accept-Encoding')
+        return response
+
+    app.view_functions['static'] = static
+
+
+def _mimetype(filename):
+    return {'.css': 'text/css', '.js': 'text/javascript'}.get(os.path.splitext(filename)[1])
@@ -0,0 +1,90 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+
+# Optional Redis import (only needed for a shared cache backend)
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+
+class LocalCache:
+    """Per-process TTL cache with LRU eviction"""
+
+    def __init__(self, default_ttl=300, max_size=10000):
+        self.default_ttl = default_ttl
+        self.max_size = max_size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + (ttl or self.default_ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def incr(self, key):
+        with self._lock:
+            expires_at, value = self._data.get(key, (float('inf'), 0))
+            self._data[key] = (expires_at, value + 1)
+            return value + 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class RedisCache:
+    """Shared cache backend so every worker sees the same entries and invalidations"""
+
+    def __init__(self, url, prefix='settle_space:', default_ttl=300):
+        if not REDIS_AVAILABLE:
+            raise RuntimeError('redis package is not installed')
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self.default_ttl = default_ttl
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl=None):
+        self.client.setex(self.prefix + key, int(ttl or self.default_ttl), json.dumps(value))
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def incr(self, key):
+        return self.client.incr(self.prefix + key)
+
+    def clear(self):
+        for key in self.client.scan_iter(self.prefix + '*'):
+            self.client.delete(key)
+
+
+def make_cache(redis_url=None, prefix='settle_space:', default_ttl=300, max_size=10000):
+    """Build a shared Redis cache when a URL is configured, otherwise a per-process one"""
+    if redis_url:
+        return RedisCache(redis_url, prefix=prefix, default_ttl=default_ttl)
+    return LocalCache(default_ttl=default_ttl, max_size=max_size)
@@ -0,0 +1,109 @@
+"""Maintenance commands (run with `flask --app run <command>`)"""
+
+import time
+
+import click
+from flask.cli import with_appcontext
+
+
+def init_app(app):
+    app.cli.add_command(reconcile_favorite_counts)
+    app.cli.add_command(reconcile_unread_inquiries)
+    app.cli.add_command(send_inquiry_digests)
+    app.cli.add_command(rebuild_price_rollups)
+    app.cli.add_command(backfill_listing_costs)
+    app.cli.add_command(index_image_hashes)
+
+
+@click.command('reconcile-favorite-counts')
+@click.option('--batch-size', default=1000, show_default=True, help='Properties recounted per transaction')
+@click.option('--every', type=float, default=None, help='Keep running, reconciling every N seconds')
+@with_appcontext
+def reconcile_favorite_counts(batch_size, every):
+    """Recount Property.favorite_count from the favorite table and fix drift"""
+    from app.services.favorite_counts import favorite_counts, reconcile
+
+    while True:
+        favorite_counts.flush()
+        started = time.perf_counter()
+        fixed = reconcile(batch_size=batch_size)
+        click.echo(f'Reconciled favorite counts: {fixed} properties fixed in {time.perf_counter() - started:.2f}s')
+        if every is None:
+            break
+        time.sleep(every)
+
+
+@click.command('reconcile-unread-inquiries')
+@click.option('--batch-size', default=1000, show_default=True, help='Sellers recounted per transaction')
+@with_appcontext
+def reconcile_unread_inquiries(batch_size):
+    """Recount User.unread_inquiry_count for sellers and fix drift"""
+    from app.services.inquiries import recount_unread
+    from app.services.user_cache import user_cache
+
+    fixed = recount_unread(batch_size=batch_size)
+    for user_id in fixed:
+        user_cache.invalidate(user_id)
+    click.echo(f'Reconciled unread inquiry counters: {len(fixed)} sellers fixed')
+
+
+@click.command('send-inquiry-digests')
+@click.option('--batch-size', type=int, default=None, help='Inquiries per SMTP session [INQUIRY_DIGEST_BATCH_SIZE]')
+@click.option('--every', type=float, default=None,
+              help='Keep running, sending every N seconds (0 = INQUIRY_DIGEST_INTERVAL)')
+@with_appcontext
+def send_inquiry_digests(batch_size, every):
+    """Email each seller one digest of their new inquiries"""
+    from flask import current_app
+    from app.services.inquiry_digest import send_pending_digests
+
+    if every == 0:
+        every = current_app.config['INQUIRY_DIGEST_INTERVAL']
+    while True:
+        started = time.perf_counter()
+        totals = send_pending_digests(batch_size=batch_size)
+        click.echo(f"Sent {totals['digests']} digests covering {totals['inquiries']} inquiries "
+                   f"in {totals['batches']} batches ({time.perf_counter() - started:.2f}s)")
+        if every is None:
+            break
+        time.sleep(every)
+
+
+@click.command('rebuild-price-rollups')
+@with_appcontext
+def rebuild_price_rollups():
+    """Recompute every PriceRollup group from the approved listings"""
+    from app.services.price_rollups import rebuild
+
+    groups, listings, seconds = rebuild()
+    click.echo(f'Rebuilt price rollups: {groups} groups from {listings} approved listings in {seconds:.2f}s')
+
+
+@click.command('backfill-listing-costs')
+@click.option('--batch-size', default=1000, show_default=True, help='Properties updated per transaction')
+@click.option('--all', 'recompute_all', is_flag=True, help='Recompute every listing, not only those missing costs')
+@with_appcontext
+def backfill_listing_costs(batch_size, recompute_all):
+    """Fill Property.monthly_cost/upfront_cost (use --all after changing the loan assumptions)"""
+    from app.services.listing_costs import backfill
+    from app.services.page_cache import page_cache, LISTINGS_TAG
+
+    started = time.perf_counter()
+    written = backfill(batch_size=batch_size, missing_only=not recompute_all)
+    click.echo(f'Backfilled listing costs: {written} properties in {time.perf_counter() - started:.2f}s')
+    if written and not page_cache.invalidate(LISTINGS_TAG):
+        click.echo(f'Page cache not invalidated (PAGE_CACHE_REDIS_URL is not set); running servers show the old '
+                   f'listing pages for up to {page_cache.ttl}s')
+
+
+@click.command('index-image-hashes')
+@click.option('--batch-size', default=200, show_default=True, help='Uploads hashed per transaction')
+@with_appcontext
+def index_image_hashes(batch_size):
+    """Hash listing photos and payment screenshots uploaded before duplicate detection existed"""
+    from app.services.duplicate_images import index_missing
+
+    started = time.perf_counter()
+    hashed, unreadable = index_missing(batch_size=batch_size)
+    click.echo(f'Indexed image hashes: {hashed} uploads, {unreadable} missing or unreadable files '
+               f'in {time.perf_counter() - started:.2f}s')
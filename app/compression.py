@@ -0,0 +1,108 @@
+"""
+gzip/brotli compression of HTML, JSON and other text responses.
+
+Runs as an after_request hook. Buffered bodies are compressed in one go when
+they are at least COMPRESS_MIN_SIZE bytes. Streamed bodies (generators,
+send_file) are compressed chunk by chunk with a sync flush, so clients still
+receive data as it is produced. Responses that already carry a
+Content-Encoding, partial content, and types outside COMPRESS_MIMETYPES
+(images, PDFs, ...) are left alone. brotli is used when the package is
+installed and the client prefers it.
+
+A compressed response gets its own ETag (<tag>-gzip, <tag>-br) and is
+revalidated here, so a client sending that tag back gets a 304.
+"""
+
+import zlib
+
+from flask import request
+
+# Optional brotli support
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+
+def make_compressor(encoding, level):
+    """Return (compress_chunk, finish) callables for one response body"""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=level)
+        return (lambda chunk: compressor.process(chunk) + compressor.flush()), compressor.finish
+
+    # wbits=31 writes a gzip header and trailer
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return (lambda chunk: compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)), compressor.flush
+
+
+def compress(data, encoding='gzip', level=6):
+    """Compress a whole body"""
+    if encoding == 'br':
+        return brotli.compress(data, quality=level)
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return compressor.compress(data) + compressor.flush()
+
+
+def choose_encoding(accept_encodings):
+    if BROTLI_AVAILABLE and accept_encodings.quality('br') > 0:
+        return 'br'
+    if accept_encodings.quality('gzip') > 0:
+        return 'gzip'
+    return None
+
+
+def _stream(iterable, compress_chunk, finish):
+    try:
+        for chunk in iterable:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            if chunk:
+                yield compress_chunk(chunk)
+        yield finish()
+    finally:
+        if hasattr(iterable, 'close'):
+            iterable.close()
+
+
+def init_app(app):
+    """Register the compression hook"""
+    if not app.config.get('COMPRESS_ENABLED', True):
+        return
+
+    mimetypes = set(app.config['COMPRESS_MIMETYPES'])
+    min_size = app.config['COMPRESS_MIN_SIZE']
+    levels = {'gzip': app.config['COMPRESS_LEVEL'], 'br': app.config['COMPRESS_BR_LEVEL']}
+
+    @app.after_request
+    def compress_response(response):
+        if response.mimetype not in mimetypes:
+            return response
+        response.vary.add('Accept-Encoding')
+
+        if (response.status_code < 200 or response.status_code in (204, 206, 304)
+                or 'Content-Encoding' in response.headers):
+            return response
+        encoding = choose_encoding(request.accept_encodings)
+        if encoding is None:
+            return response
+
+        if response.is_streamed or response.direct_passthrough:
+            compress_chunk, finish = make_compressor(encoding, levels[encoding])
+            response.response = _stream(response.response, compress_chunk, finish)
+            response.direct_passthrough = False
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < min_size:
+                return response
+            response.set_data(compress(data, encoding, levels[encoding]))
+
+        response.headers['Content-Encoding'] = encoding
+        # The compressed body is a different representation, so give it its own validator
+        etag, weak = response.get_etag()
+        if etag:
+            response.set_etag(f'{etag}-{encoding}', weak=weak)
+            # The view compared If-None-Match with the bare tag; revalidate against the one the client holds
+            response.make_conditional(request)
+        return response
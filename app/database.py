@@ -0,0 +1,77 @@
+from sqlalchemy import event
+
+# Engine profiles for file-backed SQLite databases. The default profile keeps
+# SQLAlchemy's own settings; the production profile switches to WAL so readers
+# never block on a writer and waits on locks instead of failing immediately.
+SQLITE_PROFILES = {
+    'default': {
+        'pragmas': {},
+        'engine_options': {}
+    },
+    'production': {
+        'pragmas': {
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'busy_timeout': 5000,  # ms
+            'mmap_size': 268435456,  # 256MB
+            'cache_size': -64000,  # 64MB (negative = KiB)
+            'temp_store': 'MEMORY'
+        },
+        'engine_options': {
+            'pool_size': 10,
+            'max_overflow': 20,
+            'pool_timeout': 30,
+            'pool_pre_ping': True,
+            'connect_args': {'timeout': 5}
+        }
+    }
+}
+
+
+def is_file_sqlite(uri):
+    return uri.startswith('sqlite') and ':memory:' not in uri and uri.rstrip('/') != 'sqlite:'
+
+
+def get_sqlite_profile(app):
+    """Return the configured SQLite profile, or None when it does not apply"""
+    if not is_file_sqlite(app.config.get('SQLALCHEMY_DATABASE_URI', '')):
+        return None
+    name = app.config.get('SQLITE_PROFILE') or 'default'
+    if name not in SQLITE_PROFILES:
+        raise ValueError(f"Unknown SQLITE_PROFILE '{name}'")
+    return SQLITE_PROFILES[name]
+
+
+def apply_engine_options(app):
+    """Merge the profile's pool settings into SQLALCHEMY_ENGINE_OPTIONS (before db.init_app)"""
+    profile = get_sqlite_profile(app)
+    if not profile:
+        return
+    options = dict(profile['engine_options'])
+    options.update(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+
+def set_sqlite_pragmas(dbapi_connection, pragmas):
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+    finally:
+        cursor.close()
+
+
+def register_pragmas(app, db):
+    """Apply the profile's PRAGMAs to every new connection (after db.init_app)"""
+    profile = get_sqlite_profile(app)
+    if not profile or not profile['pragmas']:
+        return
+    pragmas = dict(profile['pragmas'])
+    pragmas.update(app.config.get('SQLITE_PRAGMAS') or {})
+
+    with app.app_context():
+        engine = db.engine
+
+    @event.listens_for(engine, 'connect')
+    def on_connect(dbapi_connection, connection_record):
+        set_sqlite_pragmas(dbapi_connection, pragmas)
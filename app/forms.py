@@ -272,6 +272,8 @@ class SearchForm(FlaskForm):
     location = StringField('Location')
     min_price = IntegerField('Min Price (₹)', validators=[Optional(), NumberRange(min=0)])
     max_price = IntegerField('Max Price (₹)', validators=[Optional(), NumberRange(min=0)])
+    max_monthly_cost = IntegerField('Max Monthly (₹)', validators=[Optional(), NumberRange(min=0)])
+    max_upfront_cost = IntegerField('Max Upfront (₹)', validators=[Optional(), NumberRange(min=0)])
     property_type = SelectField('Property Type', choices=[
         ('', 'Any Type'),
         ('apartment', 'Apartment'),
@@ -285,4 +287,11 @@ class SearchForm(FlaskForm):
         ('hostel', 'Hostel')
     ])
     bedrooms = SelectField('Min Bedrooms', choices=[('', 'Any'), ('1', '1+'), ('2', '2+'), ('3', '3+'), ('4', '4+'), ('5', '5+')])
+    sort = SelectField('Sort By', choices=[
+        ('newest', 'Newest First'),
+        ('popular', 'Most Popular'),
+        ('monthly_cost', 'Monthly Cost: Low to High'),
+        ('monthly_cost_desc', 'Monthly Cost: High to Low'),
+        ('upfront_cost', 'Upfront Cost: Low to High')
+    ])
     submit = SubmitField('Search')
\ No newline at end of file
@@ -0,0 +1,136 @@
+"""
+Prometheus metrics for the /metrics endpoint.
+
+Under a multi-worker server (gunicorn etc.) set PROMETHEUS_MULTIPROC_DIR to an
+empty, writable directory before the app is imported. Each worker then
+writes its samples there and /metrics aggregates all workers. The server's
+child-exit hook should call app.metrics.mark_process_dead(worker.pid).
+
+The endpoint exposes endpoint names, latencies, error rates and pool state,
+so it only answers clients in METRICS_ALLOWED_IPS (loopback by default) or
+requests carrying "Authorization: Bearer <METRICS_TOKEN>"; others get 403.
+Behind a reverse proxy, scrape with the token or allow the scraper's address
+as the app sees it.
+"""
+
+import hmac
+import os
+import time
+from contextlib import contextmanager
+
+from flask import Response, abort, g, request
+
+# Optional prometheus_client import
+try:
+    from prometheus_client import (CollectorRegistry, Counter, Gauge, Histogram, REGISTRY,
+                                   CONTENT_TYPE_LATEST, generate_latest, multiprocess)
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+if PROMETHEUS_AVAILABLE:
+    REQUEST_COUNT = Counter(
+        'settle_space_http_requests_total', 'HTTP requests by endpoint',
+        ['endpoint', 'method', 'status'])
+    REQUEST_LATENCY = Histogram(
+        'settle_space_http_request_duration_seconds', 'HTTP request latency by endpoint',
+        ['endpoint', 'method'], buckets=LATENCY_BUCKETS)
+    EXTERNAL_LATENCY = Histogram(
+        'settle_space_external_call_duration_seconds', 'Mail/SMS provider call latency',
+        ['service'], buckets=LATENCY_BUCKETS)
+    EXTERNAL_ERRORS = Counter(
+        'settle_space_external_call_errors_total', 'Failed mail/SMS provider calls',
+        ['service'])
+    IMAGE_PROCESSING = Histogram(
+        'settle_space_image_processing_seconds', 'Time spent processing uploaded images',
+        ['kind'], buckets=LATENCY_BUCKETS)
+    DB_POOL_SIZE = Gauge(
+        'settle_space_db_pool_size', 'Configured connection pool size', multiprocess_mode='livesum')
+    DB_POOL_CHECKED_OUT = Gauge(
+        'settle_space_db_pool_checked_out', 'Connections currently checked out', multiprocess_mode='livesum')
+    DB_POOL_OVERFLOW = Gauge(
+        'settle_space_db_pool_overflow', 'Connections opened beyond the pool size', multiprocess_mode='livesum')
+
+
+def observe_external(service, seconds, failed=False):
+    if not PROMETHEUS_AVAILABLE:
+        return
+    EXTERNAL_LATENCY.labels(service=service).observe(seconds)
+    if failed:
+        EXTERNAL_ERRORS.labels(service=service).inc()
+
+
+@contextmanager
+def track_image_processing(kind):
+    """Time one uploaded image being decoded, resized and saved"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if PROMETHEUS_AVAILABLE:
+            IMAGE_PROCESSING.labels(kind=kind).observe(time.perf_counter() - start)
+
+
+def mark_process_dead(pid):
+    if PROMETHEUS_AVAILABLE and os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        multiprocess.mark_process_dead(pid)
+
+
+def _update_pool_gauges(engine):
+    pool = engine.pool
+    # Only QueuePool exposes sizing; SQLite memory/singleton pools do not
+    if not hasattr(pool, 'checkedout'):
+        return
+    DB_POOL_SIZE.set(pool.size())
+    DB_POOL_CHECKED_OUT.set(pool.checkedout())
+    DB_POOL_OVERFLOW.set(max(pool.overflow(), 0))
+
+
+def _scrape_allowed(app):
+    token = app.config.get('METRICS_TOKEN')
+    if token:
+        scheme, _, supplied = request.headers.get('Authorization', '').partition(' ')
+        if scheme.lower() == 'bearer' and hmac.compare_digest(supplied.strip().encode(), token.encode()):
+            return True
+    return request.remote_addr in app.config.get('METRICS_ALLOWED_IPS', ['127.0.0.1', '::1'])
+
+
+def init_app(app, db):
+    """Record per-endpoint request metrics and expose them on /metrics"""
+    if not PROMETHEUS_AVAILABLE or not app.config.get('METRICS_ENABLED', True):
+        return
+
+    with app.app_context():
+        engine = db.engine
+
+    @app.before_request
+    def start_timer():
+        g._metrics_start = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        start = g.pop('_metrics_start', None)
+        if start is None:
+            return response
+        # Label by blueprint endpoint (not path) to keep label cardinality bounded
+        endpoint = request.endpoint or 'unmatched'
+        if endpoint == 'metrics':
+            return response
+        REQUEST_COUNT.labels(endpoint=endpoint, method=request.method, status=response.status_code).inc()
+        REQUEST_LATENCY.labels(endpoint=endpoint, method=request.method).observe(time.perf_counter() - start)
+        _update_pool_gauges(engine)
+        return response
+
+    def metrics_view():
+        if not _scrape_allowed(app):
+            abort(403)
+        if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        else:
+            registry = REGISTRY
+        return Response(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
+
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
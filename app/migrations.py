@@ -0,0 +1,227 @@
+"""
+Online schema migrations for the SQLite database (run by upgrade_db.py).
+
+A Migration is a named list of steps. It runs once per database, and the
+names of applied migrations are recorded in schema_migration. Steps:
+
+- AddColumn: ALTER TABLE ... ADD COLUMN, skipped when the column exists.
+  SQLite only rewrites the schema for this, so the write lock is held for
+  milliseconds whatever the table size.
+- Execute: idempotent SQL such as CREATE TABLE/INDEX IF NOT EXISTS.
+- Backfill: fills the existing rows of a table in primary-key order.
+  Each batch runs in its own short BEGIN IMMEDIATE transaction.
+
+A backfill only runs when its migration added the column it fills.
+Databases created by db.create_all(), or upgraded by older versions of
+upgrade_db.py, already hold the data. The runner saves each backfill's
+position in migration_checkpoint, in the same transaction as the batch, so
+an interrupted run resumes from the last committed batch. Between batches
+it sleeps for `pause` seconds so application writers get the lock. It
+halves the batch size whenever a batch holds the lock longer than
+max_batch_seconds.
+"""
+
+import sqlite3
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+MIN_BATCH_SIZE = 50
+
+
+def column_names(cursor, table):
+    cursor.execute(f"PRAGMA table_info({table})")
+    return [column[1] for column in cursor.fetchall()]
+
+
+class AddColumn:
+    def __init__(self, table, column, definition):
+        self.table = table
+        self.column = column
+        self.definition = definition
+
+
+class Execute:
+    """SQL that is safe to repeat; with params it is run once per parameter tuple"""
+
+    def __init__(self, sql, params=None):
+        self.sql = sql
+        self.params = params
+
+
+class Backfill:
+    """Fill existing rows once the migration has added the column when_added = (table, column)
+
+    statement is SQL taking (after_id, up_to_id), or a callable(cursor, after_id, up_to_id).
+    """
+
+    def __init__(self, table, statement, when_added):
+        self.table = table
+        self.statement = statement
+        self.when_added = when_added
+
+    def run(self, cursor, after_id, up_to_id):
+        if callable(self.statement):
+            self.statement(cursor, after_id, up_to_id)
+        else:
+            cursor.execute(self.statement, (after_id, up_to_id))
+
+
+class Migration:
+    def __init__(self, name, description, steps):
+        self.name = name
+        self.description = description
+        self.steps = steps
+
+    def backfills(self):
+        """(checkpoint name, step) for each Backfill"""
+        return [(f'{self.name}:{index}', step) for index, step in enumerate(self.steps) if isinstance(step, Backfill)]
+
+
+class MigrationRunner:
+    """Applies migrations to one SQLite database without holding long write locks"""
+
+    def __init__(self, path, batch_size=1000, pause=0.05, max_batch_seconds=0.25, busy_timeout=30, log=print):
+        self.batch_size = max(batch_size, MIN_BATCH_SIZE)
+        self.pause = pause
+        self.max_batch_seconds = max_batch_seconds
+        self.log = log
+        # Autocommit mode: every transaction below is explicit and short
+        self.conn = sqlite3.connect(path, timeout=busy_timeout, isolation_level=None)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migration (
+                name VARCHAR(100) NOT NULL PRIMARY KEY,
+                applied_at DATETIME NOT NULL
+            )
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS migration_checkpoint (
+                name VARCHAR(150) NOT NULL PRIMARY KEY,
+                last_id INTEGER NOT NULL,
+                rows_done INTEGER NOT NULL,
+                updated_at DATETIME NOT NULL
+            )
+        """)
+
+    def close(self):
+        self.conn.close()
+
+    @contextmanager
+    def transaction(self):
+        """BEGIN IMMEDIATE takes the write lock up front (waiting up to busy_timeout for it)"""
+        cursor = self.conn.cursor()
+        cursor.execute('BEGIN IMMEDIATE')
+        try:
+            yield cursor
+        except BaseException:
+            cursor.execute('ROLLBACK')
+            raise
+        cursor.execute('COMMIT')
+
+    def applied(self):
+        return dict(self.conn.execute("SELECT name, applied_at FROM schema_migration").fetchall())
+
+    def checkpoints(self):
+        return {name: (last_id, rows_done) for name, last_id, rows_done in
+                self.conn.execute("SELECT name, last_id, rows_done FROM migration_checkpoint")}
+
+    def status(self, migrations):
+        """[(name, state)] where state is 'applied <when>', 'in progress' or 'pending'"""
+        applied = self.applied()
+        checkpoints = self.checkpoints()
+        states = []
+        for migration in migrations:
+            if migration.name in applied:
+                state = f'applied {applied[migration.name]}'
+            elif any(key in checkpoints for key, _ in migration.backfills()):
+                done = sum(checkpoints[key][1] for key, _ in migration.backfills() if key in checkpoints)
+                state = f'in progress ({done:,} rows backfilled)'
+            else:
+                state = 'pending'
+            states.append((migration.name, state))
+        return states
+
+    def run(self, migrations):
+        """Apply every pending migration in order; returns the names applied"""
+        applied = self.applied()
+        done = []
+        for migration in migrations:
+            if migration.name in applied:
+                continue
+            self.log(f'- {migration.name}: {migration.description}')
+            backfills = dict((id(step), key) for key, step in migration.backfills())
+            for step in migration.steps:
+                if isinstance(step, AddColumn):
+                    self._add_column(migration, step)
+                elif isinstance(step, Backfill):
+                    self._backfill(backfills[id(step)], step)
+                else:
+                    self._execute(step)
+            with self.transaction() as cursor:
+                cursor.execute("INSERT INTO schema_migration (name, applied_at) VALUES (?, ?)",
+                               (migration.name, datetime.utcnow()))
+            done.append(migration.name)
+        return done
+
+    def _add_column(self, migration, step):
+        with self.transaction() as cursor:
+            if step.column in column_names(cursor, step.table):
+                return
+            self.log(f'  adding {step.table}.{step.column}')
+            cursor.execute(f"ALTER TABLE {step.table} ADD COLUMN {step.column} {step.definition}")
+            # Backfills of the new column start now, committed together with the column
+            for key, backfill in migration.backfills():
+                if backfill.when_added == (step.table, step.column):
+                    cursor.execute("INSERT OR REPLACE INTO migration_checkpoint (name, last_id, rows_done, updated_at) "
+                                   "VALUES (?, 0, 0, ?)", (key, datetime.utcnow()))
+
+    def _execute(self, step):
+        with self.transaction() as cursor:
+            if step.params is None:
+                cursor.execute(step.sql)
+            else:
+                cursor.executemany(step.sql, step.params)
+
+    def _backfill(self, key, step):
+        checkpoint = self.conn.execute("SELECT last_id, rows_done FROM migration_checkpoint WHERE name = ?",
+                                       (key,)).fetchone()
+        if checkpoint is None:
+            return  # the column was not added by this migration, so its rows are already filled
+        last_id, rows_done = checkpoint
+        table = step.table
+        total = rows_done + self.conn.execute(f"SELECT COUNT(*) FROM {table} WHERE id > ?", (last_id,)).fetchone()[0]
+        if last_id:
+            self.log(f'  resuming {key} on {table} after id {last_id:,}')
+
+        size = self.batch_size
+        started = reported = time.perf_counter()
+        while True:
+            batch_started = time.perf_counter()
+            with self.transaction() as cursor:
+                cursor.execute(f"SELECT id FROM {table} WHERE id > ? ORDER BY id LIMIT 1 OFFSET ?", (last_id, size - 1))
+                row = cursor.fetchone()
+                if row is None:
+                    cursor.execute(f"SELECT MAX(id) FROM {table}")
+                    row = cursor.fetchone()
+                up_to_id = row[0]
+                if up_to_id is None or up_to_id <= last_id:
+                    cursor.execute("DELETE FROM migration_checkpoint WHERE name = ?", (key,))
+                    break
+                step.run(cursor, last_id, up_to_id)
+                cursor.execute(f"SELECT COUNT(*) FROM {table} WHERE id > ? AND id <= ?", (last_id, up_to_id))
+                rows_done += cursor.fetchone()[0]
+                last_id = up_to_id
+                cursor.execute("UPDATE migration_checkpoint SET last_id = ?, rows_done = ?, updated_at = ? "
+                               "WHERE name = ?", (last_id, rows_done, datetime.utcnow(), key))
+
+            held = time.perf_counter() - batch_started
+            if held > self.max_batch_seconds:
+                size = max(size // 2, MIN_BATCH_SIZE)
+            elif held < self.max_batch_seconds / 4:
+                size = min(size * 2, self.batch_size)
+            if time.perf_counter() - reported >= 5:
+                reported = time.perf_counter()
+                self.log(f'  {table}: {rows_done:,}/{total:,} rows (batch {size:,})')
+            time.sleep(self.pause)
+
+        self.log(f'  backfilled {rows_done:,} {table} rows in {time.perf_counter() - started:.1f}s')
@@ -8,7 +8,9 @@ from app import db, login_manager
 
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    # Served from the user cache so most requests skip the user SELECT
+    from app.services.user_cache import user_cache
+    return user_cache.load(int(user_id))
 
 class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -25,6 +27,9 @@ class User(UserMixin, db.Model):
     two_factor_enabled = db.Column(db.Boolean, default=True)
     two_factor_method = db.Column(db.String(10), default='email')  # email or sms
     
+    # Sellers: inquiries not yet opened (maintained incrementally by app.services.inquiries)
+    unread_inquiry_count = db.Column(db.Integer, default=0, nullable=False, server_default='0')
+    
     # Relationships
     properties = db.relationship('Property', backref='seller', lazy=True)
     inquiries_sent = db.relationship('Inquiry', foreign_keys='Inquiry.customer_id', backref='customer', lazy=True)
@@ -36,6 +41,10 @@ class User(UserMixin, db.Model):
     def set_password(self, password):
         self.password_hash = generate_password_hash(password)
     
+    def get_model(self):
+        """Same interface as UserSnapshot.get_model when the user cache is bypassed"""
+        return self
+    
     def check_password(self, password):
         return check_password_hash(self.password_hash, password)
     
@@ -125,6 +134,8 @@ class Property(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     approved_at = db.Column(db.DateTime)
     is_featured = db.Column(db.Boolean, default=False)
+    favorite_count = db.Column(db.Integer, default=0, nullable=False, server_default='0')  # maintained by app.services.favorite_counts
+    amenity_mask = db.Column(db.BigInteger, default=0, nullable=False, server_default='0')  # app.services.amenities bits
     
     # Category specific fields
     sale_price = db.Column(db.Integer)  # For buy properties
@@ -136,11 +147,25 @@ class Property(db.Model):
     gender_preference = db.Column(db.String(10))  # male, female, coed
     meal_included = db.Column(db.Boolean, default=False)  # For PG properties
     
+    # Comparable across categories; maintained by app.services.listing_costs
+    monthly_cost = db.Column(db.Integer)  # rent, per-bed charge or loan EMI
+    upfront_cost = db.Column(db.Integer)  # deposit + first month, or down payment
+    
     # Relationships
     images = db.relationship('PropertyImage', backref='property', lazy=True, cascade='all, delete-orphan')
     inquiries = db.relationship('Inquiry', backref='property', lazy=True)
     favorites = db.relationship('Favorite', backref='property', lazy=True)
     
+    __table_args__ = (
+        # Backs the "most popular" sort on the listings page
+        db.Index('ix_property_status_favorite_count', 'status', 'favorite_count'),
+        # Narrows price rollup group refreshes (app.services.price_rollups)
+        db.Index('ix_property_category_type_status', 'category', 'property_type', 'status'),
+        # Cost range filters and sorts on the listings page
+        db.Index('ix_property_status_monthly_cost', 'status', 'monthly_cost'),
+        db.Index('ix_property_status_upfront_cost', 'status', 'upfront_cost'),
+    )
+    
     def __repr__(self):
         return f'<Property {self.title}>'
 
@@ -149,6 +174,7 @@ class PropertyImage(db.Model):
     property_id = db.Column(db.Integer, db.ForeignKey('property.id'), nullable=False)
     filename = db.Column(db.String(255), nullable=False)
     is_primary = db.Column(db.Boolean, default=False)
+    phash = db.Column(db.BigInteger)  # app.services.duplicate_images (signed 64-bit)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     def __repr__(self):
@@ -161,6 +187,7 @@ class Payment(db.Model):
     amount = db.Column(db.Integer, nullable=False)
     transaction_id = db.Column(db.String(100), nullable=False)
     screenshot_filename = db.Column(db.String(255), nullable=False)
+    screenshot_phash = db.Column(db.BigInteger)  # app.services.duplicate_images (signed 64-bit)
     status = db.Column(db.String(20), default='pending')  # pending, verified, rejected
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     verified_at = db.Column(db.DateTime)
@@ -181,6 +208,35 @@ class Inquiry(db.Model):
     customer_phone = db.Column(db.String(15), nullable=False)
     status = db.Column(db.String(20), default='open')  # open, responded, closed
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    read_at = db.Column(db.DateTime)  # first opened by the seller
+    
+    # Email digest delivery (app.services.inquiry_digest)
+    notified_at = db.Column(db.DateTime)
+    notify_token = db.Column(db.String(32))  # claim held by a running digest batch
+    notify_claimed_at = db.Column(db.DateTime)
+    
+    # Allowed status changes from the seller inbox
+    TRANSITIONS = {
+        'open': ('responded', 'closed'),
+        'responded': ('open', 'closed'),
+        'closed': ('open',)
+    }
+    
+    # Seller inbox (overall, per status, per property) and the customer's own list
+    __table_args__ = (
+        db.Index('ix_inquiry_seller_created', 'seller_id', 'created_at'),
+        db.Index('ix_inquiry_seller_status_created', 'seller_id', 'status', 'created_at'),
+        db.Index('ix_inquiry_seller_property_created', 'seller_id', 'property_id', 'created_at'),
+        db.Index('ix_inquiry_customer_created', 'customer_id', 'created_at'),
+        db.Index('ix_inquiry_notified', 'notified_at', 'id'),
+    )
+    
+    @property
+    def is_unread(self):
+        return self.read_at is None
+    
+    def can_transition_to(self, status):
+        return status in self.TRANSITIONS.get(self.status, ())
     
     def __repr__(self):
         return f'<Inquiry {self.id}>'
@@ -195,4 +251,67 @@ class Favorite(db.Model):
     __table_args__ = (db.UniqueConstraint('user_id', 'property_id', name='unique_user_property_favorite'),)
     
     def __repr__(self):
-        return f'<Favorite {self.user_id}-{self.property_id}>'
\ No newline at end of file
+        return f'<Favorite {self.user_id}-{self.property_id}>'
+
+class Amenity(db.Model):
+    """Normalized amenity tag; id is the tag's bit in Property.amenity_mask plus one"""
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    slug = db.Column(db.String(50), unique=True, nullable=False)
+    name = db.Column(db.String(50), nullable=False)
+    
+    def __repr__(self):
+        return f'<Amenity {self.slug}>'
+
+class PropertyAmenity(db.Model):
+    property_id = db.Column(db.Integer, db.ForeignKey('property.id'), primary_key=True)
+    amenity_id = db.Column(db.Integer, db.ForeignKey('amenity.id'), primary_key=True)
+    
+    # Listings with a given amenity
+    __table_args__ = (db.Index('ix_property_amenity_amenity', 'amenity_id', 'property_id'),)
+    
+    def __repr__(self):
+        return f'<PropertyAmenity {self.property_id}-{self.amenity_id}>'
+
+class ImageHashBand(db.Model):
+    """One 16-bit band of an upload's perceptual hash (multi-index hashing, see app.services.duplicate_images)"""
+    kind = db.Column(db.String(10), primary_key=True)  # property (PropertyImage.id) or payment (Payment.id)
+    band = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    value = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    ref_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    
+    # The primary key serves lookups; this one deletes a row's bands
+    __table_args__ = (db.Index('ix_image_hash_band_ref', 'kind', 'ref_id'),)
+    
+    def __repr__(self):
+        return f'<ImageHashBand {self.kind}:{self.ref_id} {self.band}={self.value}>'
+
+class PriceRollup(db.Model):
+    """Approved-listing price statistics per (location, category, property_type)"""
+    id = db.Column(db.Integer, primary_key=True)
+    location = db.Column(db.String(200), nullable=False)  # trimmed, lower-cased Property.location
+    category = db.Column(db.String(20), nullable=False)
+    property_type = db.Column(db.String(50), nullable=False)
+    listing_count = db.Column(db.Integer, nullable=False, default=0)
+    
+    price_mean = db.Column(db.Float)
+    price_median = db.Column(db.Float)
+    price_p25 = db.Column(db.Float)
+    price_p75 = db.Column(db.Float)
+    price_p90 = db.Column(db.Float)
+    
+    # Price per sq ft (listings with an area only)
+    ppsf_mean = db.Column(db.Float)
+    ppsf_median = db.Column(db.Float)
+    ppsf_p25 = db.Column(db.Float)
+    ppsf_p75 = db.Column(db.Float)
+    ppsf_p90 = db.Column(db.Float)
+    
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.UniqueConstraint('location', 'category', 'property_type', name='unique_price_rollup_group'),
+        db.Index('ix_price_rollup_listing_count', 'listing_count'),
+    )
+    
+    def __repr__(self):
+        return f'<PriceRollup {self.location}/{self.category}/{self.property_type}>'
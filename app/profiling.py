@@ -0,0 +1,138 @@
+import json
+import logging
+import time
+from contextlib import contextmanager
+
+from flask import g, request, has_request_context, before_render_template, template_rendered
+from sqlalchemy import event
+
+from app import metrics
+
+logger = logging.getLogger('app.profiling')
+
+
+def _current_profile():
+    if has_request_context():
+        return g.get('_profile')
+    return None
+
+
+@contextmanager
+def external_call(kind):
+    """Time a call to an external service (smtp, twilio, ...) for metrics and the current request"""
+    start = time.perf_counter()
+    failed = False
+    try:
+        yield
+    except Exception:
+        failed = True
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        metrics.observe_external(kind, elapsed, failed=failed)
+        profile = _current_profile()
+        if profile is not None:
+            profile['external'][kind] = profile['external'].get(kind, 0.0) + elapsed
+
+
+def _log(event_name, **fields):
+    fields['event'] = event_name
+    logger.warning(json.dumps(fields, default=str))
+
+
+def init_app(app, db):
+    """Register profiling hooks; does nothing unless PROFILING_ENABLED is set"""
+    if not app.config.get('PROFILING_ENABLED'):
+        return
+
+    slow_request_ms = app.config.get('PROFILING_SLOW_REQUEST_MS', 500)
+    slow_query_ms = app.config.get('PROFILING_SLOW_QUERY_MS', 100)
+
+    log_file = app.config.get('PROFILING_LOG_FILE')
+    if log_file and not logger.handlers:
+        handler = logging.FileHandler(log_file)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+
+    @app.before_request
+    def start_profile():
+        g._profile = {
+            'start': time.perf_counter(),
+            'sql_count': 0,
+            'sql_time': 0.0,
+            'template_time': 0.0,
+            'template_stack': [],
+            'external': {}
+        }
+
+    @app.after_request
+    def finish_profile(response):
+        profile = g.pop('_profile', None)
+        if profile is None:
+            return response
+
+        total_ms = (time.perf_counter() - profile['start']) * 1000
+        sql_ms = profile['sql_time'] * 1000
+        template_ms = profile['template_time'] * 1000
+        external_ms = {kind: round(seconds * 1000, 2) for kind, seconds in profile['external'].items()}
+
+        timings = [
+            f'app;dur={total_ms:.2f}',
+            f'db;dur={sql_ms:.2f};desc="{profile["sql_count"]} queries"',
+            f'tpl;dur={template_ms:.2f}'
+        ]
+        timings += [f'{kind};dur={ms:.2f}' for kind, ms in external_ms.items()]
+        response.headers['Server-Timing'] = ', '.join(timings)
+
+        if total_ms >= slow_request_ms:
+            _log('slow_request',
+                 method=request.method,
+                 path=request.path,
+                 endpoint=request.endpoint,
+                 status=response.status_code,
+                 duration_ms=round(total_ms, 2),
+                 sql_count=profile['sql_count'],
+                 sql_ms=round(sql_ms, 2),
+                 template_ms=round(template_ms, 2),
+                 external_ms=external_ms)
+        return response
+
+    def on_before_render(sender, template, context, **extra):
+        profile = _current_profile()
+        if profile is not None:
+            profile['template_stack'].append(time.perf_counter())
+
+    def on_rendered(sender, template, context, **extra):
+        profile = _current_profile()
+        if profile is not None and profile['template_stack']:
+            profile['template_time'] += time.perf_counter() - profile['template_stack'].pop()
+
+    before_render_template.connect(on_before_render, app, weak=False)
+    template_rendered.connect(on_rendered, app, weak=False)
+
+    with app.app_context():
+        engine = db.engine
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['query_start'].pop()
+        profile = _current_profile()
+        if profile is not None:
+            profile['sql_count'] += 1
+            profile['sql_time'] += elapsed
+        if elapsed * 1000 >= slow_query_ms:
+            _log('slow_query',
+                 duration_ms=round(elapsed * 1000, 2),
+                 statement=statement[:1000],
+                 endpoint=request.endpoint if has_request_context() else None)
+
+    @event.listens_for(engine, 'handle_error')
+    def on_query_error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get('query_start'):
+            conn.info['query_start'].pop()
@@ -1,9 +1,16 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify
+from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify, current_app, send_from_directory
 from flask_login import login_required, current_user
 from app.models import User, Property, Payment, PropertyImage
 from app import db
+from app.services.user_cache import user_cache
+from app.services.page_cache import page_cache, LISTINGS_TAG
+from app.services.similar_listings import similar_listings
+from app.services.autocomplete import autocomplete
+from app.services import price_rollups
+from app.services import duplicate_images
 from sqlalchemy import desc, asc, func, or_
 from functools import wraps
+import os
 
 bp = Blueprint('admin', __name__, url_prefix='/admin')
 
@@ -17,6 +24,18 @@ def admin_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+def primary_images(properties):
+    """{property id: filename} of each listing's primary photo (or its first one) in one query per 500 listings"""
+    property_ids = [property.id for property in properties]
+    primary = {}
+    for start in range(0, len(property_ids), 500):
+        rows = db.session.query(PropertyImage.property_id, PropertyImage.filename).filter(
+            PropertyImage.property_id.in_(property_ids[start:start + 500])
+        ).order_by(PropertyImage.property_id, desc(PropertyImage.is_primary), PropertyImage.id)
+        for property_id, filename in rows:
+            primary.setdefault(property_id, filename)
+    return primary
+
 @bp.route('/dashboard')
 @login_required
 @admin_required
@@ -35,10 +54,14 @@ def dashboard():
     # Get recent payments (last 5)
     recent_payments = Payment.query.order_by(desc(Payment.created_at)).limit(5).all()
     
+    # Market prices from the precomputed rollup table
+    market_prices = price_rollups.largest_markets(10)
+    
     return render_template('admin/dashboard.html', 
                          stats=stats, 
                          recent_properties=recent_properties,
-                         recent_payments=recent_payments)
+                         recent_payments=recent_payments,
+                         market_prices=market_prices)
 
 @bp.route('/pending-properties')
 @login_required
@@ -62,14 +85,17 @@ def pending_properties():
     
     properties = query.order_by(desc(Property.created_at)).all()
     
-    return render_template('admin/pending_properties.html', properties=properties)
+    return render_template('admin/pending_properties.html', properties=properties,
+                         thumbnails=primary_images(properties),
+                         duplicates=duplicate_images.duplicate_listings(properties))
 
 @bp.route('/pending-payments')
 @login_required
 @admin_required
 def pending_payments():
     payments = Payment.query.filter_by(status='pending').order_by(desc(Payment.created_at)).all()
-    return render_template('admin/pending_payments.html', payments=payments)
+    return render_template('admin/pending_payments.html', payments=payments,
+                         duplicates=duplicate_images.duplicate_payments(payments))
 
 @bp.route('/manage-users')
 @login_required
@@ -145,7 +171,54 @@ def all_properties():
     
     properties = query.all()
     
-    return render_template('admin/all_properties.html', properties=properties)
+    return render_template('admin/all_properties.html', properties=properties,
+                         thumbnails=primary_images(properties))
+
+@bp.route('/property/<int:property_id>/images')
+@login_required
+@admin_required
+def property_images(property_id):
+    """Gallery of one listing, fetched when its review modal opens"""
+    Property.query.get_or_404(property_id)
+    images = PropertyImage.query.filter_by(property_id=property_id).order_by(
+        desc(PropertyImage.is_primary), PropertyImage.id).all()
+    return jsonify({'images': [{
+        'url': url_for('main.uploaded_file', filename=image.filename),
+        'is_primary': bool(image.is_primary)
+    } for image in images]})
+
+@bp.route('/payment/<int:payment_id>/screenshot')
+@login_required
+@admin_required
+def payment_screenshot(payment_id):
+    """Payment proof image, loaded when its review modal opens"""
+    payment = Payment.query.get_or_404(payment_id)
+    return send_from_directory(os.path.join(current_app.instance_path, 'uploads', 'payments'),
+                               payment.screenshot_filename)
+
+def refresh_listing_views(property, listed):
+    """Update the page cache, search indexes and price rollups after a committed status change
+    
+    listed is True when the listing became visible, False when it was withdrawn and None when
+    its visibility did not change. Each step is attempted on its own and failures are only logged.
+    """
+    property_id = property.id
+    steps = [('page cache invalidation', lambda: page_cache.invalidate(LISTINGS_TAG))]
+    if listed is True:
+        steps += [('similar listings add', lambda: similar_listings.add(property)),
+                  ('autocomplete add', lambda: autocomplete.add(property))]
+    elif listed is False:
+        steps += [('similar listings remove', lambda: similar_listings.remove(property_id)),
+                  ('autocomplete remove', lambda: autocomplete.remove(property_id))]
+    if listed is not None:
+        steps.append(('price rollup refresh', lambda: price_rollups.refresh_for(property)))
+    
+    for name, step in steps:
+        try:
+            step()
+        except Exception:
+            db.session.rollback()
+            current_app.logger.exception(f'Property {property_id}: {name} failed after a status change')
 
 # API Routes for AJAX updates
 @bp.route('/property/<int:property_id>/status', methods=['POST'])
@@ -162,11 +235,13 @@ def update_property_status(property_id):
         property = Property.query.get_or_404(property_id)
         property.status = status
         db.session.commit()
-        
-        return jsonify({'success': True, 'message': f'Property {status} successfully'})
     except Exception as e:
         db.session.rollback()
         return jsonify({'success': False, 'message': 'Error updating property status'})
+    
+    # The status is saved; a failing cache or index update must not report otherwise
+    refresh_listing_views(property, listed=(status == 'approved'))
+    return jsonify({'success': True, 'message': f'Property {status} successfully'})
 
 @bp.route('/payment/<int:payment_id>/status', methods=['POST'])
 @login_required
@@ -189,11 +264,13 @@ def update_payment_status(payment_id):
             payment.property.status = 'rejected'
         
         db.session.commit()
-        
-        return jsonify({'success': True, 'message': f'Payment {status} successfully'})
     except Exception as e:
         db.session.rollback()
         return jsonify({'success': False, 'message': 'Error updating payment status'})
+    
+    # Verifying or rejecting a payment lists or delists its property
+    refresh_listing_views(payment.property, listed={'verified': True, 'rejected': False}.get(status))
+    return jsonify({'success': True, 'message': f'Payment {status} successfully'})
 
 @bp.route('/user/<int:user_id>/verify', methods=['POST'])
 @login_required
@@ -203,6 +280,7 @@ def verify_user(user_id):
         user = User.query.get_or_404(user_id)
         user.is_verified = True
         db.session.commit()
+        user_cache.invalidate(user.id)
         
         return jsonify({'success': True, 'message': 'User verified successfully'})
     except Exception as e:
@@ -219,6 +297,7 @@ def toggle_user_status(user_id):
         # For now, we'll toggle the verified status as an example
         user.is_verified = not user.is_verified
         db.session.commit()
+        user_cache.invalidate(user.id)
         
         return jsonify({'success': True, 'message': 'User status updated successfully'})
     except Exception as e:
@@ -3,6 +3,8 @@ from flask_login import login_user, logout_user, current_user
 from app.models import User, db
 from app.forms import LoginForm, CustomerRegistrationForm, SellerRegistrationForm, TwoFactorForm
 from app.services.two_factor import TwoFactorService
+from app.services.user_cache import user_cache
+from app.services.page_cache import page_cache, USERS_TAG
 import re
 
 bp = Blueprint('auth', __name__)
@@ -197,6 +199,7 @@ def register_customer():
             
             db.session.add(user)
             db.session.commit()
+            page_cache.invalidate(USERS_TAG)  # the home page shows account counts
             print("✅ User created successfully!")
             
             TwoFactorService.send_welcome_email(user)
@@ -256,6 +259,7 @@ def register_seller():
             
             db.session.add(user)
             db.session.commit()
+            page_cache.invalidate(USERS_TAG)  # the home page shows account counts
             print("✅ Seller created successfully!")
             
             # Send welcome email
@@ -295,8 +299,10 @@ def change_2fa_method():
     
     new_method = request.form.get('method')
     if new_method in ['email', 'sms']:
-        current_user.two_factor_method = new_method
+        user = current_user.get_model()
+        user.two_factor_method = new_method
         db.session.commit()
+        user_cache.invalidate(user.id)
         flash(f'2FA method changed to {new_method.upper()} successfully!', 'success')
     else:
         flash('Invalid 2FA method selected.', 'error')
@@ -315,8 +321,10 @@ def disable_2fa():
         flash('Please enter your current password to disable 2FA.', 'error')
         return redirect(url_for('customer.profile'))
     
-    current_user.two_factor_enabled = False
+    user = current_user.get_model()
+    user.two_factor_enabled = False
     db.session.commit()
+    user_cache.invalidate(user.id)
     
     flash('⚠️ Two-factor authentication has been disabled. Your account is less secure now.', 'warning')
     return redirect(url_for('customer.profile'))
@@ -331,9 +339,11 @@ def enable_2fa():
     if method not in ['email', 'sms']:
         method = 'email'
     
-    current_user.two_factor_enabled = True
-    current_user.two_factor_method = method
+    user = current_user.get_model()
+    user.two_factor_enabled = True
+    user.two_factor_method = method
     db.session.commit()
+    user_cache.invalidate(user.id)
     
     flash(f'Two-factor authentication enabled with {method.upper()}! Your account is now more secure.', 'success')
     return redirect(url_for('customer.profile'))
\ No newline at end of file
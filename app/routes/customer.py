@@ -3,6 +3,10 @@ from flask_login import login_required, current_user
 from app.models import Favorite, Property, Inquiry
 from app.forms import InquiryForm
 from app import db
+from app.services.favorites import favorite_ids_for, all_favorite_ids
+from app.services.favorite_counts import favorite_counts
+from app.services.inquiries import record_new_inquiry
+from app.services.user_cache import user_cache
 
 bp = Blueprint('customer', __name__)
 
@@ -47,12 +51,32 @@ def toggle_favorite(property_id):
         message = 'Added to favorites'
     
     db.session.commit()
+    favorite_counts.record(property_id, 1 if is_favorite else -1)
     
     return jsonify({
         'is_favorite': is_favorite,
         'message': message
     })
 
+@bp.route('/favorite-ids')
+@login_required
+def favorite_ids():
+    """Favorited property ids, optionally limited to ?ids=1,2,3 (for hydrating listing pages)"""
+    if current_user.role != 'customer':
+        return jsonify({'error': 'Access denied'}), 403
+    
+    ids = request.args.get('ids')
+    if ids is None:
+        favorites = all_favorite_ids(current_user)
+    else:
+        try:
+            requested = [int(pid) for pid in ids.split(',') if pid.strip()][:200]
+        except ValueError:
+            return jsonify({'error': 'ids must be a comma separated list of integers'}), 400
+        favorites = favorite_ids_for(current_user, requested)
+    
+    return jsonify({'favorite_ids': sorted(favorites)})
+
 @bp.route('/inquire/<int:property_id>', methods=['GET', 'POST'])
 @login_required
 def inquire(property_id):
@@ -73,7 +97,9 @@ def inquire(property_id):
             customer_phone=current_user.phone
         )
         db.session.add(inquiry)
+        record_new_inquiry(inquiry)
         db.session.commit()
+        user_cache.invalidate(property.seller_id)
         
         flash('Your inquiry has been sent to the seller!', 'success')
         return redirect(url_for('main.property_detail', id=property_id))
@@ -1,13 +1,19 @@
 import os
-from flask import Blueprint, render_template, request, redirect, url_for, flash, send_from_directory, abort, current_app
+from flask import Blueprint, render_template, request, redirect, url_for, flash, send_from_directory, abort, current_app, jsonify
 from flask_login import current_user
 from app.models import Property, User
 from app.forms import SearchForm
 from app import db
+from app.services.page_cache import page_cache, LISTINGS_TAG, USERS_TAG
+from app.services.favorites import favorite_ids_for
+from app.services.similar_listings import similar_listings
+from app.services.autocomplete import autocomplete
+from app.services import amenities as amenity_service
 
 bp = Blueprint('main', __name__)
 
 @bp.route('/')
+@page_cache.cached(tags=[LISTINGS_TAG, USERS_TAG])
 def index():
     """Homepage - shows no properties initially as admin hasn't approved any"""
     search_form = SearchForm()
@@ -26,12 +32,19 @@ def index():
         'sellers': total_sellers
     }
     
+    # Hearts for the visible cards (one query)
+    favorite_ids = favorite_ids_for(current_user, [p.id for p in featured_properties])
+    
     return render_template('index.html', 
                          featured_properties=featured_properties,
                          stats=stats,
-                         search_form=search_form)
+                         search_form=search_form,
+                         favorite_ids=favorite_ids)
 
 @bp.route('/properties')
+@page_cache.cached(tags=[LISTINGS_TAG], args=('search', 'category', 'location', 'min_price', 'max_price',
+                                              'max_monthly_cost', 'max_upfront_cost', 'property_type',
+                                              'bedrooms', 'amenities', 'sort', 'page'))
 def properties():
     """Properties listing page with search and filters"""
     search_form = SearchForm()
@@ -65,6 +78,15 @@ def properties():
             max_price = search_form.max_price.data or int(request.args.get('max_price'))
             query = query.filter(Property.price <= max_price)
         
+        # Costs comparable across buy, rent and PG (see app.services.listing_costs)
+        if search_form.max_monthly_cost.data or request.args.get('max_monthly_cost', type=int):
+            max_monthly_cost = search_form.max_monthly_cost.data or request.args.get('max_monthly_cost', type=int)
+            query = query.filter(Property.monthly_cost <= max_monthly_cost)
+        
+        if search_form.max_upfront_cost.data or request.args.get('max_upfront_cost', type=int):
+            max_upfront_cost = search_form.max_upfront_cost.data or request.args.get('max_upfront_cost', type=int)
+            query = query.filter(Property.upfront_cost <= max_upfront_cost)
+        
         if search_form.property_type.data or request.args.get('property_type'):
             prop_type = search_form.property_type.data or request.args.get('property_type')
             query = query.filter_by(property_type=prop_type)
@@ -72,6 +94,11 @@ def properties():
         if search_form.bedrooms.data or request.args.get('bedrooms'):
             bedrooms = int(search_form.bedrooms.data or request.args.get('bedrooms'))
             query = query.filter(Property.bedrooms >= bedrooms)
+        
+        # "Must have" amenities: one bitwise test per row
+        amenity_mask = amenity_service.mask_for_slugs(request.args.getlist('amenities'))
+        if amenity_mask:
+            query = query.filter(amenity_service.has_all(amenity_mask))
     
     # Get category from URL parameter
     category = request.args.get('category')
@@ -79,16 +106,36 @@ def properties():
         query = query.filter_by(category=category)
         search_form.category.data = category
     
+    # Sorting ("popular" and the cost sorts each walk a status/<column> index)
+    sort = request.args.get('sort', 'newest')
+    if sort == 'popular':
+        query = query.order_by(Property.favorite_count.desc(), Property.created_at.desc())
+    elif sort == 'monthly_cost':
+        query = query.order_by(Property.monthly_cost, Property.id)
+    elif sort == 'monthly_cost_desc':
+        query = query.order_by(Property.monthly_cost.desc(), Property.id.desc())
+    elif sort == 'upfront_cost':
+        query = query.order_by(Property.upfront_cost, Property.id)
+    else:
+        query = query.order_by(Property.created_at.desc())
+    search_form.sort.data = sort
+    
     # Pagination
     page = request.args.get('page', 1, type=int)
-    properties = query.order_by(Property.created_at.desc()).paginate(
+    properties = query.paginate(
         page=page, per_page=12, error_out=False
     )
     
+    # Hearts for the visible cards (one query)
+    favorite_ids = favorite_ids_for(current_user, [p.id for p in properties.items])
+    
     return render_template('properties/list.html', 
                          properties=properties,
                          search_form=search_form,
-                         category=category)
+                         category=category,
+                         favorite_ids=favorite_ids,
+                         amenity_choices=[(slug, name) for slug, name, _ in amenity_service.VOCABULARY],
+                         selected_amenities=request.args.getlist('amenities'))
 
 @bp.route('/property/<int:id>')
 def property_detail(id):
@@ -100,17 +147,21 @@ def property_detail(id):
     property = Property.query.filter_by(id=id, status='approved').first_or_404()
     
     # Check if property is in user's favorites
-    is_favorite = False
-    if current_user.is_authenticated:
-        from app.models import Favorite
-        is_favorite = Favorite.query.filter_by(
-            user_id=current_user.id, 
-            property_id=property.id
-        ).first() is not None
+    is_favorite = property.id in favorite_ids_for(current_user, [property.id])
     
     return render_template('properties/detail.html', 
                          property=property,
-                         is_favorite=is_favorite)
+                         is_favorite=is_favorite,
+                         similar_properties=similar_listings.similar_to(property.id))
+
+@bp.route('/autocomplete')
+def autocomplete_suggestions():
+    """Location/title suggestions for ?q=<prefix>&field=search|location (cacheable by the browser)"""
+    field = request.args.get('field', 'search')
+    response = jsonify({'suggestions': autocomplete.suggest(request.args.get('q', ''), field=field)})
+    response.cache_control.public = True
+    response.cache_control.max_age = current_app.config.get('AUTOCOMPLETE_MAX_AGE', 300)
+    return response
 
 @bp.route('/uploads/properties/<filename>')
 def uploaded_file(filename):
@@ -172,11 +223,13 @@ def debug_images():
     return f"<pre>{json.dumps(debug_info, indent=2)}</pre>"
 
 @bp.route('/about')
+@page_cache.cached()
 def about():
     """About page"""
     return render_template('about.html')
 
 @bp.route('/contact')
+@page_cache.cached()
 def contact():
     """Contact page"""
     return render_template('contact.html')
\ No newline at end of file
@@ -1,12 +1,19 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request, current_app
+from flask import Blueprint, render_template, redirect, url_for, flash, request, current_app, jsonify
 from flask_login import login_required, current_user
 from werkzeug.utils import secure_filename
-from app.models import Property, PropertyImage, Payment
+from app.models import Property, PropertyImage, Payment, Inquiry
 from app.forms import PropertyForm, PaymentForm
 from app import db
+from app.metrics import track_image_processing
+from app.services import inquiries as inquiry_service
+from app.services import price_rollups
+from app.services import amenities as amenity_service
+from app.services import listing_costs
+from app.services import images as image_service
+from app.services import duplicate_images
+from app.services.user_cache import user_cache
 import os
 import json
-from PIL import Image
 
 bp = Blueprint('seller', __name__)
 
@@ -74,24 +81,26 @@ def add_property():
             property.per_bed_price = form.price.data
             property.gender_preference = form.gender_preference.data
             property.meal_included = form.meal_included.data
+        listing_costs.apply(property)
         
         db.session.add(property)
         db.session.flush()  # Get the property ID
+        amenity_service.apply(property)
         
         # Handle image uploads
         if form.images.data:
             upload_folder = os.path.join(current_app.instance_path, 'uploads', 'properties')
             os.makedirs(upload_folder, exist_ok=True)
             
+            hashes = []
             for i, file in enumerate(form.images.data):
                 if file and allowed_file(file.filename):
                     filename = secure_filename(f"property_{property.id}_{i}_{file.filename}")
                     filepath = os.path.join(upload_folder, filename)
                     
-                    # Resize and save image
-                    image = Image.open(file)
-                    image.thumbnail((800, 600), Image.Resampling.LANCZOS)
-                    image.save(filepath, optimize=True, quality=85)
+                    # Reduced-scale decode, EXIF orientation, resize, metadata stripped
+                    with track_image_processing('property'):
+                        phash = image_service.process_upload(file, filepath)
                     
                     # Create PropertyImage record
                     property_image = PropertyImage(
@@ -100,6 +109,12 @@ def add_property():
                         is_primary=(i == 0)
                     )
                     db.session.add(property_image)
+                    hashes.append((property_image, phash))
+            
+            # Index the photos for the admin's duplicate check (needs the image ids)
+            db.session.flush()
+            for property_image, phash in hashes:
+                duplicate_images.record('property', property_image, phash)
         
         db.session.commit()
         flash('Property submitted successfully! Please proceed with payment to complete the listing.', 'success')
@@ -107,6 +122,27 @@ def add_property():
     
     return render_template('seller/add_property.html', form=form)
 
+@bp.route('/price-context')
+@login_required
+def price_context():
+    """Market prices for ?location=&category=&property_type= (shown on the add-property form)"""
+    if current_user.role != 'seller':
+        return jsonify({'error': 'Access denied'}), 403
+    
+    rollup = price_rollups.lookup(request.args.get('location', ''), request.args.get('category', ''),
+                                  request.args.get('property_type', ''))
+    if rollup is None:
+        return jsonify({'found': False})
+    
+    return jsonify({
+        'found': True,
+        'listing_count': rollup.listing_count,
+        'price': {'mean': rollup.price_mean, 'median': rollup.price_median, 'p25': rollup.price_p25,
+                  'p75': rollup.price_p75, 'p90': rollup.price_p90},
+        'price_per_sqft': {'mean': rollup.ppsf_mean, 'median': rollup.ppsf_median, 'p25': rollup.ppsf_p25,
+                           'p75': rollup.ppsf_p75, 'p90': rollup.ppsf_p90}
+    })
+
 @bp.route('/payment/<int:property_id>', methods=['GET', 'POST'])
 @login_required
 def payment(property_id):
@@ -132,6 +168,7 @@ def payment(property_id):
         filename = secure_filename(f"payment_{property_id}_{form.transaction_id.data}_{file.filename}")
         filepath = os.path.join(upload_folder, filename)
         file.save(filepath)
+        phash = image_service.hash_file(filepath)
         
         # Create payment record
         payment = Payment(
@@ -142,6 +179,8 @@ def payment(property_id):
             screenshot_filename=filename
         )
         db.session.add(payment)
+        db.session.flush()
+        duplicate_images.record('payment', payment, phash)
         db.session.commit()
         
         flash('Payment proof submitted successfully! Your property will be reviewed by admin.', 'success')
@@ -161,4 +200,82 @@ def property_detail(id):
     property = Property.query.filter_by(id=id, seller_id=current_user.id).first_or_404()
     payment = Payment.query.filter_by(property_id=id).first()
     
-    return render_template('seller/property_detail.html', property=property, payment=payment)
\ No newline at end of file
+    return render_template('seller/property_detail.html', property=property, payment=payment)
+
+@bp.route('/inquiries')
+@bp.route('/property/<int:property_id>/inquiries')
+@login_required
+def inquiries(property_id=None):
+    if current_user.role != 'seller':
+        flash('Access denied. Seller account required.', 'error')
+        return redirect(url_for('main.index'))
+    
+    property = None
+    if property_id is not None:
+        property = Property.query.filter_by(id=property_id, seller_id=current_user.id).first_or_404()
+    
+    status = request.args.get('status')
+    if status not in Inquiry.TRANSITIONS:
+        status = None
+    
+    page = request.args.get('page', 1, type=int)
+    inquiries = inquiry_service.inbox_query(current_user.id, status=status, property_id=property_id).paginate(
+        page=page, per_page=20, error_out=False
+    )
+    counts = inquiry_service.status_counts(current_user.id, property_id=property_id)
+    
+    return render_template('seller/inquiries.html', inquiries=inquiries, counts=counts,
+                         status=status, property=property)
+
+@bp.route('/inquiries/<int:inquiry_id>')
+@login_required
+def inquiry_detail(inquiry_id):
+    if current_user.role != 'seller':
+        flash('Access denied. Seller account required.', 'error')
+        return redirect(url_for('main.index'))
+    
+    inquiry = Inquiry.query.filter_by(id=inquiry_id, seller_id=current_user.id).first_or_404()
+    if inquiry_service.mark_read(inquiry):
+        db.session.commit()
+        user_cache.invalidate(current_user.id)
+    
+    return render_template('seller/inquiry_detail.html', inquiry=inquiry)
+
+@bp.route('/inquiries/<int:inquiry_id>/status', methods=['POST'])
+@login_required
+def update_inquiry_status(inquiry_id):
+    if current_user.role != 'seller':
+        flash('Access denied. Seller account required.', 'error')
+        return redirect(url_for('main.index'))
+    
+    inquiry = Inquiry.query.filter_by(id=inquiry_id, seller_id=current_user.id).first_or_404()
+    try:
+        inquiry_service.change_status(inquiry, request.form.get('status'))
+    except ValueError as e:
+        flash(str(e), 'error')
+        return redirect(url_for('seller.inquiry_detail', inquiry_id=inquiry.id))
+    
+    db.session.commit()
+    user_cache.invalidate(current_user.id)
+    flash(f'Inquiry marked as {inquiry.status}.', 'success')
+    next_url = request.form.get('next', '')
+    if next_url.startswith('/') and not next_url.startswith('//'):
+        return redirect(next_url)
+    return redirect(url_for('seller.inquiry_detail', inquiry_id=inquiry.id))
+
+@bp.route('/inquiries/mark-read', methods=['POST'])
+@login_required
+def mark_inquiries_read():
+    if current_user.role != 'seller':
+        flash('Access denied. Seller account required.', 'error')
+        return redirect(url_for('main.index'))
+    
+    property_id = request.form.get('property_id', type=int)
+    changed = inquiry_service.mark_all_read(current_user.id, property_id=property_id)
+    db.session.commit()
+    user_cache.invalidate(current_user.id)
+    
+    flash(f'{changed} inquiries marked as read.', 'success')
+    if property_id:
+        return redirect(url_for('seller.inquiries', property_id=property_id))
+    return redirect(url_for('seller.inquiries'))
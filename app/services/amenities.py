@@ -0,0 +1,144 @@
+"""
+Amenity tag vocabulary, per-property bitmasks and the property_amenity join table.
+
+Sellers still type amenities as free text (kept in Property.amenities).
+parse_amenities() maps each comma-separated entry onto VOCABULARY through
+its aliases. Property.amenity_mask gets one bit per matched tag, and
+property_amenity gets one row per tag for SQL joins and reporting. Entries
+that match nothing stay in the free text only, so the mask is used for
+filtering but not as the full list.
+
+"Must have X AND Y" filters are a single `amenity_mask & m = m` test per row.
+Cards show display_amenities(): the mask's tag names followed by the
+unmatched free-text entries, both memoised per value.
+
+A tag's bit is its position in VOCABULARY, and Amenity.id is bit + 1.
+Only ever append to the list; reordering it would change the meaning of
+stored masks. A signed 64-bit mask holds at most 63 tags. The amenity rows
+are written once, when create_all() makes the table or by upgrade_db.py,
+so appending a tag also needs a migration inserting its row.
+"""
+
+import re
+from functools import lru_cache
+
+from sqlalchemy import event
+
+from app import db
+from app.models import Amenity, Property, PropertyAmenity
+
+# (slug, display name, aliases)
+VOCABULARY = [
+    ('parking', 'Parking', ('car parking', 'covered parking', 'parking space', 'garage')),
+    ('gym', 'Gym', ('gymnasium', 'fitness centre', 'fitness center')),
+    ('swimming-pool', 'Swimming Pool', ('pool', 'swim', 'swimming')),
+    ('lift', 'Lift', ('elevator', 'lifts')),
+    ('power-backup', 'Power Backup', ('backup', 'generator', 'inverter')),
+    ('security', 'Security', ('24x7 security', 'security guard', 'gated community', 'gated')),
+    ('garden', 'Garden', ('park', 'lawn', 'landscaped garden')),
+    ('club-house', 'Club House', ('clubhouse', 'club')),
+    ('wifi', 'WiFi', ('internet', 'broadband')),
+    ('air-conditioning', 'Air Conditioning', ('ac', 'air conditioner', 'air conditioned')),
+    ('laundry', 'Laundry', ('washing machine', 'laundry service')),
+    ('cctv', 'CCTV', ('cctv cameras', 'cctv surveillance', 'surveillance')),
+    ('play-area', 'Play Area', ('kids play area', 'playground', 'children play area')),
+    ('housekeeping', 'Housekeeping', ('cleaning', 'daily cleaning')),
+    ('meals', 'Meals', ('food', 'meals included', 'mess')),
+    ('sauna', 'Sauna', ('steam', 'steam room')),
+    ('balcony', 'Balcony', ('balconies', 'terrace')),
+    ('water-supply', 'Water Supply', ('24x7 water', 'water', 'borewell')),
+    ('pet-friendly', 'Pet Friendly', ('pets allowed', 'pets')),
+]
+MAX_TAGS = 63
+assert len(VOCABULARY) <= MAX_TAGS
+
+BIT_BY_SLUG = {slug: bit for bit, (slug, _, _) in enumerate(VOCABULARY)}
+NAMES = [name for _, name, _ in VOCABULARY]
+
+
+def _normalize(text):
+    # "Swimming-Pool", "swimming pool" and "SwimmingPool" all become "swimmingpool"
+    return re.sub(r'[^a-z0-9]+', '', text.lower())
+
+
+def _build_lookup():
+    lookup = {}
+    for bit, (slug, name, aliases) in enumerate(VOCABULARY):
+        for alias in (slug, name) + aliases:
+            lookup.setdefault(_normalize(alias), bit)
+    return lookup
+
+
+LOOKUP = _build_lookup()  # normalized name/alias -> bit
+
+
+def parse_amenities(text):
+    """Sorted vocabulary bits mentioned in a comma-separated amenities string"""
+    bits = set()
+    for entry in (text or '').split(','):
+        bit = LOOKUP.get(_normalize(entry))
+        if bit is not None:
+            bits.add(bit)
+    return sorted(bits)
+
+
+def mask_for_bits(bits):
+    mask = 0
+    for bit in bits:
+        mask |= 1 << bit
+    return mask
+
+
+def mask_for_slugs(slugs):
+    """Mask for ?amenities=slug values; unknown slugs are ignored"""
+    return mask_for_bits(BIT_BY_SLUG[slug] for slug in slugs if slug in BIT_BY_SLUG)
+
+
+@lru_cache(maxsize=4096)
+def tags_for_mask(mask):
+    """Display names for a mask, in vocabulary order"""
+    return tuple(NAMES[bit] for bit in range(len(NAMES)) if mask >> bit & 1)
+
+
+@lru_cache(maxsize=4096)
+def unmatched_entries(text):
+    """Entries of an amenities string that match no vocabulary tag, as the seller typed them"""
+    seen = set()
+    entries = []
+    for entry in (text or '').split(','):
+        entry = entry.strip()
+        key = _normalize(entry)
+        if key and key not in LOOKUP and key not in seen:
+            seen.add(key)
+            entries.append(entry)
+    return tuple(entries)
+
+
+def display_amenities(mask, text=None):
+    """Tag names for a mask followed by the free-text entries no tag covers"""
+    return tags_for_mask(mask or 0) + unmatched_entries(text)
+
+
+def has_all(mask):
+    """SQL filter: listings whose mask contains every bit of mask"""
+    return Property.amenity_mask.op('&')(mask) == mask
+
+
+@event.listens_for(Amenity.__table__, 'after_create')
+def _seed_vocabulary(table, connection, **kw):
+    """Fill the amenity table when db.create_all() creates it (upgrade_db.py seeds existing databases)"""
+    connection.execute(table.insert(), [{'id': bit + 1, 'slug': slug, 'name': name}
+                                        for bit, (slug, name, _) in enumerate(VOCABULARY)])
+
+
+def apply(property):
+    """Set amenity_mask and property_amenity rows from property.amenities (property must have an id)"""
+    bits = parse_amenities(property.amenities)
+    property.amenity_mask = mask_for_bits(bits)
+    PropertyAmenity.query.filter_by(property_id=property.id).delete(synchronize_session=False)
+    if bits:
+        db.session.add_all(PropertyAmenity(property_id=property.id, amenity_id=bit + 1) for bit in bits)
+
+
+def init_app(app):
+    app.add_template_filter(display_amenities, 'amenity_tags')
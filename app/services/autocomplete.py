@@ -0,0 +1,237 @@
+"""
+In-memory prefix tries for location and title-term autocomplete.
+
+Approved listings contribute their normalized location ("andheri west,
+mumbai"), each comma-separated part of it, and the words of their title.
+Each term is weighted by how many approved listings contain it. Every trie
+node caches the TOP_K heaviest terms below it, so a lookup walks the prefix
+and returns that list. It never scans the subtree.
+
+Like the similar-listings index, it is a BackgroundIndex: each worker
+builds its tries in a background thread on first use, admin approvals update
+them in place, and every AUTOCOMPLETE_REFRESH_INTERVAL seconds the worker
+diffs its ids against the approved set.
+"""
+
+import re
+
+from sqlalchemy import select
+
+from app import db
+from app.models import Property
+from app.services.background_index import BackgroundIndex
+
+TOP_K = 10
+MAX_PREFIX = 50
+WORD_RE = re.compile(r'[a-z0-9]+')
+STOPWORDS = {'and', 'for', 'the', 'with', 'near', 'from'}
+
+
+def normalize(text):
+    """Lower-case and collapse whitespace"""
+    return ' '.join((text or '').lower().split())
+
+
+def location_terms(location):
+    location = normalize(location)
+    if not location:
+        return set()
+    terms = {location}
+    terms.update(part.strip() for part in location.split(',') if part.strip())
+    return terms
+
+
+def title_terms(title):
+    return {word for word in WORD_RE.findall((title or '').lower())
+            if len(word) >= 3 and word not in STOPWORDS}
+
+
+class _Node:
+    __slots__ = ('children', 'term', 'count', 'top')
+
+    def __init__(self):
+        self.children = {}
+        self.term = None
+        self.count = 0
+        self.top = []
+
+
+def _rank(entry):
+    return (-entry[0], entry[1])
+
+
+class PrefixTrie:
+    """Term -> weight trie whose nodes keep their heaviest TOP_K descendants"""
+
+    def __init__(self):
+        self.root = _Node()
+
+    def add(self, term, delta):
+        """Change a term's weight and fix the cached tops along its path"""
+        path = [self.root]
+        node = self.root
+        for char in term:
+            child = node.children.get(char)
+            if child is None:
+                if delta <= 0:
+                    return
+                child = node.children[char] = _Node()
+            node = child
+            path.append(node)
+        node.term = term
+        node.count = max(node.count + delta, 0)
+
+        for depth in range(len(path) - 1, -1, -1):
+            node = path[depth]
+            if depth and not node.count and not node.children:
+                # Prune branches that no longer lead to a term
+                del path[depth - 1].children[term[depth - 1]]
+                continue
+            self._update_top(node)
+
+    def complete(self, prefix, limit=TOP_K):
+        """[(weight, term)] for the heaviest terms starting with prefix"""
+        node = self.root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return []
+        return node.top[:limit]
+
+    def load(self, counts):
+        """Replace the contents with {term: weight} and compute every node's tops once"""
+        self.root = _Node()
+        for term, count in counts.items():
+            if count <= 0:
+                continue
+            node = self.root
+            for char in term:
+                node = node.children.setdefault(char, _Node())
+            node.term = term
+            node.count = count
+        # Post-order without recursion: children before parents
+        order = []
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            order.append(node)
+            stack.extend(node.children.values())
+        for node in reversed(order):
+            self._update_top(node)
+
+    @staticmethod
+    def _update_top(node):
+        candidates = [(node.count, node.term)] if node.count else []
+        for child in node.children.values():
+            candidates.extend(child.top)
+        candidates.sort(key=_rank)
+        node.top = candidates[:TOP_K]
+
+
+class AutocompleteIndex(BackgroundIndex):
+    """Per-process location and title tries over approved properties"""
+
+    label = 'autocomplete'
+
+    def __init__(self):
+        super().__init__()
+        self.tries = {'location': PrefixTrie(), 'title': PrefixTrie()}
+        self._terms_of = {}
+
+    def init_app(self, app):
+        self.app = app
+        self.enabled = app.config.get('AUTOCOMPLETE_ENABLED', True)
+        self.refresh_interval = app.config.get('AUTOCOMPLETE_REFRESH_INTERVAL', 60.0)
+
+    def suggest(self, prefix, field='search', limit=TOP_K):
+        """[{'term', 'kind', 'count'}] for a prefix; field 'location' only suggests locations"""
+        if not self.enabled:
+            return []
+        self._ensure_worker()
+        prefix = normalize(prefix)[:MAX_PREFIX]
+        if not prefix:
+            return []
+        kinds = ('location',) if field == 'location' else ('location', 'title')
+        with self._lock:
+            entries = [(count, term, kind) for kind in kinds
+                       for count, term in self.tries[kind].complete(prefix, limit)]
+        entries.sort(key=_rank)
+        suggestions = []
+        seen = set()
+        for count, term, kind in entries:
+            if term not in seen:
+                seen.add(term)
+                suggestions.append({'term': term, 'kind': kind, 'count': count})
+        return suggestions[:limit]
+
+    def add(self, property):
+        """Count an approved property's terms; call after committing the approval"""
+        if not self.enabled:
+            return
+        with self._lock:
+            if self.ready:
+                self._add(property.id, property.location, property.title)
+
+    def remove(self, property_id):
+        with self._lock:
+            terms = self._terms_of.pop(property_id, None)
+            if terms is not None:
+                for kind, kind_terms in terms.items():
+                    for term in kind_terms:
+                        self.tries[kind].add(term, -1)
+
+    def rebuild(self):
+        """Load every approved property into fresh tries; returns the number indexed"""
+        rows = db.session.execute(
+            select(Property.id, Property.location, Property.title).where(Property.status == 'approved')).all()
+        terms_of = {}
+        counts = {'location': {}, 'title': {}}
+        for property_id, location, title in rows:
+            terms = terms_of[property_id] = self._terms(location, title)
+            for kind, kind_terms in terms.items():
+                for term in kind_terms:
+                    counts[kind][term] = counts[kind].get(term, 0) + 1
+        tries = {}
+        for kind, kind_counts in counts.items():
+            tries[kind] = PrefixTrie()
+            tries[kind].load(kind_counts)
+        with self._lock:
+            self.tries = tries
+            self._terms_of = terms_of
+            self.ready = True
+        return len(rows)
+
+    def refresh(self):
+        """Apply approvals/rejections made in other processes; returns (added, removed)"""
+        if not self.ready:
+            return 0, 0
+        approved = set(db.session.execute(
+            select(Property.id).where(Property.status == 'approved')).scalars())
+        with self._lock:
+            known = set(self._terms_of)
+        removed = known - approved
+        for property_id in removed:
+            self.remove(property_id)
+        added = sorted(approved - known)
+        for start in range(0, len(added), 500):
+            rows = db.session.execute(select(Property.id, Property.location, Property.title)
+                                      .where(Property.id.in_(added[start:start + 500]))).all()
+            with self._lock:
+                for row in rows:
+                    self._add(*row)
+        return len(added), len(removed)
+
+    @staticmethod
+    def _terms(location, title):
+        return {'location': location_terms(location), 'title': title_terms(title)}
+
+    def _add(self, property_id, location, title):
+        if property_id in self._terms_of:
+            self.remove(property_id)
+        terms = self._terms_of[property_id] = self._terms(location, title)
+        for kind, kind_terms in terms.items():
+            for term in kind_terms:
+                self.tries[kind].add(term, 1)
+
+
+autocomplete = AutocompleteIndex()
@@ -0,0 +1,64 @@
+"""
+Base class for the per-process in-memory indexes (similar listings, autocomplete).
+
+Each worker process holds its own copy of an index. The first lookup in a
+process starts a daemon thread that calls rebuild() once, then refresh()
+every refresh_interval seconds to pick up changes made by other processes.
+The thread is started lazily and tied to the current pid, so a forked
+worker starts its own instead of relying on the parent's (threads do not
+survive fork).
+
+Subclasses set `label`, fill in enabled and refresh_interval in init_app(),
+and implement rebuild() (returns the number of rows indexed) and refresh().
+"""
+
+import os
+import threading
+import time
+
+
+class BackgroundIndex:
+    label = 'index'  # used in the thread name and log messages
+
+    def __init__(self):
+        self.app = None
+        self.enabled = False
+        self.refresh_interval = 60.0
+        self.ready = False
+        self._lock = threading.RLock()
+        self._worker = None
+        self._worker_pid = None
+
+    def rebuild(self):
+        raise NotImplementedError
+
+    def refresh(self):
+        raise NotImplementedError
+
+    def _ensure_worker(self):
+        if self._worker_pid == os.getpid() and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker_pid == os.getpid() and self._worker.is_alive():
+                return
+            self._worker = threading.Thread(target=self._run_worker, name=self.label.replace(' ', '-'),
+                                            daemon=True)
+            self._worker_pid = os.getpid()
+            self._worker.start()
+
+    def _run_worker(self):
+        while self.enabled:
+            if self.ready:
+                time.sleep(self.refresh_interval)
+            try:
+                with self.app.app_context():
+                    if self.ready:
+                        self.refresh()
+                    else:
+                        started = time.perf_counter()
+                        count = self.rebuild()
+                        self.app.logger.info(f'{self.label.capitalize()} index built: {count} properties '
+                                             f'in {time.perf_counter() - started:.2f}s')
+            except Exception:
+                self.app.logger.exception(f'Updating the {self.label} index failed')
+                time.sleep(self.refresh_interval)
@@ -0,0 +1,199 @@
+"""
+Near-duplicate detection for listing photos and payment screenshots.
+
+Every upload is stored with a 64-bit difference hash (images.dhash()).
+Re-encoded, resized or lightly edited copies of a picture hash within a few
+bits of each other, so two uploads whose hashes differ in at most DISTANCE
+bits are flagged to the admin as likely duplicates.
+
+Comparing against every earlier upload would be linear, so the hashes are
+also indexed by multi-index hashing. Each hash is split into BANDS 16-bit
+bands, stored as image_hash_band rows whose primary key (kind, band, value,
+ref_id) is the lookup index. Two hashes within 7 bits of each other have at
+least one band that differs in at most one bit (four bands of 2+ bits
+would make 8). A lookup therefore seeks each band's value and its 16
+one-bit neighbours, 68 index seeks, and checks the real distance of the
+candidates found. A bucket holds about uploads / 65536 unrelated rows, so
+candidates stay few until the millions.
+
+kind is 'property' (ref_id = PropertyImage.id) or 'payment' (Payment.id).
+Uploads made before the hashes existed are indexed with
+`flask index-image-hashes`.
+"""
+
+import os
+
+from flask import current_app
+from sqlalchemy import bindparam, select
+
+from app import db
+from app.models import ImageHashBand, Payment, Property, PropertyImage
+
+DISTANCE = 6  # at most 7, see above
+BANDS = 4
+BAND_BITS = 16
+BAND_MASK = (1 << BAND_BITS) - 1
+MAX_SHOWN = 5  # matches listed per listing or payment
+
+KINDS = {
+    'property': (PropertyImage, PropertyImage.phash, 'properties', PropertyImage.filename),
+    'payment': (Payment, Payment.screenshot_phash, 'payments', Payment.screenshot_filename),
+}
+
+
+def to_signed(phash):
+    """Unsigned 64-bit hash as stored in a BIGINT column"""
+    return phash - (1 << 64) if phash >= 1 << 63 else phash
+
+
+def to_unsigned(stored):
+    return stored + (1 << 64) if stored < 0 else stored
+
+
+def bands(phash):
+    return [(phash >> (band * BAND_BITS)) & BAND_MASK for band in range(BANDS)]
+
+
+def probes(value):
+    """A band value and its one-bit neighbours"""
+    return [value] + [value ^ (1 << bit) for bit in range(BAND_BITS)]
+
+
+def chunks(values, size=500):
+    values = sorted(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def record(kind, row, phash):
+    """Store phash on a flushed PropertyImage/Payment row and index its bands (None is skipped)"""
+    if phash is None:
+        return
+    _, column, _, _ = KINDS[kind]
+    setattr(row, column.key, to_signed(phash))
+    db.session.add_all([ImageHashBand(kind=kind, band=band, value=value, ref_id=row.id)
+                        for band, value in enumerate(bands(phash))])
+
+
+def near_duplicates(kind, hashes, distance=DISTANCE):
+    """{ref_id: {other ref_id: bits apart}} for the indexed uploads within distance of hashes {ref_id: phash}"""
+    # (band, probed value) -> ref_ids that probe it, so each value is looked up once for the whole page
+    wanted = {}
+    for ref_id, phash in hashes.items():
+        for band, value in enumerate(bands(phash)):
+            for probe in probes(value):
+                wanted.setdefault((band, probe), []).append(ref_id)
+
+    candidates = {ref_id: set() for ref_id in hashes}
+    for band in range(BANDS):
+        values = [probe for key_band, probe in wanted if key_band == band]
+        for chunk in chunks(values):
+            rows = db.session.execute(select(ImageHashBand.value, ImageHashBand.ref_id).where(
+                ImageHashBand.kind == kind, ImageHashBand.band == band, ImageHashBand.value.in_(chunk)))
+            for value, other in rows:
+                for ref_id in wanted[(band, value)]:
+                    if other != ref_id:
+                        candidates[ref_id].add(other)
+
+    model, column, _, _ = KINDS[kind]
+    stored = {}
+    for chunk in chunks(set().union(*candidates.values())):
+        stored.update(db.session.execute(select(model.id, column).where(model.id.in_(chunk),
+                                                                        column.is_not(None))).all())
+    matches = {}
+    for ref_id, others in candidates.items():
+        close = {}
+        for other in others:
+            if other in stored:
+                bits = (hashes[ref_id] ^ to_unsigned(stored[other])).bit_count()
+                if bits <= distance:
+                    close[other] = bits
+        if close:
+            matches[ref_id] = close
+    return matches
+
+
+def duplicate_listings(properties, limit=MAX_SHOWN):
+    """{property id: [(other Property, bits apart)]} for listings with a near-duplicate photo elsewhere"""
+    property_ids = [property.id for property in properties]
+    owner = {}
+    hashes = {}
+    for chunk in chunks(property_ids):
+        for image_id, property_id, phash in db.session.execute(
+                select(PropertyImage.id, PropertyImage.property_id, PropertyImage.phash)
+                .where(PropertyImage.property_id.in_(chunk), PropertyImage.phash.is_not(None))):
+            owner[image_id] = property_id
+            hashes[image_id] = to_unsigned(phash)
+    matches = near_duplicates('property', hashes)
+
+    other_images = set().union(*matches.values()) - owner.keys()
+    for chunk in chunks(other_images):
+        owner.update(db.session.execute(select(PropertyImage.id, PropertyImage.property_id)
+                                        .where(PropertyImage.id.in_(chunk))).all())
+    # Closest photo per pair of listings; a listing reusing its own photo is not a duplicate
+    closest = {}
+    for image_id, others in matches.items():
+        property_id = owner[image_id]
+        found = closest.setdefault(property_id, {})
+        for other, bits in others.items():
+            other_property = owner.get(other)
+            if other_property is not None and other_property != property_id:
+                found[other_property] = min(bits, found.get(other_property, bits))
+    return _with_rows(Property, closest, limit)
+
+
+def duplicate_payments(payments, limit=MAX_SHOWN):
+    """{payment id: [(other Payment, bits apart)]} for payments whose screenshot was uploaded before"""
+    hashes = {payment.id: to_unsigned(payment.screenshot_phash) for payment in payments
+              if payment.screenshot_phash is not None}
+    # Ids grow with upload order; the first upload of a screenshot is not itself flagged
+    earlier = {ref_id: {other: bits for other, bits in others.items() if other < ref_id}
+               for ref_id, others in near_duplicates('payment', hashes).items()}
+    return _with_rows(Payment, earlier, limit)
+
+
+def _with_rows(model, closest, limit):
+    """Replace the ids in {id: {other id: bits}} by the closest `limit` rows"""
+    nearest = {ref_id: sorted(others.items(), key=lambda item: (item[1], item[0]))[:limit]
+               for ref_id, others in closest.items() if others}
+    rows = {}
+    for chunk in chunks({other for found in nearest.values() for other, _ in found}):
+        rows.update((row.id, row) for row in model.query.filter(model.id.in_(chunk)))
+    return {ref_id: [(rows[other], bits) for other, bits in found] for ref_id, found in nearest.items()}
+
+
+def index_missing(batch_size=200):
+    """Hash stored uploads that have no hash yet, committing every batch; returns (hashed, unreadable)"""
+    from app.services.images import hash_file
+
+    hashed = unreadable = 0
+    for kind, (model, column, folder, filename_column) in KINDS.items():
+        upload_dir = os.path.join(current_app.instance_path, 'uploads', folder)
+        table = model.__table__
+        statement = table.update().where(table.c.id == bindparam('row_id')).values({column.key: bindparam('phash')})
+        last_id = 0
+        while True:
+            rows = db.session.execute(select(model.id, filename_column)
+                                      .where(model.id > last_id, column.is_(None))
+                                      .order_by(model.id).limit(batch_size)).all()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            # Files are decoded before the batch writes anything; rows may share a file
+            by_file = {filename: hash_file(os.path.join(upload_dir, filename)) for filename in {row[1] for row in rows}}
+            updates = []
+            band_rows = []
+            for ref_id, filename in rows:
+                phash = by_file[filename]
+                if phash is None:
+                    unreadable += 1
+                    continue
+                updates.append({'row_id': ref_id, 'phash': to_signed(phash)})
+                band_rows.extend({'kind': kind, 'band': band, 'value': value, 'ref_id': ref_id}
+                                 for band, value in enumerate(bands(phash)))
+            if updates:
+                db.session.execute(statement, updates)
+                db.session.execute(ImageHashBand.__table__.insert().prefix_with('OR IGNORE'), band_rows)
+            db.session.commit()
+            hashed += len(updates)
+    return hashed, unreadable
@@ -0,0 +1,145 @@
+"""
+Write-behind maintenance of Property.favorite_count.
+
+toggle_favorite records +1/-1 here instead of updating the property row in
+the request. Deltas for the same property are summed in memory and written
+in one batched UPDATE once FAVORITE_COUNT_FLUSH_SIZE properties are pending,
+or every FAVORITE_COUNT_FLUSH_INTERVAL seconds from a background thread.
+Deltas still buffered when a worker dies are lost. reconcile() recounts
+from the favorite table and repairs that drift (run it periodically with
+`flask reconcile-favorite-counts`). A delta flushed just after a recount can
+leave a small transient error that the next run corrects.
+"""
+
+import atexit
+import os
+import threading
+import time
+
+from sqlalchemy import bindparam, case, func, select
+
+from app import db
+from app.models import Favorite, Property
+
+
+class FavoriteCountBuffer:
+    """Per-process buffer of favorite_count deltas"""
+
+    def __init__(self):
+        self.app = None
+        self.enabled = False
+        self.flush_size = 100
+        self.flush_interval = 5.0
+        self._deltas = {}
+        self._lock = threading.Lock()
+        self._flusher = None
+        self._flusher_pid = None
+
+    def init_app(self, app):
+        self.app = app
+        self.enabled = app.config.get('FAVORITE_COUNT_BUFFER_ENABLED', True)
+        self.flush_size = app.config.get('FAVORITE_COUNT_FLUSH_SIZE', 100)
+        self.flush_interval = app.config.get('FAVORITE_COUNT_FLUSH_INTERVAL', 5.0)
+        atexit.register(self.flush)
+
+    def record(self, property_id, delta):
+        """Add delta to a property's count; writes immediately when buffering is disabled
+
+        Called after the favorite itself is committed, so a failed write is logged rather than raised.
+        A failed flush keeps its deltas for the next one; reconcile() repairs an unbuffered write that was lost.
+        """
+        try:
+            if not self.enabled:
+                self._apply({property_id: delta})
+                return
+            with self._lock:
+                self._deltas[property_id] = self._deltas.get(property_id, 0) + delta
+                pending = len(self._deltas)
+            self._ensure_flusher()
+            if pending >= self.flush_size:
+                self.flush()
+        except Exception:
+            self.app.logger.exception(f'Updating the favorite count of property {property_id} failed')
+
+    def pending(self):
+        with self._lock:
+            return dict(self._deltas)
+
+    def flush(self):
+        """Write all buffered deltas in one transaction; returns the number of properties updated"""
+        with self._lock:
+            deltas, self._deltas = self._deltas, {}
+        deltas = {pid: delta for pid, delta in deltas.items() if delta}
+        if not deltas or self.app is None:
+            return 0
+        try:
+            with self.app.app_context():
+                self._apply(deltas)
+        except Exception:
+            # Put them back so the next flush retries
+            with self._lock:
+                for pid, delta in deltas.items():
+                    self._deltas[pid] = self._deltas.get(pid, 0) + delta
+            raise
+        return len(deltas)
+
+    def _apply(self, deltas):
+        table = Property.__table__
+        new_count = table.c.favorite_count + bindparam('delta')
+        stmt = table.update().where(table.c.id == bindparam('pid')).values(
+            favorite_count=case((new_count < 0, 0), else_=new_count))
+        with db.engine.begin() as conn:
+            conn.execute(stmt, [{'pid': pid, 'delta': delta} for pid, delta in deltas.items()])
+
+    def _ensure_flusher(self):
+        # Started lazily so each forked worker gets its own thread
+        if self._flusher_pid == os.getpid() and self._flusher.is_alive():
+            return
+        with self._lock:
+            if self._flusher_pid == os.getpid() and self._flusher.is_alive():
+                return
+            self._flusher = threading.Thread(target=self._run_flusher, name='favorite-count-flusher', daemon=True)
+            self._flusher_pid = os.getpid()
+            self._flusher.start()
+
+    def _run_flusher(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception:
+                self.app.logger.exception('Flushing favorite counts failed')
+
+
+favorite_counts = FavoriteCountBuffer()
+
+
+def reconcile(batch_size=1000):
+    """Recount favorites for every property and fix rows that drifted; returns the number fixed"""
+    fixed = 0
+    last_id = 0
+    table = Property.__table__
+    while True:
+        ids = db.session.execute(
+            select(table.c.id).where(table.c.id > last_id).order_by(table.c.id).limit(batch_size)
+        ).scalars().all()
+        if not ids:
+            break
+        last_id = ids[-1]
+
+        actual = dict(db.session.execute(
+            select(Favorite.property_id, func.count()).where(Favorite.property_id.in_(ids))
+            .group_by(Favorite.property_id)
+        ).all())
+        stored = dict(db.session.execute(
+            select(table.c.id, table.c.favorite_count).where(table.c.id.in_(ids))
+        ).all())
+        drift = [{'pid': pid, 'count': actual.get(pid, 0)}
+                 for pid in ids if stored.get(pid) != actual.get(pid, 0)]
+        if drift:
+            db.session.execute(
+                table.update().where(table.c.id == bindparam('pid')).values(favorite_count=bindparam('count')),
+                drift)
+            db.session.commit()
+            fixed += len(drift)
+    return fixed
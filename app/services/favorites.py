@@ -0,0 +1,23 @@
+from app import db
+from app.models import Favorite
+
+
+def favorite_ids_for(user, property_ids):
+    """Return the subset of property_ids the user has favorited, in a single query"""
+    if not user.is_authenticated or user.role != 'customer':
+        return set()
+    property_ids = {int(pid) for pid in property_ids}
+    if not property_ids:
+        return set()
+
+    rows = db.session.query(Favorite.property_id).filter(
+        Favorite.user_id == user.id,
+        Favorite.property_id.in_(property_ids)
+    )
+    return {property_id for property_id, in rows}
+
+
+def all_favorite_ids(user):
+    """Every property id the user has favorited"""
+    rows = db.session.query(Favorite.property_id).filter(Favorite.user_id == user.id)
+    return {property_id for property_id, in rows}
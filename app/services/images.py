@@ -0,0 +1,72 @@
+"""
+Decoding, orienting and resizing uploaded photos.
+
+Phone photos are 12 MP or larger, but listings show them at most at
+PROPERTY_IMAGE_SIZE. A JPEG can be decoded directly at 1/2, 1/4 or 1/8
+scale. Before any pixel is read, process_upload() asks Image.draft() for the
+smallest of those scales that is still DRAFT_GAP times the target. It then
+applies the EXIF orientation to the reduced image, resizes it with LANCZOS
+and saves it without EXIF (camera details, GPS), ICC profile or comments.
+
+ImageOps.exif_transpose() loads the pixels itself. Calling it on the freshly
+opened file would decode the photo at full size, so the draft has to come
+first.
+
+dhash() is the perceptual hash app.services.duplicate_images compares:
+process_upload() takes it from the upright, resized photo and hash_file()
+from a stored file (payment screenshots are saved as uploaded).
+"""
+
+PROPERTY_IMAGE_SIZE = (800, 600)
+JPEG_QUALITY = 85
+DRAFT_GAP = 2  # decode at >= 2x the target so LANCZOS still has detail to work with
+ORIENTATION_TAG = 0x0112
+SWAPS_AXES = {5, 6, 7, 8}  # orientations stored rotated by 90 degrees
+KEEP_INFO = ('transparency',)  # everything else in Image.info is metadata
+HASH_SIZE = 8  # 8 rows of 8 adjacent-pixel comparisons = 64 bits
+
+
+def process_upload(stream, destination, size=PROPERTY_IMAGE_SIZE, quality=JPEG_QUALITY):
+    """Save an uploaded image upright, fitted inside size and without metadata; returns its dhash()"""
+    from PIL import Image, ImageOps  # imported on first upload to keep worker start-up fast
+
+    with Image.open(stream) as image:
+        orientation = image.getexif().get(ORIENTATION_TAG, 1)
+        # draft() sizes refer to the pixels as stored, before rotation
+        width, height = (size[1], size[0]) if orientation in SWAPS_AXES else size
+        image.draft(None, (width * DRAFT_GAP, height * DRAFT_GAP))  # no-op for formats other than JPEG
+
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail(size, Image.Resampling.LANCZOS)
+
+        if destination.lower().endswith(('.jpg', '.jpeg')) and image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        image.info = {key: value for key, value in image.info.items() if key in KEEP_INFO}
+        image.save(destination, optimize=True, quality=quality)
+        return dhash(image)
+
+
+def dhash(image):
+    """64-bit difference hash: bit set where a pixel is brighter than its right neighbour on a 9x8 grayscale"""
+    from PIL import Image
+
+    small = image.convert('L').resize((HASH_SIZE + 1, HASH_SIZE), Image.Resampling.BOX)
+    pixels = small.tobytes()
+    value = 0
+    for row in range(HASH_SIZE):
+        offset = row * (HASH_SIZE + 1)
+        for column in range(HASH_SIZE):
+            value = value << 1 | (pixels[offset + column] > pixels[offset + column + 1])
+    return value
+
+
+def hash_file(path):
+    """dhash() of an image file, upright and decoded at reduced scale; None if it is missing or unreadable"""
+    from PIL import Image, ImageOps
+
+    try:
+        with Image.open(path) as image:
+            image.draft(None, (HASH_SIZE * 16, HASH_SIZE * 16))
+            return dhash(ImageOps.exif_transpose(image))
+    except OSError:  # includes UnidentifiedImageError
+        return None
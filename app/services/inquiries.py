@@ -0,0 +1,108 @@
+"""
+Seller inquiry inbox helpers.
+
+User.unread_inquiry_count is kept in step with Inquiry.read_at by these
+functions, inside the caller's transaction, so the nav badge never has to
+count rows. Callers commit and then invalidate the seller's cached user
+snapshot. recount_unread() repairs any drift (`flask reconcile-unread-inquiries`).
+"""
+
+from datetime import datetime
+
+from sqlalchemy import bindparam, case, func, select
+
+from app import db
+from app.models import Inquiry, User
+
+
+def _adjust_unread(seller_id, delta):
+    new_count = User.unread_inquiry_count + delta
+    User.query.filter_by(id=seller_id).update(
+        {User.unread_inquiry_count: case((new_count < 0, 0), else_=new_count)},
+        synchronize_session=False
+    )
+
+
+def record_new_inquiry(inquiry):
+    """Count a freshly added inquiry as unread for its seller"""
+    _adjust_unread(inquiry.seller_id, 1)
+
+
+def mark_read(inquiry):
+    """Mark an inquiry as opened by the seller; returns True if it was unread"""
+    if inquiry.read_at is not None:
+        return False
+    inquiry.read_at = datetime.utcnow()
+    _adjust_unread(inquiry.seller_id, -1)
+    return True
+
+
+def mark_all_read(seller_id, property_id=None):
+    """Mark every unread inquiry (optionally for one property) as read; returns how many changed"""
+    query = Inquiry.query.filter(Inquiry.seller_id == seller_id, Inquiry.read_at.is_(None))
+    if property_id is not None:
+        query = query.filter(Inquiry.property_id == property_id)
+    changed = query.update({Inquiry.read_at: datetime.utcnow()}, synchronize_session=False)
+    if changed:
+        _adjust_unread(seller_id, -changed)
+    return changed
+
+
+def change_status(inquiry, status):
+    """Apply an allowed status transition; raises ValueError for anything else"""
+    if not inquiry.can_transition_to(status):
+        raise ValueError(f'Cannot change an inquiry from {inquiry.status} to {status}')
+    mark_read(inquiry)
+    inquiry.status = status
+
+
+def inbox_query(seller_id, status=None, property_id=None):
+    """Newest-first inquiries for a seller; each filter combination has a matching index"""
+    query = Inquiry.query.filter(Inquiry.seller_id == seller_id)
+    if status:
+        query = query.filter(Inquiry.status == status)
+    if property_id is not None:
+        query = query.filter(Inquiry.property_id == property_id)
+    return query.order_by(Inquiry.created_at.desc())
+
+
+def status_counts(seller_id, property_id=None):
+    """{'open': n, 'responded': n, 'closed': n, 'all': n} in one grouped query"""
+    query = db.session.query(Inquiry.status, func.count()).filter(Inquiry.seller_id == seller_id)
+    if property_id is not None:
+        query = query.filter(Inquiry.property_id == property_id)
+    counts = {status: 0 for status in Inquiry.TRANSITIONS}
+    counts.update(dict(query.group_by(Inquiry.status).all()))
+    counts['all'] = sum(counts.values())
+    return counts
+
+
+def recount_unread(batch_size=1000):
+    """Recompute unread_inquiry_count for every seller; returns the ids that were fixed"""
+    fixed = []
+    last_id = 0
+    while True:
+        ids = db.session.execute(
+            select(User.id).where(User.id > last_id, User.role == 'seller').order_by(User.id).limit(batch_size)
+        ).scalars().all()
+        if not ids:
+            break
+        last_id = ids[-1]
+
+        actual = dict(db.session.execute(
+            select(Inquiry.seller_id, func.count())
+            .where(Inquiry.seller_id.in_(ids), Inquiry.read_at.is_(None))
+            .group_by(Inquiry.seller_id)
+        ).all())
+        stored = dict(db.session.execute(
+            select(User.id, User.unread_inquiry_count).where(User.id.in_(ids))
+        ).all())
+        drift = [{'uid': uid, 'count': actual.get(uid, 0)} for uid in ids if stored.get(uid) != actual.get(uid, 0)]
+        if drift:
+            table = User.__table__
+            db.session.execute(
+                table.update().where(table.c.id == bindparam('uid')).values(unread_inquiry_count=bindparam('count')),
+                drift)
+            db.session.commit()
+            fixed.extend(row['uid'] for row in drift)
+    return fixed
@@ -0,0 +1,228 @@
+"""
+Batched email digests of new inquiries for sellers.
+
+Each run claims up to INQUIRY_DIGEST_BATCH_SIZE un-notified inquiries with
+a one-off token, so concurrent runs never pick the same rows. It groups
+them by seller and sends one digest per seller over a single SMTP session
+per batch, committing notified_at right after each successful send. It
+repeats until nothing is pending. Claims left behind by a crashed run are
+picked up again after INQUIRY_DIGEST_CLAIM_TIMEOUT seconds. Delivery is
+at-least-once: a crash between a send and its commit can repeat that one
+digest. Inquiries the seller already opened in the inbox are marked
+notified without an email.
+
+Run it with `flask send-inquiry-digests --every 900`.
+"""
+
+import smtplib
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from html import escape
+
+from flask import current_app
+from sqlalchemy import or_
+
+from app import db
+from app.models import Inquiry, Property, User
+from app.profiling import external_call
+from app.services.two_factor import MimeMultipart, MimeText
+
+
+class SMTPSession:
+    """One authenticated SMTP connection reused for many messages (reconnects once if dropped)"""
+
+    def __init__(self, server, port, username, password):
+        self.server = server
+        self.port = port
+        self.username = username
+        self.password = password
+        self.connection = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def connect(self):
+        with external_call('smtp'):
+            connection = smtplib.SMTP(self.server, self.port, timeout=30)
+            connection.starttls()
+            connection.login(self.username, self.password)
+        self.connection = connection
+
+    def send(self, message):
+        if self.connection is None:
+            self.connect()
+        try:
+            with external_call('smtp'):
+                self.connection.send_message(message)
+        except smtplib.SMTPServerDisconnected:
+            self.connect()
+            with external_call('smtp'):
+                self.connection.send_message(message)
+
+    def close(self):
+        if self.connection is not None:
+            try:
+                self.connection.quit()
+            except smtplib.SMTPException:
+                pass
+            self.connection = None
+
+
+def claim_batch(batch_size, claim_timeout):
+    """Atomically claim up to batch_size pending inquiries; returns (token, ids)"""
+    token = uuid.uuid4().hex
+    now = datetime.utcnow()
+    pending = db.session.query(Inquiry.id).filter(
+        Inquiry.notified_at.is_(None),
+        or_(Inquiry.notify_token.is_(None), Inquiry.notify_claimed_at < now - timedelta(seconds=claim_timeout))
+    ).order_by(Inquiry.id).limit(batch_size).subquery()
+
+    # Re-checking the claim condition in the UPDATE keeps two runs from taking the same rows
+    Inquiry.query.filter(
+        Inquiry.id.in_(db.session.query(pending.c.id)),
+        or_(Inquiry.notify_token.is_(None), Inquiry.notify_claimed_at < now - timedelta(seconds=claim_timeout))
+    ).update({Inquiry.notify_token: token, Inquiry.notify_claimed_at: now}, synchronize_session=False)
+    db.session.commit()
+
+    ids = [row.id for row in db.session.query(Inquiry.id).filter(Inquiry.notify_token == token)]
+    return token, ids
+
+
+def build_digest(seller, inquiries, titles, sender, server_url):
+    count = len(inquiries)
+    message = MimeMultipart("alternative")
+    message["Subject"] = f"Settle Space - {count} new {'inquiry' if count == 1 else 'inquiries'} about your listings"
+    message["From"] = sender
+    message["To"] = seller.email
+
+    inbox_url = f"{server_url.rstrip('/')}/seller/inquiries"
+    text_items = []
+    html_items = []
+    for inquiry in inquiries:
+        title = titles.get(inquiry.property_id, 'your listing')
+        link = f"{inbox_url}/{inquiry.id}"
+        text_items.append(f"- {inquiry.customer_name} ({inquiry.customer_phone}) about {title}:\n  {inquiry.message}\n  {link}")
+        html_items.append(
+            f'<li style="margin-bottom: 15px;"><strong>{escape(inquiry.customer_name)}</strong> '
+            f'({escape(inquiry.customer_phone)}) about <em>{escape(title)}</em><br>'
+            f'{escape(inquiry.message)}<br><a href="{escape(link)}">Open inquiry</a></li>'
+        )
+
+    text_content = (f"Hello {seller.name}!\n\nYou have {count} new "
+                    f"{'inquiry' if count == 1 else 'inquiries'}:\n\n" + "\n\n".join(text_items) +
+                    f"\n\nSee all inquiries: {inbox_url}\n\n© 2025 Settle Space")
+    html_content = f"""
+    <!DOCTYPE html>
+    <html>
+    <head><meta charset="UTF-8"><title>New inquiries</title></head>
+    <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+        <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
+            <div style="background: #007bff; color: white; padding: 20px; text-align: center; border-radius: 5px 5px 0 0;">
+                <h1>🏠 Settle Space</h1>
+                <h2>{count} new {'inquiry' if count == 1 else 'inquiries'}</h2>
+            </div>
+            <div style="background: #f8f9fa; padding: 30px; border-radius: 0 0 5px 5px;">
+                <h3>Hello {escape(seller.name)}!</h3>
+                <ul style="padding-left: 20px;">{''.join(html_items)}</ul>
+                <p><a href="{escape(inbox_url)}">See all inquiries</a></p>
+            </div>
+            <div style="text-align: center; margin-top: 20px; color: #666; font-size: 14px;">
+                <p>© 2025 Settle Space | Find Your Perfect Property</p>
+            </div>
+        </div>
+    </body>
+    </html>
+    """
+    message.attach(MimeText(text_content, "plain"))
+    message.attach(MimeText(html_content, "html"))
+    return message
+
+
+def send_batch(session, ids):
+    """Send one digest per seller for the claimed ids; returns (digests_sent, inquiries_notified, failures)"""
+    config = current_app.config
+    inquiries = Inquiry.query.filter(Inquiry.id.in_(ids)).order_by(Inquiry.id).all()
+    if not inquiries:
+        return 0, 0, 0
+
+    by_seller = defaultdict(list)
+    already_read = []
+    for inquiry in inquiries:
+        if inquiry.read_at is not None:
+            # Already seen in the inbox; nothing to tell the seller
+            already_read.append(inquiry.id)
+        else:
+            by_seller[inquiry.seller_id].append(inquiry)
+    sellers = {u.id: u for u in User.query.filter(User.id.in_(list(by_seller)))}
+    titles = dict(db.session.query(Property.id, Property.title).filter(
+        Property.id.in_({i.property_id for i in inquiries})))
+
+    # Detach the loaded rows so the commit after every digest does not expire and reload them
+    for obj in inquiries + list(sellers.values()):
+        db.session.expunge(obj)
+
+    def mark_notified(inquiry_ids):
+        Inquiry.query.filter(Inquiry.id.in_(inquiry_ids)).update(
+            {Inquiry.notified_at: datetime.utcnow(), Inquiry.notify_token: None}, synchronize_session=False)
+        db.session.commit()
+
+    if already_read:
+        mark_notified(already_read)
+
+    sent = notified = failures = 0
+    for seller_id, seller_inquiries in by_seller.items():
+        seller = sellers.get(seller_id)
+        try:
+            if seller is not None:
+                session.send(build_digest(seller, seller_inquiries, titles,
+                                          config.get('MAIL_USERNAME'), config.get('SERVER_URL', '')))
+                sent += 1
+        except (smtplib.SMTPException, OSError) as e:
+            current_app.logger.error(f"Failed to send inquiry digest to seller {seller_id}: {str(e)}")
+            failures += 1
+            if session.connection is None:
+                # Could not (re)connect; leave the rest of the batch for the next run
+                break
+            continue
+        mark_notified([inquiry.id for inquiry in seller_inquiries])
+        notified += len(seller_inquiries)
+
+    # Release whatever was not delivered so the next run retries it
+    Inquiry.query.filter(Inquiry.id.in_(ids), Inquiry.notified_at.is_(None)).update(
+        {Inquiry.notify_token: None}, synchronize_session=False)
+    db.session.commit()
+    return sent, notified, failures
+
+
+def send_pending_digests(batch_size=None, claim_timeout=None):
+    """Send digests for everything pending; returns totals for logging"""
+    config = current_app.config
+    batch_size = batch_size or config.get('INQUIRY_DIGEST_BATCH_SIZE', 500)
+    claim_timeout = claim_timeout or config.get('INQUIRY_DIGEST_CLAIM_TIMEOUT', 1800)
+
+    sender_email = config.get('MAIL_USERNAME')
+    sender_password = config.get('MAIL_PASSWORD')
+    if not sender_email or not sender_password:
+        current_app.logger.error("Email credentials not configured; inquiry digests not sent")
+        return {'batches': 0, 'digests': 0, 'inquiries': 0}
+
+    totals = {'batches': 0, 'digests': 0, 'inquiries': 0}
+    while True:
+        token, ids = claim_batch(batch_size, claim_timeout)
+        if not ids:
+            break
+        with SMTPSession(config.get('MAIL_SERVER', 'smtp.gmail.com'), config.get('MAIL_PORT', 587),
+                         sender_email, sender_password) as session:
+            sent, notified, failures = send_batch(session, ids)
+        totals['batches'] += 1
+        totals['digests'] += sent
+        totals['inquiries'] += notified
+        # Stop on failures (they were released and would be claimed again straight away)
+        if failures or len(ids) < batch_size:
+            break
+    return totals
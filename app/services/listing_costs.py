@@ -0,0 +1,87 @@
+"""
+Comparable monthly and upfront costs for buy, rent and PG listings.
+
+Property.price is a sale price for "buy" listings but a monthly rent or a
+per-bed charge for "rent" and "pg" ones. A single price range therefore
+means different things across categories. Two derived columns put every
+listing on the same scale:
+
+- monthly_cost: the rent or per-bed charge. For a sale it is the EMI on a
+  home loan for the price less a DOWN_PAYMENT share (LOAN_RATE, LOAN_YEARS).
+- upfront_cost: what is paid before moving in. That is the first month plus
+  the security deposit for rent/PG, and the down payment for a sale.
+
+apply() sets both whenever a listing is written. backfill() fills them in
+id-ordered batches (`flask backfill-listing-costs`; upgrade_db.py does the
+same for existing databases). The listings page filters and sorts on them
+through the (status, monthly_cost) and (status, upfront_cost) indexes.
+
+Changing the loan assumptions changes stored values: run
+`flask backfill-listing-costs --all` afterwards.
+"""
+
+from sqlalchemy import bindparam, select
+
+from app import db
+from app.models import Property
+
+DOWN_PAYMENT = 0.2
+LOAN_RATE = 0.085  # yearly
+LOAN_YEARS = 20
+
+
+def emi(principal, yearly_rate=LOAN_RATE, years=LOAN_YEARS):
+    """Monthly instalment of a fixed-rate loan"""
+    months = years * 12
+    rate = yearly_rate / 12
+    if not rate:
+        return principal / months
+    growth = (1 + rate) ** months
+    return principal * rate * growth / (growth - 1)
+
+
+def costs(category, price, sale_price=None, monthly_rent=None, security_deposit=None, per_bed_price=None):
+    """(monthly_cost, upfront_cost) in whole rupees"""
+    if category == 'buy':
+        total = sale_price or price
+        if not total:
+            return None, None
+        down_payment = total * DOWN_PAYMENT
+        return round(emi(total - down_payment)), round(down_payment)
+    monthly = (monthly_rent if category == 'rent' else per_bed_price) or price
+    if not monthly:
+        return None, None
+    return monthly, monthly + (security_deposit or 0)
+
+
+def apply(property):
+    """Set monthly_cost and upfront_cost from the listing's price fields"""
+    property.monthly_cost, property.upfront_cost = costs(
+        property.category, property.price, property.sale_price, property.monthly_rent,
+        property.security_deposit, property.per_bed_price)
+
+
+def backfill(batch_size=1000, missing_only=True):
+    """Compute the columns in id order, committing every batch; returns the number of rows written"""
+    table = Property.__table__
+    statement = (table.update().where(table.c.id == bindparam('row_id'))
+                 .values(monthly_cost=bindparam('monthly'), upfront_cost=bindparam('upfront')))
+    written = 0
+    last_id = 0
+    while True:
+        query = (select(Property.id, Property.category, Property.price, Property.sale_price, Property.monthly_rent,
+                        Property.security_deposit, Property.per_bed_price)
+                 .where(Property.id > last_id).order_by(Property.id).limit(batch_size))
+        if missing_only:
+            query = query.where(Property.monthly_cost.is_(None))
+        rows = db.session.execute(query).all()
+        if not rows:
+            return written
+        params = []
+        for row in rows:
+            monthly, upfront = costs(*row[1:])
+            params.append({'row_id': row[0], 'monthly': monthly, 'upfront': upfront})
+        db.session.execute(statement, params)
+        db.session.commit()
+        written += len(rows)
+        last_id = rows[-1][0]
@@ -0,0 +1,150 @@
+"""
+Full-page cache for anonymous visitors.
+
+Views decorated with @page_cache.cached(tags=...) are served from the cache
+without running the view when the visitor is anonymous and has no pending
+flash messages. Entries are keyed on the endpoint, the normalized query
+string and the current version of each tag. page_cache.invalidate(tag) bumps
+the version, so every page rendered under the old one stops matching and
+simply ages out.
+
+Tag versions live in the cache backend, so an invalidation only reaches the
+processes sharing that backend. With PAGE_CACHE_REDIS_URL set, every worker
+and CLI command (purge_users.py, `flask backfill-listing-costs`) shares one
+Redis. Without it each process has its own cache. An approval handled by one
+worker, or any CLI command, then leaves the other workers' pages stale for
+up to PAGE_CACHE_TTL. invalidate() returns False in that case, and init_app
+logs a warning outside debug/testing.
+
+Cacheable responses carry Vary: Cookie (signed-in users see a different
+page) and a short s-maxage so an upstream proxy can share them too.
+"""
+
+import hashlib
+import time
+from functools import wraps
+
+from flask import current_app, make_response, request, session
+from flask_login import current_user
+
+from app.cache import make_cache
+
+LISTINGS_TAG = 'listings'
+USERS_TAG = 'users'  # pages showing account counts
+
+
+class PageCache:
+    """Anonymous full-page cache with tag-based invalidation"""
+
+    def __init__(self):
+        self.enabled = False
+        self.backend = None
+        self.shared = False
+        self.ttl = 300
+        self.proxy_max_age = 0
+
+    def init_app(self, app):
+        self.enabled = app.config.get('PAGE_CACHE_ENABLED', True)
+        self.ttl = app.config.get('PAGE_CACHE_TTL', 300)
+        self.proxy_max_age = app.config.get('PAGE_CACHE_PROXY_MAX_AGE', 60)
+        self.backend = make_cache(
+            redis_url=app.config.get('PAGE_CACHE_REDIS_URL'),
+            prefix='settle_space:page:',
+            default_ttl=self.ttl,
+            max_size=app.config.get('PAGE_CACHE_MAX_SIZE', 2000)
+        )
+        self.shared = bool(app.config.get('PAGE_CACHE_REDIS_URL'))
+        if self.enabled and not self.shared and not (app.debug or app.testing):
+            app.logger.warning(f'PAGE_CACHE_REDIS_URL is not set: the page cache is per-process, so invalidations '
+                               f'from other workers and CLI commands reach it only after PAGE_CACHE_TTL ({self.ttl}s)')
+
+    def tag_version(self, tag):
+        version = self.backend.get(f'tag:{tag}')
+        if version is None:
+            # Start from the clock rather than 0 so a tag evicted from the local
+            # cache can never come back at a version older pages were stored under
+            version = time.time_ns()
+            self.backend.set(f'tag:{tag}', version, ttl=365 * 24 * 3600)
+        return version
+
+    def invalidate(self, *tags):
+        """Drop every cached page rendered under any of these tags
+
+        Returns False when other processes may keep serving the old pages (enabled without a shared Redis backend).
+        """
+        if self.backend is None:
+            return not self.enabled
+        for tag in tags:
+            self.tag_version(tag)
+            self.backend.incr(f'tag:{tag}')
+        return self.shared or not self.enabled
+
+    def clear(self):
+        if self.backend is not None:
+            self.backend.clear()
+
+    def make_key(self, args, tags):
+        """Endpoint + normalized query args + tag versions, or None when args fall outside the allowlist"""
+        pairs = []
+        for name in sorted(request.args):
+            if name not in args:
+                return None
+            values = sorted(v.strip() for v in request.args.getlist(name) if v.strip())
+            if name == 'page' and values == ['1']:
+                continue
+            pairs.extend(f'{name}={value}' for value in values)
+        versions = ','.join(f'{tag}:{self.tag_version(tag)}' for tag in tags)
+        view_args = ','.join(f'{k}={v}' for k, v in sorted((request.view_args or {}).items()))
+        raw = f"{request.endpoint}|{view_args}|{'&'.join(pairs)}|{versions}"
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def cacheable_request(self):
+        return (self.enabled and request.method == 'GET'
+                and not current_user.is_authenticated and '_flashes' not in session)
+
+    def cached(self, tags=(), args=()):
+        """Cache a GET view for anonymous visitors; `args` is the query-string allowlist"""
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*view_args, **view_kwargs):
+                if not self.cacheable_request():
+                    response = make_response(view(*view_args, **view_kwargs))
+                    response.headers['X-Cache'] = 'BYPASS'
+                    response.vary.add('Cookie')
+                    response.cache_control.private = True
+                    return response
+
+                key = self.make_key(args, tags)
+                entry = self.backend.get(key) if key else None
+                if entry is not None:
+                    response = current_app.response_class(entry['body'], mimetype=entry['mimetype'])
+                    response.set_etag(entry['etag'])
+                    response.headers['X-Cache'] = 'HIT'
+                    return self._public(response).make_conditional(request)
+
+                response = make_response(view(*view_args, **view_kwargs))
+                # Anything that touched the session rendered visitor-specific content
+                if key and response.status_code == 200 and not session.modified \
+                        and not response.is_streamed and 'Set-Cookie' not in response.headers:
+                    body = response.get_data(as_text=True)
+                    etag = hashlib.sha1(body.encode('utf-8')).hexdigest()
+                    self.backend.set(key, {'body': body, 'mimetype': response.mimetype, 'etag': etag})
+                    response.set_etag(etag)
+                    response.headers['X-Cache'] = 'MISS'
+                    return self._public(response).make_conditional(request)
+
+                response.headers['X-Cache'] = 'BYPASS'
+                response.vary.add('Cookie')
+                return response
+            return wrapper
+        return decorator
+
+    def _public(self, response):
+        response.vary.add('Cookie')
+        response.cache_control.public = True
+        response.cache_control.max_age = 0
+        response.cache_control.s_maxage = self.proxy_max_age
+        return response
+
+
+page_cache = PageCache()
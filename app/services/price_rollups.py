@@ -0,0 +1,168 @@
+"""
+Market price statistics per (location, category, property_type).
+
+PriceRollup holds the count, mean, median and 25th/75th/90th percentiles of
+price and of price per sq ft for approved listings in each group. The
+location is trimmed and lower-cased first. When an admin approves or rejects
+a listing, refresh_for() recomputes just that listing's group from its rows
+through ix_property_category_type_status. rebuild() recomputes every group
+at once with NumPy (`flask rebuild-price-rollups`; generate_data.py runs it
+too). The admin dashboard and the seller add-property form read the table
+and never aggregate over Property.
+"""
+
+import time
+from datetime import datetime
+
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models import PriceRollup, Property
+
+QUANTILES = (('median', 0.5), ('p25', 0.25), ('p75', 0.75), ('p90', 0.9))
+STAT_COLUMNS = ['mean'] + [name for name, _ in QUANTILES]
+
+
+def location_key(location):
+    return (location or '').strip().lower()
+
+
+def _location_expr():
+    return func.lower(func.trim(Property.location))
+
+
+def _percentile(ordered, q):
+    """Linear-interpolated percentile of a sorted list (matches numpy's default)"""
+    position = q * (len(ordered) - 1)
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def _summarize(values, prefix):
+    if not values:
+        return {f'{prefix}_{name}': None for name in STAT_COLUMNS}
+    ordered = sorted(values)
+    stats = {f'{prefix}_mean': sum(ordered) / len(ordered)}
+    for name, q in QUANTILES:
+        stats[f'{prefix}_{name}'] = _percentile(ordered, q)
+    return stats
+
+
+def refresh_group(location, category, property_type):
+    """Recompute one group from its approved listings; returns its PriceRollup or None if it is empty"""
+    key = location_key(location)
+    rows = db.session.execute(
+        select(Property.price, Property.area).where(
+            Property.category == category, Property.property_type == property_type,
+            Property.status == 'approved', _location_expr() == key)
+    ).all()
+
+    values = {'listing_count': len(rows), 'updated_at': datetime.utcnow()}
+    values.update(_summarize([float(price) for price, _ in rows], 'price'))
+    values.update(_summarize([price / area for price, area in rows if area], 'ppsf'))
+
+    for attempt in range(2):
+        rollup = PriceRollup.query.filter_by(location=key, category=category, property_type=property_type).first()
+        if not rows:
+            if rollup is not None:
+                db.session.delete(rollup)
+                db.session.commit()
+            return None
+        if rollup is None:
+            rollup = PriceRollup(location=key, category=category, property_type=property_type)
+            db.session.add(rollup)
+        for name, value in values.items():
+            setattr(rollup, name, value)
+        try:
+            db.session.commit()
+            return rollup
+        except IntegrityError:
+            # Another worker created the group first; update its row instead
+            db.session.rollback()
+            if attempt:
+                raise
+
+
+def refresh_for(property):
+    """Refresh the group a listing belongs to (call after committing a status change)"""
+    return refresh_group(property.location, property.category, property.property_type)
+
+
+def _grouped_stats(np, codes, values, group_count):
+    """Mean and QUANTILES of values per group code, all groups at once"""
+    counts = np.bincount(codes, minlength=group_count)
+    order = np.lexsort((values, codes))
+    ordered = values[order]
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    present = counts > 0
+    last = np.maximum(starts + counts - 1, 0)
+
+    stats = {'mean': np.where(present, np.bincount(codes, weights=values, minlength=group_count)
+                              / np.maximum(counts, 1), np.nan)}
+    if not len(ordered):
+        stats.update({name: np.full(group_count, np.nan) for name, _ in QUANTILES})
+        return stats
+    for name, q in QUANTILES:
+        position = starts + q * np.maximum(counts - 1, 0)
+        lower = np.minimum(np.floor(position).astype(np.int64), len(ordered) - 1)
+        upper = np.minimum(np.minimum(lower + 1, last), len(ordered) - 1)
+        value = ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+        stats[name] = np.where(present, value, np.nan)
+    return stats
+
+
+def rebuild():
+    """Recompute every group from scratch; returns (groups, listings, seconds)"""
+    import numpy as np  # only needed here; keeps app start-up light
+
+    started = time.perf_counter()
+    rows = db.session.execute(
+        select(_location_expr(), Property.category, Property.property_type, Property.price, Property.area)
+        .where(Property.status == 'approved')
+    ).all()
+
+    group_codes = {}
+    codes = np.empty(len(rows), dtype=np.int64)
+    for i, (location, category, property_type, _, _) in enumerate(rows):
+        codes[i] = group_codes.setdefault((location or '', category, property_type), len(group_codes))
+    prices = np.array([row[3] for row in rows], dtype=np.float64)
+    areas = np.array([row[4] or 0 for row in rows], dtype=np.float64)
+
+    group_count = len(group_codes)
+    counts = np.bincount(codes, minlength=group_count)
+    price_stats = _grouped_stats(np, codes, prices, group_count)
+    with_area = areas > 0
+    ppsf_stats = _grouped_stats(np, codes[with_area], prices[with_area] / areas[with_area], group_count)
+
+    def value(array, code):
+        number = float(array[code])
+        return None if np.isnan(number) else number
+
+    now = datetime.utcnow()
+    records = []
+    for (location, category, property_type), code in group_codes.items():
+        record = {'location': location, 'category': category, 'property_type': property_type,
+                  'listing_count': int(counts[code]), 'updated_at': now}
+        for name in STAT_COLUMNS:
+            record[f'price_{name}'] = value(price_stats[name], code)
+            record[f'ppsf_{name}'] = value(ppsf_stats[name], code)
+        records.append(record)
+
+    table = PriceRollup.__table__
+    db.session.execute(table.delete())
+    if records:
+        db.session.execute(table.insert(), records)
+    db.session.commit()
+    return group_count, len(rows), time.perf_counter() - started
+
+
+def lookup(location, category, property_type):
+    return PriceRollup.query.filter_by(location=location_key(location), category=category,
+                                       property_type=property_type).first()
+
+
+def largest_markets(limit=10):
+    """Groups with the most approved listings, for the admin dashboard"""
+    return PriceRollup.query.order_by(PriceRollup.listing_count.desc()).limit(limit).all()
@@ -0,0 +1,276 @@
+"""
+In-memory "similar listings" index for the property detail page.
+
+Every approved property becomes a float32 feature vector: property type,
+log price, log area, bedrooms, bathrooms and hashed location/amenity tokens.
+Vectors are the columns of one growable NumPy matrix per category (a rent
+listing is never "similar" to one for sale), kept next to the few fields
+the panel renders. Lookups compute squared distances to the whole block with one
+matrix-vector product and pick the top k with argpartition. The result is
+memoised until that block changes, so the detail page runs no SQL for it.
+
+The index is built in a background thread on first use in each worker
+(app.services.background_index).
+Admin approvals update it in place. Every SIMILAR_LISTINGS_REFRESH_INTERVAL
+seconds each worker diffs its ids against the approved set to pick up
+approvals made by other workers. NumPy is imported lazily, so it does not
+slow down app start-up.
+"""
+
+import math
+import re
+import zlib
+
+from sqlalchemy import func, select
+
+from app import db
+from app.models import Property, PropertyImage
+from app.services.background_index import BackgroundIndex
+
+PROPERTY_TYPES = ('apartment', 'house', 'villa', 'plot', 'office', 'shop', 'warehouse', 'pg', 'hostel')
+LOCATION_DIMS = 16
+AMENITY_DIMS = 8
+DIMS = len(PROPERTY_TYPES) + 4 + LOCATION_DIMS + AMENITY_DIMS
+
+# Relative weight of each feature group in the distance
+TYPE_WEIGHT = 1.0
+PRICE_WEIGHT = 1.5  # per e-fold of price
+AREA_WEIGHT = 1.0  # per e-fold of area
+BEDROOM_WEIGHT = 0.5
+BATHROOM_WEIGHT = 0.35
+LOCATION_WEIGHT = 2.0
+AMENITY_WEIGHT = 0.75
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+def _numpy():
+    try:
+        import numpy
+        return numpy
+    except ImportError:
+        return None
+
+
+def _hashed_tokens(text, dims, weight, vector, offset, separator=None):
+    """Add a unit-length bag of hashed tokens to vector[offset:offset + dims]"""
+    if not text:
+        return
+    if separator:
+        tokens = [part.strip().lower() for part in text.split(separator) if part.strip()]
+    else:
+        tokens = TOKEN_RE.findall(text.lower())
+    if not tokens:
+        return
+    value = weight / math.sqrt(len(tokens))
+    for token in tokens:
+        vector[offset + zlib.crc32(token.encode()) % dims] += value
+
+
+def feature_vector(np, property_type, price, area, bedrooms, bathrooms, location, amenities):
+    vector = np.zeros(DIMS, dtype=np.float32)
+    if property_type in PROPERTY_TYPES:
+        vector[PROPERTY_TYPES.index(property_type)] = TYPE_WEIGHT
+    offset = len(PROPERTY_TYPES)
+    vector[offset] = PRICE_WEIGHT * math.log1p(max(price or 0, 0))
+    vector[offset + 1] = AREA_WEIGHT * math.log1p(max(area or 0, 0))
+    vector[offset + 2] = BEDROOM_WEIGHT * (bedrooms or 0)
+    vector[offset + 3] = BATHROOM_WEIGHT * (bathrooms or 0)
+    offset += 4
+    _hashed_tokens(location, LOCATION_DIMS, LOCATION_WEIGHT, vector, offset)
+    _hashed_tokens(amenities, AMENITY_DIMS, AMENITY_WEIGHT, vector, offset + LOCATION_DIMS, separator=',')
+    return vector
+
+
+class _Block:
+    """Vectors for one category, one column per listing (columns are contiguous for the
+    query product); slots stay dense by moving the last column into a removed one"""
+
+    def __init__(self, np, capacity=1024):
+        self.np = np
+        self.matrix = np.zeros((DIMS, capacity), dtype=np.float32)
+        self.sq_norms = np.zeros(capacity, dtype=np.float32)
+        self.ids = np.zeros(capacity, dtype=np.int64)
+        self.size = 0
+        self.rows = {}
+        self.memo = {}
+
+    def put(self, property_id, vector):
+        row = self.rows.get(property_id)
+        if row is None:
+            if self.size == len(self.ids):
+                self._grow(self.size * 2)
+            row = self.size
+            self.size += 1
+            self.rows[property_id] = row
+            self.ids[row] = property_id
+        self.matrix[:, row] = vector
+        self.sq_norms[row] = float(vector @ vector)
+        self.memo.clear()
+
+    def remove(self, property_id):
+        row = self.rows.pop(property_id, None)
+        if row is None:
+            return
+        last = self.size - 1
+        if row != last:
+            moved_id = int(self.ids[last])
+            self.matrix[:, row] = self.matrix[:, last]
+            self.sq_norms[row] = self.sq_norms[last]
+            self.ids[row] = moved_id
+            self.rows[moved_id] = row
+        self.size = last
+        self.memo.clear()
+
+    def nearest(self, property_id, k):
+        cached = self.memo.get(property_id)
+        if cached is not None and len(cached) >= k:
+            return cached[:k]
+        row = self.rows[property_id]
+        np = self.np
+        n = self.size
+        # |x - q|^2 = |x|^2 - 2 x.q + |q|^2; the last term is the same for every row
+        distances = self.sq_norms[:n] - 2.0 * (self.matrix[:, row] @ self.matrix[:, :n])
+        distances[row] = np.inf
+        k = min(k, n - 1)
+        if k <= 0:
+            return []
+        top = np.argpartition(distances, k - 1)[:k]
+        top = top[np.argsort(distances[top])]
+        result = [int(i) for i in self.ids[top]]
+        self.memo[property_id] = result
+        return result
+
+    def _grow(self, capacity):
+        np = self.np
+        matrix = np.zeros((DIMS, capacity), dtype=np.float32)
+        matrix[:, :self.size] = self.matrix[:, :self.size]
+        self.matrix = matrix
+        for name in ('sq_norms', 'ids'):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
+
+class SimilarListingsIndex(BackgroundIndex):
+    """Per-process nearest-neighbour index over approved properties"""
+
+    label = 'similar listings'
+
+    def __init__(self):
+        super().__init__()
+        self.count = 4
+        self._blocks = {}
+        self._category_of = {}
+        self._cards = {}
+
+    def init_app(self, app):
+        self.app = app
+        self.enabled = app.config.get('SIMILAR_LISTINGS_ENABLED', True)
+        self.count = app.config.get('SIMILAR_LISTINGS_COUNT', 4)
+        self.refresh_interval = app.config.get('SIMILAR_LISTINGS_REFRESH_INTERVAL', 60.0)
+
+    def similar_to(self, property_id, k=None):
+        """Card dicts for the k most similar approved listings; empty until the index is built"""
+        if not self.enabled:
+            return []
+        self._ensure_worker()
+        with self._lock:
+            category = self._category_of.get(property_id)
+            if category is None:
+                return []
+            ids = self._blocks[category].nearest(property_id, k or self.count)
+            return [self._cards[pid] for pid in ids]
+
+    def add(self, property):
+        """Index (or re-index) one approved property; call after committing the approval"""
+        np = _numpy()
+        if not self.enabled or np is None:
+            return
+        image = property.images[0].filename if property.images else None
+        with self._lock:
+            if not self.ready:
+                return  # the initial build will pick it up
+            self._put(np, property.id, property.category, property.property_type, property.price, property.area,
+                      property.bedrooms, property.bathrooms, property.location, property.amenities,
+                      property.title, image)
+
+    def remove(self, property_id):
+        with self._lock:
+            category = self._category_of.pop(property_id, None)
+            if category is not None:
+                self._blocks[category].remove(property_id)
+                self._cards.pop(property_id, None)
+
+    def rebuild(self):
+        """Load every approved property into a fresh index; returns the number indexed"""
+        np = _numpy()
+        if np is None:
+            self.app.logger.warning('NumPy is not installed; similar listings are disabled')
+            self.enabled = False
+            return 0
+        rows = self._load(np)
+        with self._lock:
+            self._blocks = {}
+            self._category_of = {}
+            self._cards = {}
+            for row in rows:
+                self._put(np, *row)
+            self.ready = True
+        return len(rows)
+
+    def refresh(self):
+        """Add/remove properties whose approval changed in another process; returns (added, removed)"""
+        np = _numpy()
+        if np is None or not self.ready:
+            return 0, 0
+        approved = set(db.session.execute(
+            select(Property.id).where(Property.status == 'approved')).scalars())
+        with self._lock:
+            known = set(self._category_of)
+        removed = known - approved
+        for property_id in removed:
+            self.remove(property_id)
+        added = approved - known
+        if added:
+            rows = self._load(np, sorted(added))
+            with self._lock:
+                for row in rows:
+                    self._put(np, *row)
+        return len(added), len(removed)
+
+    def _load(self, np, ids=None):
+        first_image = select(PropertyImage.property_id, func.min(PropertyImage.id).label('image_id')) \
+            .group_by(PropertyImage.property_id).subquery()
+        query = select(Property.id, Property.category, Property.property_type, Property.price, Property.area,
+                       Property.bedrooms, Property.bathrooms, Property.location, Property.amenities,
+                       Property.title, PropertyImage.filename) \
+            .outerjoin(first_image, first_image.c.property_id == Property.id) \
+            .outerjoin(PropertyImage, PropertyImage.id == first_image.c.image_id) \
+            .where(Property.status == 'approved')
+        if ids is None:
+            return db.session.execute(query).all()
+        rows = []
+        for start in range(0, len(ids), 500):
+            rows.extend(db.session.execute(query.where(Property.id.in_(ids[start:start + 500]))).all())
+        return rows
+
+    def _put(self, np, property_id, category, property_type, price, area, bedrooms, bathrooms,
+             location, amenities, title, image):
+        previous = self._category_of.get(property_id)
+        if previous is not None and previous != category:
+            self._blocks[previous].remove(property_id)
+        block = self._blocks.get(category)
+        if block is None:
+            block = self._blocks[category] = _Block(np)
+        block.put(property_id, feature_vector(np, property_type, price, area, bedrooms, bathrooms,
+                                              location, amenities))
+        self._category_of[property_id] = category
+        self._cards[property_id] = {
+            'id': property_id, 'title': title, 'category': category, 'price': price,
+            'location': location, 'bedrooms': bedrooms, 'area': area, 'image': image
+        }
+
+
+similar_listings = SimilarListingsIndex()
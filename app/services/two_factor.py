@@ -11,16 +11,23 @@ except ImportError:
     MimeText = email.mime.text.MIMEText
     MimeMultipart = email.mime.multipart.MIMEMultipart
 
-# Optional Twilio import
-try:
-    from twilio.rest import Client
-    from twilio.base.exceptions import TwilioRestException
-    TWILIO_AVAILABLE = True
-except ImportError:
-    TWILIO_AVAILABLE = False
-    print("Warning: Twilio not available. SMS functionality will be disabled.")
+# Optional Twilio SDK, imported on first SMS use (it is slow to import)
+_twilio_sdk = None
+
+def load_twilio():
+    """Return (Client, TwilioRestException), or None when Twilio is not installed"""
+    global _twilio_sdk
+    if _twilio_sdk is None:
+        try:
+            from twilio.rest import Client
+            from twilio.base.exceptions import TwilioRestException
+            _twilio_sdk = (Client, TwilioRestException)
+        except ImportError:
+            _twilio_sdk = False
+    return _twilio_sdk or None
 
 from flask import current_app, flash
+from app.profiling import external_call
 
 class TwoFactorService:
     """Service class for handling 2FA operations"""
@@ -113,7 +120,7 @@ class TwoFactorService:
             message.attach(text_part)
             message.attach(html_part)
             
-            with smtplib.SMTP(smtp_server, smtp_port) as server:
+            with external_call('smtp'), smtplib.SMTP(smtp_server, smtp_port) as server:
                 server.starttls()
                 server.login(sender_email, sender_password)
                 server.send_message(message)
@@ -134,10 +141,12 @@ class TwoFactorService:
         print(f"Target Phone: {phone}")
         print(f"User Name: {name}")
         
-        if not TWILIO_AVAILABLE:
+        twilio = load_twilio()
+        if not twilio:
             print("❌ ERROR: Twilio library not installed")
             current_app.logger.error("Twilio not available for SMS")
             return False
+        Client, TwilioRestException = twilio
             
         try:
             # Get configuration
@@ -186,9 +195,10 @@ class TwoFactorService:
             print(f"  To: {formatted_phone}")
             print(f"  Channel: sms")
             
-            verification = client.verify.v2.services(verify_service_sid) \
-                .verifications \
-                .create(to=formatted_phone, channel='sms')
+            with external_call('twilio'):
+                verification = client.verify.v2.services(verify_service_sid) \
+                    .verifications \
+                    .create(to=formatted_phone, channel='sms')
             
             print(f"\n✅ SUCCESS! Verification request sent")
             print(f"  Verification SID: {verification.sid}")
@@ -231,9 +241,11 @@ class TwoFactorService:
         print(f"Phone: {phone}")
         print(f"Code: {otp_code}")
         
-        if not TWILIO_AVAILABLE:
+        twilio = load_twilio()
+        if not twilio:
             print("❌ ERROR: Twilio not available")
             return False
+        Client, TwilioRestException = twilio
             
         try:
             account_sid = current_app.config.get('TWILIO_ACCOUNT_SID')
@@ -259,9 +271,10 @@ class TwoFactorService:
             print(f"Formatted phone: {formatted_phone}")
             print(f"Checking code with Twilio...")
             
-            verification_check = client.verify.v2.services(verify_service_sid) \
-                .verification_checks \
-                .create(to=formatted_phone, code=otp_code)
+            with external_call('twilio'):
+                verification_check = client.verify.v2.services(verify_service_sid) \
+                    .verification_checks \
+                    .create(to=formatted_phone, code=otp_code)
             
             print(f"\nVerification Result:")
             print(f"  Status: {verification_check.status}")
@@ -404,7 +417,7 @@ class TwoFactorService:
             html_part = MimeText(html_content, "html")
             message.attach(html_part)
             
-            with smtplib.SMTP(smtp_server, smtp_port) as server:
+            with external_call('smtp'), smtplib.SMTP(smtp_server, smtp_port) as server:
                 server.starttls()
                 server.login(sender_email, sender_password)
                 server.send_message(message)
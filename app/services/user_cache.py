@@ -0,0 +1,80 @@
+from flask_login import UserMixin
+from app import db
+from app.cache import make_cache
+
+
+class UserSnapshot(UserMixin):
+    """Lightweight, detached copy of the User fields needed on every request"""
+
+    FIELDS = ('id', 'name', 'email', 'phone', 'role', 'is_verified',
+              'two_factor_enabled', 'two_factor_method', 'unread_inquiry_count')
+
+    def __init__(self, **fields):
+        for field in self.FIELDS:
+            setattr(self, field, fields.get(field))
+
+    @classmethod
+    def from_user(cls, user):
+        return cls(**{field: getattr(user, field) for field in cls.FIELDS})
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    def get_model(self):
+        """Load the full User row (for writes and password checks)"""
+        from app.models import User
+        return db.session.get(User, self.id)
+
+    def check_password(self, password):
+        user = self.get_model()
+        return user is not None and user.check_password(password)
+
+    def __repr__(self):
+        return f'<UserSnapshot {self.email}>'
+
+
+class UserCache:
+    """TTL cache of user snapshots used by the Flask-Login user loader"""
+
+    def __init__(self):
+        self.enabled = False
+        self.backend = None
+
+    def init_app(self, app):
+        self.enabled = app.config.get('USER_CACHE_ENABLED', True)
+        self.backend = make_cache(
+            redis_url=app.config.get('USER_CACHE_REDIS_URL'),
+            prefix='settle_space:user:',
+            default_ttl=app.config.get('USER_CACHE_TTL', 300),
+            max_size=app.config.get('USER_CACHE_MAX_SIZE', 10000)
+        )
+
+    def load(self, user_id):
+        """Return a snapshot for user_id, hitting the database only on a miss"""
+        from app.models import User
+
+        if not self.enabled:
+            return db.session.get(User, user_id)
+
+        fields = self.backend.get(str(user_id))
+        if fields is not None:
+            return UserSnapshot(**fields)
+
+        user = db.session.get(User, user_id)
+        if user is None:
+            return None
+
+        snapshot = UserSnapshot.from_user(user)
+        self.backend.set(str(user_id), snapshot.to_dict())
+        return snapshot
+
+    def invalidate(self, user_id):
+        if self.backend is not None:
+            self.backend.delete(str(user_id))
+
+    def clear(self):
+        if self.backend is not None:
+            self.backend.clear()
+
+
+user_cache = UserCache()
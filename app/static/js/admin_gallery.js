@@ -0,0 +1,66 @@
+// Admin review modals: galleries and screenshots are fetched when a modal opens, not with the page
+
+document.addEventListener('DOMContentLoaded', function() {
+    document.querySelectorAll('.modal').forEach(function(modal) {
+        modal.addEventListener('show.bs.modal', function() {
+            modal.querySelectorAll('img[data-src]').forEach(function(img) {
+                img.src = img.dataset.src;
+                img.removeAttribute('data-src');
+            });
+            modal.querySelectorAll('.lazy-gallery[data-gallery-url]').forEach(loadGallery);
+        });
+    });
+});
+
+function loadGallery(container) {
+    const url = container.dataset.galleryUrl;
+    container.removeAttribute('data-gallery-url');  // fetched once per page view
+
+    fetch(url, {headers: {'Accept': 'application/json'}})
+    .then(response => response.json())
+    .then(data => {
+        if (!data.images || !data.images.length) {
+            container.innerHTML = '<p class="text-muted"><i class="fas fa-image me-2"></i>No photos uploaded.</p>';
+            return;
+        }
+        const id = container.dataset.carouselId;
+        const height = container.dataset.height || 300;
+        const carousel = document.createElement('div');
+        carousel.id = id;
+        carousel.className = 'carousel slide mb-3';
+        const inner = document.createElement('div');
+        inner.className = 'carousel-inner rounded';
+        data.images.forEach(function(image, index) {
+            const item = document.createElement('div');
+            item.className = 'carousel-item' + (index === 0 ? ' active' : '');
+            const img = document.createElement('img');
+            img.className = 'd-block w-100';
+            img.style.height = `${height}px`;
+            img.style.objectFit = 'cover';
+            img.alt = 'Property Image';
+            // Only the visible slide loads straight away
+            img.loading = index === 0 ? 'eager' : 'lazy';
+            img.src = image.url;
+            item.appendChild(img);
+            inner.appendChild(item);
+        });
+        carousel.appendChild(inner);
+        if (data.images.length > 1) {
+            ['prev', 'next'].forEach(function(direction) {
+                const button = document.createElement('button');
+                button.className = `carousel-control-${direction}`;
+                button.type = 'button';
+                button.dataset.bsTarget = `#${id}`;
+                button.dataset.bsSlide = direction;
+                button.innerHTML = `<span class="carousel-control-${direction}-icon"></span>`;
+                carousel.appendChild(button);
+            });
+        }
+        container.replaceChildren(carousel);
+    })
+    .catch(error => {
+        console.error('Error:', error);
+        container.dataset.galleryUrl = url;  // try again next time the modal opens
+        container.innerHTML = '<p class="text-danger">Could not load the photos.</p>';
+    });
+}
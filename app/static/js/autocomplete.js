@@ -0,0 +1,55 @@
+// Suggestions for inputs marked data-autocomplete="search|location" (filled into a <datalist>)
+
+document.addEventListener('DOMContentLoaded', function() {
+    const script = document.getElementById('autocomplete-script');
+    const endpoint = script ? script.dataset.url : '/autocomplete';
+    // The server sends cache headers too; this also skips the round trip within the page
+    const cache = new Map();
+
+    document.querySelectorAll('input[data-autocomplete]').forEach(function(input) {
+        const field = input.dataset.autocomplete;
+        const list = document.createElement('datalist');
+        list.id = `${input.id || field}-suggestions`;
+        input.after(list);
+        input.setAttribute('list', list.id);
+
+        let timer = null;
+        let latest = '';
+
+        function render(suggestions) {
+            list.replaceChildren(...suggestions.map(function(suggestion) {
+                const option = document.createElement('option');
+                option.value = suggestion.term;
+                option.label = `${suggestion.count} listing${suggestion.count === 1 ? '' : 's'}`;
+                return option;
+            }));
+        }
+
+        function load(prefix) {
+            const key = `${field}:${prefix}`;
+            if (cache.has(key)) {
+                render(cache.get(key));
+                return;
+            }
+            fetch(`${endpoint}?${new URLSearchParams({q: prefix, field: field})}`)
+                .then(response => response.json())
+                .then(data => {
+                    cache.set(key, data.suggestions);
+                    if (prefix === latest) {
+                        render(data.suggestions);
+                    }
+                })
+                .catch(error => console.error('Error:', error));
+        }
+
+        input.addEventListener('input', function() {
+            latest = input.value.trim().toLowerCase().replace(/\s+/g, ' ');
+            clearTimeout(timer);
+            if (!latest) {
+                render([]);
+                return;
+            }
+            timer = setTimeout(() => load(latest), 120);
+        });
+    });
+});
@@ -0,0 +1,34 @@
+// Favorite hearts on listing cards (state is rendered server-side from favorite_ids)
+
+document.addEventListener('DOMContentLoaded', function() {
+    const tokenMeta = document.querySelector('meta[name=csrf-token]');
+    if (!tokenMeta) {
+        return;
+    }
+
+    document.querySelectorAll('.favorite-btn[data-property-id]').forEach(function(btn) {
+        btn.addEventListener('click', function(e) {
+            // Cards navigate on click; keep the heart from opening the listing
+            e.preventDefault();
+            e.stopPropagation();
+
+            fetch(`/customer/toggle-favorite/${btn.dataset.propertyId}`, {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                    'X-CSRFToken': tokenMeta.getAttribute('content')
+                }
+            })
+            .then(response => response.json())
+            .then(data => {
+                const icon = btn.querySelector('i');
+                icon.classList.toggle('fas', data.is_favorite);
+                icon.classList.toggle('far', !data.is_favorite);
+                btn.classList.toggle('text-danger', data.is_favorite);
+                btn.setAttribute('aria-pressed', data.is_favorite ? 'true' : 'false');
+                btn.title = data.is_favorite ? 'Remove from favorites' : 'Add to favorites';
+            })
+            .catch(error => console.error('Error:', error));
+        });
+    });
+});
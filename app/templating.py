@@ -0,0 +1,26 @@
+import os
+
+from jinja2 import FileSystemBytecodeCache
+
+
+def init_app(app):
+    """Share compiled templates across workers through an on-disk bytecode cache"""
+    cache_dir = app.config.get('TEMPLATE_BYTECODE_CACHE_DIR')
+    if not cache_dir:
+        return
+    if not os.path.isabs(cache_dir):
+        cache_dir = os.path.join(app.instance_path, cache_dir)
+    os.makedirs(cache_dir, exist_ok=True)
+
+    # Must be set before app.jinja_env is first created
+    app.jinja_options = dict(app.jinja_options, bytecode_cache=FileSystemBytecodeCache(cache_dir))
+
+
+def preload_templates(app):
+    """Compile every template up front so the first requests after a (re)start don't pay for it"""
+    env = app.jinja_env
+    names = env.list_templates(filter_func=lambda name: name.endswith('.html'))
+    for name in names:
+        env.get_template(name)
+    app.logger.debug(f'Preloaded {len(names)} templates')
+    return len(names)
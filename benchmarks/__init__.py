@@ -0,0 +1 @@
+# Benchmarks package - run scripts with `python -m benchmarks.<name>` from the repository root
@@ -0,0 +1,121 @@
+"""Shared helpers for the benchmark scripts (run them from the repository root)"""
+
+import os
+import json
+import tempfile
+import time
+from datetime import datetime
+
+from config import Config
+
+
+def make_config(db_path, **overrides):
+    """Build a config class pointing at db_path with CSRF disabled for scripted clients"""
+    attrs = {
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.abspath(db_path),
+        'WTF_CSRF_ENABLED': False,
+        'TESTING': True
+    }
+    attrs.update(overrides)
+    return type('BenchmarkConfig', (Config,), attrs)
+
+
+def make_app(db_path=None, **overrides):
+    """Create the app against a (temporary) SQLite file and create all tables"""
+    from app import create_app, db
+
+    workdir = tempfile.mkdtemp(prefix='settle_bench_')
+    if db_path is None:
+        db_path = os.path.join(workdir, 'bench.db')
+    app = create_app(make_config(db_path, **overrides))
+    # Keep uploads out of the real instance folder
+    app.instance_path = os.path.join(workdir, 'instance')
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def seed_basic(app, customers=20, sellers=5, properties=200, password='Bench@123'):
+    """Seed a small, deterministic dataset of approved listings"""
+    from app import db
+    from app.models import User, Property
+
+    with app.app_context():
+        # Hash once and reuse it; hashing per user would dominate seeding time
+        template = User(name='x', email='x', phone='x')
+        template.set_password(password)
+        password_hash = template.password_hash
+
+        users = []
+        for i in range(customers):
+            users.append(User(name=f'Customer {i}', email=f'customer{i}@bench.settlespace.com', phone=f'90000{i:05d}',
+                              role='customer', is_verified=True, two_factor_enabled=False,
+                              password_hash=password_hash))
+        for i in range(sellers):
+            users.append(User(name=f'Seller {i}', email=f'seller{i}@bench.settlespace.com', phone=f'80000{i:05d}',
+                              role='seller', is_verified=True, two_factor_enabled=False,
+                              upi_id=f'seller{i}@paytm', password_hash=password_hash))
+        users.append(User(name='Bench Admin', email='admin@bench.settlespace.com', phone='7000000000',
+                          role='admin', is_verified=True, two_factor_enabled=False,
+                          password_hash=password_hash))
+        db.session.add_all(users)
+        db.session.flush()
+
+        seller_ids = [u.id for u in users if u.role == 'seller']
+        categories = ['buy', 'rent', 'pg']
+        locations = ['Andheri West, Mumbai', 'Koramangala, Bangalore', 'Baner, Pune', 'Salt Lake, Kolkata']
+        for i in range(properties):
+            category = categories[i % 3]
+            db.session.add(Property(
+                title=f'Benchmark listing number {i}',
+                description='A benchmark property description. ' * 4,
+                category=category,
+                property_type='apartment',
+                price=10000 + (i * 137) % 90000,
+                location=locations[i % len(locations)],
+                area=500 + (i * 31) % 1500,
+                bedrooms=1 + i % 4,
+                bathrooms=1 + i % 3,
+                amenities='Parking, Gym, Lift',
+                seller_id=seller_ids[i % len(seller_ids)],
+                status='approved',
+                is_featured=(i % 10 == 0),
+                approved_at=datetime.utcnow()
+            ))
+        db.session.commit()
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def summarize(latencies, errors, elapsed):
+    """Throughput and latency percentiles (ms) for one flow"""
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'throughput_rps': round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2)
+    }
+
+
+def write_results(results, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+
+class Timer:
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
+        return False
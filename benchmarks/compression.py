@@ -0,0 +1,91 @@
+"""
+Bytes on the wire and CPU cost of response compression per page
+Usage: python -m benchmarks.compression [--levels 1 6 9] [--repeat 50] [--output results.json]
+
+Fetches the heaviest pages uncompressed (anonymous home/listings/detail, the
+admin user and property tables, a JSON endpoint), then compresses each body
+--repeat times per level and encoding with the same code the middleware uses.
+Reports raw and compressed sizes, the ratio and the CPU time per response.
+"""
+
+import argparse
+import os
+import time
+from datetime import datetime
+
+from benchmarks.common import make_app, seed_basic, write_results
+
+PASSWORD = 'Bench@123'
+
+PAGES = [
+    ('home', None, '/'),
+    ('listings', None, '/properties'),
+    ('listings_page_3', None, '/properties?page=3'),
+    ('property_detail', 'customer', '/property/1'),
+    ('admin_users', 'admin', '/admin/manage-users'),
+    ('admin_properties', 'admin', '/admin/all-properties'),
+    ('customer_favorites', 'customer', '/customer/favorites'),
+    ('metrics_text', None, '/metrics')
+]
+
+
+def fetch_bodies(app):
+    clients = {None: app.test_client(), 'admin': app.test_client(), 'customer': app.test_client()}
+    for role, email in (('admin', 'admin@bench.settlespace.com'), ('customer', 'customer0@bench.settlespace.com')):
+        response = clients[role].post('/auth/login', data={'email': email, 'password': PASSWORD})
+        if response.status_code != 302:
+            raise RuntimeError(f'login failed for {email}')
+
+    bodies = {}
+    for name, role, url in PAGES:
+        response = clients[role].get(url, headers={'Accept-Encoding': 'identity'})
+        if response.status_code != 200:
+            print(f'  skipping {name}: {url} returned {response.status_code}')
+            continue
+        bodies[name] = (response.mimetype, response.get_data())
+    return bodies
+
+
+def measure(data, encoding, level, repeat):
+    from app.compression import compress
+
+    start = time.process_time()
+    for _ in range(repeat):
+        compressed = compress(data, encoding, level)
+    cpu_ms = (time.process_time() - start) * 1000 / repeat
+    return len(compressed), cpu_ms
+
+
+def main():
+    from app.compression import BROTLI_AVAILABLE
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--levels', type=int, nargs='+', default=[1, 6, 9])
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--output', default=os.path.join('benchmarks', 'results', f"compression-{datetime.utcnow():%Y%m%d-%H%M%S}.json"))
+    args = parser.parse_args()
+
+    app = make_app(COMPRESS_ENABLED=False)
+    seed_basic(app, properties=300, password=PASSWORD)
+    bodies = fetch_bodies(app)
+
+    encodings = ['gzip'] + (['br'] if BROTLI_AVAILABLE else [])
+    results = {}
+    print(f"{'page':<20} {'type':<12} {'raw B':>9} {'enc':>5} {'lvl':>4} {'wire B':>8} {'ratio':>7} {'cpu ms':>8}")
+    for name, (mimetype, data) in bodies.items():
+        results[name] = {'mimetype': mimetype, 'raw_bytes': len(data), 'compressed': []}
+        for encoding in encodings:
+            for level in args.levels:
+                size, cpu_ms = measure(data, encoding, level, args.repeat)
+                results[name]['compressed'].append(
+                    {'encoding': encoding, 'level': level, 'bytes': size, 'cpu_ms': round(cpu_ms, 3)})
+                print(f'{name:<20} {mimetype:<12} {len(data):>9} {encoding:>5} {level:>4} {size:>8} '
+                      f'{len(data) / size:>6.1f}x {cpu_ms:>8.3f}')
+
+    write_results({'meta': {'timestamp': datetime.utcnow().isoformat(), 'repeat': args.repeat},
+                   'pages': results}, args.output)
+    print(f'\nResults written to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+"""
+Throughput and peak memory of processing uploaded listing photos
+Usage: python -m benchmarks.image_uploads [--images 6] [--megapixels 12] [--output results.json]
+
+Writes --images synthetic phone-sized JPEGs (half of them stored sideways
+with EXIF orientation 6, all carrying EXIF camera data), then runs each
+variant in a fresh process:
+
+  original         Image.open + thumbnail + save (the old upload code)
+  transpose_first  ImageOps.exif_transpose on the opened file, then thumbnail
+                   (the obvious orientation fix, which forces a full decode)
+  process_upload   app.services.images.process_upload
+
+For each variant it reports source megapixels per second, CPU ms per image,
+the peak RSS growth of the process, and whether every output is upright
+and free of EXIF.
+"""
+
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.common import write_results
+
+VARIANTS = ['original', 'transpose_first', 'process_upload']
+ORIENTATION_TAG = 0x0112
+
+
+def write_sources(directory, count, megapixels):
+    """Landscape photos with smooth texture; odd ones are stored sideways with orientation 6"""
+    from PIL import Image
+
+    width = int((megapixels * 1e6 * 4 / 3) ** 0.5)
+    height = int(width * 3 / 4)
+    paths = []
+    for i in range(count):
+        # Noise upscaled from 1/8 size gives photo-like detail rather than incompressible static
+        texture = Image.effect_noise((width // 8, height // 8), 40 + i * 5).resize((width, height), Image.Resampling.BICUBIC)
+        gradient = Image.linear_gradient('L').resize((width, height))
+        image = Image.merge('RGB', (texture, gradient, gradient.transpose(Image.Transpose.FLIP_LEFT_RIGHT)))
+        exif = Image.Exif()
+        exif[0x010F] = 'BenchCam'  # Make
+        exif[0x0110] = 'Phone 12'  # Model
+        if i % 2:
+            # Stored portrait; orientation 6 (rotate 90 degrees clockwise) shows it as landscape again
+            image = image.transpose(Image.Transpose.ROTATE_90)
+            exif[ORIENTATION_TAG] = 6
+        path = os.path.join(directory, f'source_{i}.jpg')
+        image.save(path, quality=90, exif=exif)
+        paths.append(path)
+    return paths, width * height / 1e6
+
+
+def run_original(source, destination):
+    from PIL import Image
+
+    image = Image.open(source)
+    image.thumbnail((800, 600), Image.Resampling.LANCZOS)
+    image.save(destination, optimize=True, quality=85)
+
+
+def run_transpose_first(source, destination):
+    from PIL import Image, ImageOps
+
+    image = ImageOps.exif_transpose(Image.open(source))
+    image.thumbnail((800, 600), Image.Resampling.LANCZOS)
+    image.save(destination, optimize=True, quality=85)
+
+
+def run_process_upload(source, destination):
+    from app.services.images import process_upload
+
+    with open(source, 'rb') as stream:
+        process_upload(stream, destination)
+
+
+def memory_kb(field):
+    """VmRSS or VmHWM (peak) of this process from /proc (Linux)"""
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith(field + ':'):
+                return int(line.split()[1])
+    return 0
+
+
+def measure(variant, sources, megapixels, output_dir, results):
+    """Runs in a spawned process so the peak RSS only reflects this variant"""
+    from PIL import Image
+    import app.services.images  # noqa: F401  (import cost stays out of the baseline)
+
+    run = globals()[f'run_{variant}']
+    baseline_kb = memory_kb('VmRSS')
+    wall = 0.0
+    cpu = 0.0
+    outputs = []
+    for i, source in enumerate(sources):
+        destination = os.path.join(output_dir, f'{variant}_{i}.jpg')
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        run(source, destination)
+        wall += time.perf_counter() - wall_start
+        cpu += time.process_time() - cpu_start
+        outputs.append(destination)
+    peak_kb = memory_kb('VmHWM')
+
+    upright = 0
+    stripped = 0
+    for path in outputs:
+        with Image.open(path) as image:
+            upright += image.width > image.height
+            stripped += not image.getexif() and 'icc_profile' not in image.info
+    results[variant] = {
+        'megapixels_per_s': round(megapixels * len(sources) / wall, 1),
+        'cpu_ms_per_image': round(cpu * 1000 / len(sources), 1),
+        'peak_rss_growth_mb': round((peak_kb - baseline_kb) / 1024, 1),
+        'upright': f'{upright}/{len(outputs)}',
+        'metadata_stripped': f'{stripped}/{len(outputs)}'
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--images', type=int, default=6)
+    parser.add_argument('--megapixels', type=float, default=12)
+    parser.add_argument('--output', default=os.path.join('benchmarks', 'results', f"image-uploads-{datetime.utcnow():%Y%m%d-%H%M%S}.json"))
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='settle_images_')
+    sources, megapixels = write_sources(workdir, args.images, args.megapixels)
+    print(f'{len(sources)} source JPEGs of {megapixels:.1f} MP in {workdir}')
+
+    context = multiprocessing.get_context('spawn')
+    with context.Manager() as manager:
+        shared = manager.dict()
+        for variant in VARIANTS:
+            process = context.Process(target=measure, args=(variant, sources, megapixels, workdir, shared))
+            process.start()
+            process.join()
+        results = dict(shared)
+
+    print(f"\n{'variant':<16} {'MP/s':>8} {'CPU ms/img':>11} {'peak RSS MB':>12} {'upright':>8} {'no EXIF':>8}")
+    for variant in VARIANTS:
+        r = results[variant]
+        print(f"{variant:<16} {r['megapixels_per_s']:>8} {r['cpu_ms_per_image']:>11} {r['peak_rss_growth_mb']:>12} "
+              f"{r['upright']:>8} {r['metadata_stripped']:>8}")
+
+    write_results({'meta': {'timestamp': datetime.utcnow().isoformat(), 'images': len(sources),
+                            'megapixels': round(megapixels, 1)},
+                   'variants': results}, args.output)
+    print(f'\nResults written to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,278 @@
+"""
+Load test of the main user journeys against a seeded SQLite database
+Usage: python -m benchmarks.journeys [--duration 20] [--workers 2] [--sqlite-profile production]
+                                     [--output results.json]
+                                     [--baseline previous.json --max-regression 0.25]
+
+Boots the app against a fresh database with local SMTP/Twilio stand-ins and
+drives every flow concurrently with its own worker threads:
+
+  homepage          anonymous GET /
+  search            anonymous GET /properties with random filters
+  login_2fa         login with email 2FA, OTP read back from the fake outbox
+  favorite_toggle   logged-in customer toggling favorites
+  submit_property   seller submitting a listing with three photos
+  admin_moderation  admin opening the review queue and approving a listing
+
+Throughput and p50/p95/p99 per flow are printed and written as JSON. With
+--baseline the run exits non-zero when a flow's p95 or throughput regresses
+by more than --max-regression.
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+
+from benchmarks import stubs
+from benchmarks.common import make_app, seed_basic, summarize, write_results
+
+PASSWORD = 'Bench@123'
+SEARCH_TERMS = ['', 'Benchmark', 'Mumbai', 'Pune', 'listing']
+LOCATIONS = ['', 'Andheri', 'Koramangala', 'Baner']
+
+
+def make_jpeg(seed, size=(1600, 1200)):
+    from PIL import Image
+
+    rng = random.Random(seed)
+    image = Image.new('RGB', size, (rng.randint(0, 255), rng.randint(0, 255), rng.randint(0, 255)))
+    buffer = io.BytesIO()
+    image.save(buffer, 'JPEG', quality=90)
+    return buffer.getvalue()
+
+
+def login(client, email):
+    response = client.post('/auth/login', data={'email': email, 'password': PASSWORD})
+    if response.status_code != 302:
+        raise RuntimeError(f'login failed for {email}: {response.status_code}')
+
+
+class Journeys:
+    """One method per flow; each call performs (and is timed as) one iteration"""
+
+    def __init__(self, app, scale):
+        from app import db
+        from app.models import Property, User
+
+        self.app = app
+        self.scale = scale
+        self.photos = [make_jpeg(i) for i in range(3)]
+        self._twofa_counter = 0
+        self._lock = threading.Lock()
+
+        with app.app_context():
+            self.customer_emails = [u.email for u in User.query.filter_by(role='customer', two_factor_enabled=False)]
+            self.twofa_emails = [u.email for u in User.query.filter_by(role='customer', two_factor_enabled=True)]
+            self.seller_emails = [u.email for u in User.query.filter_by(role='seller')]
+            self.admin_email = User.query.filter_by(role='admin').first().email
+            self.property_ids = [p.id for p in Property.query.filter_by(status='approved')]
+            db.session.remove()
+
+    def setup_worker(self, flow, index):
+        """Per-thread state: a test client, logged in when the flow needs it"""
+        client = self.app.test_client()
+        if flow == 'favorite_toggle':
+            login(client, self.customer_emails[index % len(self.customer_emails)])
+        elif flow == 'submit_property':
+            login(client, self.seller_emails[index % len(self.seller_emails)])
+        elif flow == 'admin_moderation':
+            login(client, self.admin_email)
+        return {'client': client, 'rng': random.Random(hash((flow, index)))}
+
+    def homepage(self, state):
+        return state['client'].get('/').status_code == 200
+
+    def search(self, state):
+        rng = state['rng']
+        params = {
+            'search': rng.choice(SEARCH_TERMS),
+            'category': rng.choice(['', 'buy', 'rent', 'pg']),
+            'location': rng.choice(LOCATIONS),
+            'page': rng.randint(1, 3)
+        }
+        return state['client'].get('/properties', query_string=params).status_code == 200
+
+    def login_2fa(self, state):
+        with self._lock:
+            email = self.twofa_emails[self._twofa_counter % len(self.twofa_emails)]
+            self._twofa_counter += 1
+        client = self.app.test_client()
+        response = client.post('/auth/login', data={'email': email, 'password': PASSWORD})
+        if response.status_code != 302:
+            return False
+        otp = stubs.outbox.latest_otp(email)
+        response = client.post('/auth/verify-2fa', data={'otp_code': otp})
+        if response.status_code != 302:
+            return False
+        return client.get(response.headers['Location']).status_code == 200
+
+    def favorite_toggle(self, state):
+        property_id = state['rng'].choice(self.property_ids)
+        response = state['client'].post(f'/customer/toggle-favorite/{property_id}')
+        return response.status_code == 200
+
+    def submit_property(self, state):
+        rng = state['rng']
+        data = {
+            'title': f'Load test listing {rng.randint(1, 10 ** 6)}',
+            'description': 'Spacious and well lit home close to schools, shops and transit. ' * 3,
+            'category': rng.choice(['buy', 'rent', 'pg']),
+            'property_type': 'apartment',
+            'price': rng.randint(5000, 90000),
+            'location': 'Baner, Pune',
+            'area': rng.randint(400, 2000),
+            'bedrooms': rng.randint(1, 4),
+            'bathrooms': rng.randint(1, 3),
+            'amenities': 'Parking, Gym, Lift',
+            'images': [(io.BytesIO(photo), f'photo{i}.jpg') for i, photo in enumerate(self.photos)]
+        }
+        response = state['client'].post('/seller/add-property', data=data, content_type='multipart/form-data')
+        return response.status_code == 302 and '/seller/payment/' in response.headers.get('Location', '')
+
+    def admin_moderation(self, state):
+        from app.models import Property
+
+        client = state['client']
+        if client.get('/admin/pending-properties').status_code != 200:
+            return False
+        with self.app.app_context():
+            pending = Property.query.filter_by(status='pending').with_entities(Property.id).first()
+            property_id = pending[0] if pending else state['rng'].choice(self.property_ids)
+        response = client.post(f'/admin/property/{property_id}/status', json={'status': 'approved'})
+        return response.status_code == 200 and response.get_json().get('success')
+
+
+FLOWS = ['homepage', 'search', 'login_2fa', 'favorite_toggle', 'submit_property', 'admin_moderation']
+
+
+def seed(app, scale):
+    from app import db
+    from app.models import User
+
+    seed_basic(app, customers=20 * scale, sellers=5 * scale, properties=200 * scale, password=PASSWORD)
+    with app.app_context():
+        template = User(name='x', email='x', phone='x')
+        template.set_password(PASSWORD)
+        for i in range(10 * scale):
+            db.session.add(User(name=f'Secure Customer {i}', email=f'secure{i}@bench.settlespace.com', phone=f'91000{i:05d}',
+                                role='customer', is_verified=True, two_factor_enabled=True,
+                                two_factor_method='email', password_hash=template.password_hash))
+        db.session.commit()
+
+
+def run(flows, workers, duration, scale, sqlite_profile='default'):
+    stubs.install()
+    app = make_app(SQLITE_PROFILE=sqlite_profile, **stubs.STUB_CONFIG)
+    seed(app, scale)
+    journeys = Journeys(app, scale)
+
+    stop = threading.Event()
+    samples = {flow: [] for flow in flows}
+    errors = {flow: 0 for flow in flows}
+    lock = threading.Lock()
+
+    def worker(flow, index):
+        state = journeys.setup_worker(flow, index)
+        step = getattr(journeys, flow)
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                ok = step(state)
+            except Exception:
+                ok = False
+            elapsed = time.perf_counter() - start
+            with lock:
+                if ok:
+                    samples[flow].append(elapsed)
+                else:
+                    errors[flow] += 1
+
+    threads = [threading.Thread(target=worker, args=(flow, i)) for flow in flows for i in range(workers)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    time.sleep(duration)
+    stop.set()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    return {flow: summarize(samples[flow], errors[flow], elapsed) for flow in flows}
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, max_regression):
+    """Return a list of human readable regressions against a previous run"""
+    regressions = []
+    for flow, stats in results['flows'].items():
+        previous = baseline.get('flows', {}).get(flow)
+        if not previous:
+            continue
+        if previous['p95_ms'] and stats['p95_ms'] > previous['p95_ms'] * (1 + max_regression):
+            regressions.append(f"{flow}: p95 {previous['p95_ms']}ms -> {stats['p95_ms']}ms")
+        if previous['throughput_rps'] and stats['throughput_rps'] < previous['throughput_rps'] * (1 - max_regression):
+            regressions.append(f"{flow}: throughput {previous['throughput_rps']} -> {stats['throughput_rps']} rps")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--flows', nargs='+', default=FLOWS, choices=FLOWS)
+    parser.add_argument('--workers', type=int, default=2, help='threads per flow')
+    parser.add_argument('--duration', type=float, default=20.0, help='seconds')
+    parser.add_argument('--scale', type=int, default=1, help='multiplier for the seeded dataset')
+    parser.add_argument('--sqlite-profile', default='default', help='SQLite engine profile (see app/database.py)')
+    parser.add_argument('--output', default=os.path.join('benchmarks', 'results', f"journeys-{datetime.utcnow():%Y%m%d-%H%M%S}.json"))
+    parser.add_argument('--baseline', help='previous results file to compare against')
+    parser.add_argument('--max-regression', type=float, default=0.25)
+    args = parser.parse_args()
+
+    flows = run(args.flows, args.workers, args.duration, args.scale, args.sqlite_profile)
+    results = {
+        'meta': {
+            'timestamp': datetime.utcnow().isoformat(),
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'workers': args.workers,
+            'duration': args.duration,
+            'scale': args.scale,
+            'sqlite_profile': args.sqlite_profile
+        },
+        'flows': flows
+    }
+
+    print(f"\n{'flow':<18} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'ok':>7} {'errors':>7}")
+    for flow, stats in flows.items():
+        print(f"{flow:<18} {stats['throughput_rps']:>8} {stats['p50_ms']:>9} {stats['p95_ms']:>9} "
+              f"{stats['p99_ms']:>9} {stats['requests']:>7} {stats['errors']:>7}")
+
+    write_results(results, args.output)
+    print(f'\nResults written to {args.output}')
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.max_regression)
+        if regressions:
+            print('\nRegressions beyond {:.0%}:'.format(args.max_regression))
+            for line in regressions:
+                print('  ' + line)
+            sys.exit(1)
+        print('\nNo regressions against baseline.')
+
+
+if __name__ == '__main__':
+    main()
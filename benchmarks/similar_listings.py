@@ -0,0 +1,140 @@
+"""
+Build time and lookup latency of the similar-listings index
+Usage: python -m benchmarks.similar_listings [--listings 100000] [--lookups 2000] [--output results.json]
+
+Bulk-inserts --listings approved properties with varied types, prices,
+locations and amenities, builds the index, then times lookups for random
+properties twice: cold (memo cleared before every lookup, i.e. the
+vectorized distance pass) and warm (memoised, second pass). It also counts the SQL
+statements of one property detail request to confirm the panel adds none.
+"""
+
+import argparse
+import os
+import random
+import time
+from datetime import datetime
+
+from sqlalchemy import event
+
+from benchmarks.common import make_app, percentile, seed_basic, write_results
+
+PASSWORD = 'Bench@123'
+TYPES = {'buy': ['apartment', 'house', 'villa', 'plot'], 'rent': ['apartment', 'house', 'office', 'shop'],
+         'pg': ['pg', 'hostel']}
+AREAS = ['Andheri West', 'Bandra West', 'Powai', 'Koramangala', 'Indiranagar', 'Whitefield', 'Baner',
+         'Hinjewadi', 'Dwarka', 'Saket', 'Gachibowli', 'Adyar', 'Salt Lake', 'New Town']
+CITIES = ['Mumbai', 'Bangalore', 'Pune', 'Delhi', 'Hyderabad', 'Chennai', 'Kolkata']
+AMENITIES = ['Parking', 'Gym', 'Swimming Pool', 'Lift', 'Power Backup', 'Security', 'Garden', 'WiFi', 'Meals']
+
+
+def seed_listings(app, count, rng):
+    from app import db
+    from app.models import Property, User
+
+    with app.app_context():
+        seller_id = User.query.filter_by(role='seller').first().id
+        table = Property.__table__
+        now = datetime.utcnow()
+        for start in range(0, count, 5000):
+            rows = []
+            for _ in range(min(5000, count - start)):
+                category = rng.choice(list(TYPES))
+                bedrooms = rng.randint(1, 5)
+                rows.append({
+                    'title': f'{bedrooms}BHK in {rng.choice(AREAS)}', 'description': 'Benchmark listing',
+                    'category': category, 'property_type': rng.choice(TYPES[category]),
+                    'price': int(rng.lognormvariate({'buy': 15.5, 'rent': 10, 'pg': 9}[category], 0.5)),
+                    'location': f'{rng.choice(AREAS)}, {rng.choice(CITIES)}',
+                    'area': rng.randint(300, 3000), 'bedrooms': bedrooms, 'bathrooms': rng.randint(1, 4),
+                    'amenities': ', '.join(rng.sample(AMENITIES, rng.randint(2, 6))), 'seller_id': seller_id,
+                    'status': 'approved', 'created_at': now, 'approved_at': now, 'is_featured': False,
+                    'favorite_count': 0, 'meal_included': False
+                })
+            db.session.execute(table.insert(), rows)
+        db.session.commit()
+
+
+def time_lookups(index, ids, clear_memo):
+    latencies = []
+    for property_id in ids:
+        if clear_memo:
+            for block in index._blocks.values():
+                block.memo.clear()
+        start = time.perf_counter()
+        index.similar_to(property_id)
+        latencies.append(time.perf_counter() - start)
+    return {'p50_us': round(percentile(latencies, 50) * 1e6, 1),
+            'p95_us': round(percentile(latencies, 95) * 1e6, 1),
+            'p99_us': round(percentile(latencies, 99) * 1e6, 1)}
+
+
+def count_detail_queries(app, property_id):
+    from app import db
+
+    client = app.test_client()
+    response = client.post('/auth/login', data={'email': 'customer0@bench.settlespace.com', 'password': PASSWORD})
+    if response.status_code != 302:
+        raise RuntimeError('login failed')
+    statements = []
+    with app.app_context():
+        engine = db.engine
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    client.get(f'/property/{property_id}')  # warm the user cache and templates
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        response = client.get(f'/property/{property_id}')
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+    return response.status_code, len(statements), b'No similar properties yet' not in response.data
+
+
+def main():
+    from app.services.similar_listings import similar_listings
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--listings', type=int, default=100000)
+    parser.add_argument('--lookups', type=int, default=2000)
+    parser.add_argument('--output', default=os.path.join('benchmarks', 'results', f"similar-listings-{datetime.utcnow():%Y%m%d-%H%M%S}.json"))
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    # A long refresh interval keeps the background worker out of the measurements
+    app = make_app(SIMILAR_LISTINGS_REFRESH_INTERVAL=3600)
+    seed_basic(app, customers=1, sellers=1, properties=0, password=PASSWORD)
+    seed_listings(app, args.listings, rng)
+
+    with app.app_context():
+        start = time.perf_counter()
+        indexed = similar_listings.rebuild()
+        build_s = time.perf_counter() - start
+    print(f'Indexed {indexed} listings in {build_s:.2f}s')
+
+    similar_listings._ensure_worker()
+    ids = [rng.randint(1, args.listings) for _ in range(args.lookups)]
+    cold = time_lookups(similar_listings, ids, clear_memo=True)
+    time_lookups(similar_listings, ids, clear_memo=False)
+    warm = time_lookups(similar_listings, ids, clear_memo=False)
+    print(f"cold lookup: p50 {cold['p50_us']} us  p95 {cold['p95_us']} us  p99 {cold['p99_us']} us")
+    print(f"warm lookup: p50 {warm['p50_us']} us  p95 {warm['p95_us']} us  p99 {warm['p99_us']} us")
+
+    status, with_panel, rendered = count_detail_queries(app, ids[0])
+    similar_listings.enabled = False
+    _, without_panel, _ = count_detail_queries(app, ids[0])
+    similar_listings.enabled = True
+    print(f'/property/<id>: HTTP {status}, panel rendered: {rendered}, '
+          f'SQL statements {with_panel} (panel disabled: {without_panel})')
+
+    write_results({'meta': {'timestamp': datetime.utcnow().isoformat(), 'listings': indexed,
+                            'lookups': args.lookups},
+                   'build_s': round(build_s, 3), 'cold': cold, 'warm': warm,
+                   'detail_sql_statements': {'with_panel': with_panel, 'without_panel': without_panel}},
+                  args.output)
+    print(f'\nResults written to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""
+Concurrent read/write throughput of the SQLite engine profiles
+Usage: python -m benchmarks.sqlite_concurrency [--readers 8] [--writers 4] [--duration 10]
+
+Readers run the approved-listings page query, writers toggle favorites and
+flip property status, like customers and admins do under load. Each profile
+gets a fresh database so the numbers are comparable.
+"""
+
+import argparse
+import random
+import threading
+import time
+
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from benchmarks.common import make_app, seed_basic, summarize, write_results
+
+
+def run_profile(profile, readers, writers, duration):
+    from app import db
+    from app.models import Favorite, Property, User
+
+    app = make_app(SQLITE_PROFILE=profile, USER_CACHE_ENABLED=False)
+    seed_basic(app)
+
+    with app.app_context():
+        customer_ids = [u.id for u in User.query.filter_by(role='customer').all()]
+        property_ids = [p.id for p in Property.query.all()]
+
+    stop = threading.Event()
+    results = {'read': ([], [0]), 'write': ([], [0])}
+    lock = threading.Lock()
+
+    def reader(seed):
+        rng = random.Random(seed)
+        with app.app_context():
+            while not stop.is_set():
+                start = time.perf_counter()
+                try:
+                    Property.query.filter_by(status='approved').order_by(
+                        Property.created_at.desc()
+                    ).paginate(page=rng.randint(1, 10), per_page=12, error_out=False).items
+                    db.session.rollback()
+                    elapsed = time.perf_counter() - start
+                    with lock:
+                        results['read'][0].append(elapsed)
+                except OperationalError:
+                    db.session.rollback()
+                    with lock:
+                        results['read'][1][0] += 1
+
+    def writer(seed):
+        rng = random.Random(seed)
+        with app.app_context():
+            while not stop.is_set():
+                start = time.perf_counter()
+                try:
+                    if rng.random() < 0.8:
+                        user_id = rng.choice(customer_ids)
+                        property_id = rng.choice(property_ids)
+                        favorite = Favorite.query.filter_by(user_id=user_id, property_id=property_id).first()
+                        if favorite:
+                            db.session.delete(favorite)
+                        else:
+                            db.session.add(Favorite(user_id=user_id, property_id=property_id))
+                    else:
+                        prop = db.session.get(Property, rng.choice(property_ids))
+                        prop.is_featured = not prop.is_featured
+                    db.session.commit()
+                    elapsed = time.perf_counter() - start
+                    with lock:
+                        results['write'][0].append(elapsed)
+                except IntegrityError:
+                    # Two writers raced on the same favorite; not a locking failure
+                    db.session.rollback()
+                except OperationalError:
+                    db.session.rollback()
+                    with lock:
+                        results['write'][1][0] += 1
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    threads += [threading.Thread(target=writer, args=(1000 + i,)) for i in range(writers)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    time.sleep(duration)
+    stop.set()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    with app.app_context():
+        db.engine.dispose()
+
+    return {kind: summarize(latencies, errors[0], elapsed) for kind, (latencies, errors) in results.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds per profile')
+    parser.add_argument('--profiles', nargs='+', default=['default', 'production'])
+    parser.add_argument('--json', help='write results to this file')
+    args = parser.parse_args()
+
+    results = {}
+    for profile in args.profiles:
+        print(f"Running profile '{profile}' ({args.readers} readers, {args.writers} writers, {args.duration}s)...")
+        results[profile] = run_profile(profile, args.readers, args.writers, args.duration)
+
+    print(f"\n{'profile':<12} {'kind':<6} {'ops/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'locked':>8}")
+    for profile, kinds in results.items():
+        for kind, stats in kinds.items():
+            print(f"{profile:<12} {kind:<6} {stats['throughput_rps']:>10} {stats['p50_ms']:>9} "
+                  f"{stats['p95_ms']:>9} {stats['p99_ms']:>9} {stats['errors']:>8}")
+
+    if args.json:
+        write_results(results, args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Cold-start budget for create_app
+Usage: python -m benchmarks.startup [--runs 7] [--budget benchmarks/startup_budget.json] [--top 15]
+
+Starts a fresh interpreter per run that imports the app and calls
+create_app(), and reports the median wall time minus a bare interpreter
+start. Also prints the heaviest imports from `python -X importtime`.
+Exits non-zero when the median exceeds the budget or when a module
+listed as lazy in the budget file gets imported at start-up.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BUDGET = os.path.join(ROOT, 'benchmarks', 'startup_budget.json')
+STARTUP_CODE = 'from app import create_app; create_app()'
+
+
+def timed_run(code):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return (time.perf_counter() - start) * 1000
+
+
+def import_profile():
+    """Parse -X importtime output into {module: (self_us, cumulative_us, depth)}"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', STARTUP_CODE],
+                            cwd=ROOT, check=True, capture_output=True, text=True)
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules[name.strip()] = (int(self_us), int(cumulative_us), depth)
+    return modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=7)
+    parser.add_argument('--budget', default=DEFAULT_BUDGET)
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+
+    with open(args.budget) as f:
+        budget = json.load(f)
+
+    baseline = statistics.median(timed_run('pass') for _ in range(3))
+    samples = [timed_run(STARTUP_CODE) - baseline for _ in range(args.runs)]
+    median = statistics.median(samples)
+
+    modules = import_profile()
+    top_level = sorted(((cumulative, name) for name, (_, cumulative, depth) in modules.items() if depth <= 1),
+                       reverse=True)[:args.top]
+
+    print(f'Heaviest imports during create_app (cumulative):')
+    for cumulative, name in top_level:
+        print(f'  {cumulative / 1000:8.1f} ms  {name}')
+
+    print(f'\ncreate_app cold start: median {median:.0f} ms over {args.runs} runs '
+          f'(min {min(samples):.0f}, max {max(samples):.0f}; interpreter {baseline:.0f} ms excluded)')
+
+    failures = []
+    if median > budget['create_app_ms']:
+        failures.append(f"median {median:.0f} ms exceeds budget of {budget['create_app_ms']} ms")
+    for module in budget.get('lazy_modules', []):
+        if module in modules:
+            failures.append(f'{module} is imported at start-up but should load on first use')
+
+    if failures:
+        print('\nStart-up budget FAILED:')
+        for failure in failures:
+            print('  ' + failure)
+        sys.exit(1)
+    print(f"Within budget ({budget['create_app_ms']} ms).")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""In-process stand-ins for the SMTP server and the Twilio Verify API"""
+
+import re
+import threading
+from types import SimpleNamespace
+
+
+class Outbox:
+    """Thread-safe record of every message 'sent' through FakeSMTP"""
+
+    def __init__(self):
+        self._messages = []
+        self._lock = threading.Lock()
+
+    def add(self, message):
+        with self._lock:
+            self._messages.append(message)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._messages)
+
+    def latest_otp(self, email):
+        with self._lock:
+            messages = list(self._messages)
+        for message in reversed(messages):
+            if message['To'] != email:
+                continue
+            for part in message.walk():
+                if part.get_content_type() == 'text/plain':
+                    match = re.search(r'verification code is: (\d{6})', part.get_payload(decode=True).decode())
+                    if match:
+                        return match.group(1)
+        return None
+
+
+outbox = Outbox()
+
+
+class FakeSMTP:
+    """Drop-in for smtplib.SMTP that records messages instead of sending them"""
+
+    def __init__(self, host='', port=0, *args, **kwargs):
+        self.host = host
+        self.port = port
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.quit()
+        return False
+
+    def starttls(self, *args, **kwargs):
+        return (220, b'ready')
+
+    def login(self, user, password):
+        return (235, b'ok')
+
+    def send_message(self, message, *args, **kwargs):
+        outbox.add(message)
+        return {}
+
+    def sendmail(self, from_addr, to_addrs, msg, *args, **kwargs):
+        return {}
+
+    def noop(self):
+        return (250, b'ok')
+
+    def quit(self):
+        return (221, b'bye')
+
+
+class FakeTwilioRestException(Exception):
+    code = msg = status = uri = None
+
+
+class FakeTwilioClient:
+    """Accepts any Verify request; every check with code 123456 is approved"""
+
+    APPROVED_CODE = '123456'
+
+    def __init__(self, account_sid=None, auth_token=None, *args, **kwargs):
+        self.verify = SimpleNamespace(v2=SimpleNamespace(services=self._service))
+
+    def _service(self, sid):
+        return SimpleNamespace(
+            verifications=SimpleNamespace(create=self._create_verification),
+            verification_checks=SimpleNamespace(create=self._create_check)
+        )
+
+    @staticmethod
+    def _create_verification(to, channel):
+        return SimpleNamespace(sid='VE' + '0' * 32, status='pending', channel=channel, to=to, valid=False)
+
+    @classmethod
+    def _create_check(cls, to, code):
+        approved = code == cls.APPROVED_CODE
+        return SimpleNamespace(sid='VE' + '0' * 32, status='approved' if approved else 'pending', valid=approved)
+
+
+def install():
+    """Route the app's mail and SMS calls to the stand-ins (call before sending anything)"""
+    import smtplib
+    from app.services import two_factor
+
+    smtplib.SMTP = FakeSMTP
+    two_factor._twilio_sdk = (FakeTwilioClient, FakeTwilioRestException)
+
+
+STUB_CONFIG = {
+    'MAIL_SERVER': 'localhost',
+    'MAIL_PORT': 2525,
+    'MAIL_USERNAME': 'bench@settlespace.local',
+    'MAIL_PASSWORD': 'bench',
+    'TWILIO_ACCOUNT_SID': 'AC' + '0' * 32,
+    'TWILIO_AUTH_TOKEN': 'bench',
+    'TWILIO_VERIFY_SERVICE_SID': 'VA' + '0' * 32
+}
@@ -0,0 +1,25 @@
+"""
+Build fingerprinted, minified and precompressed static assets
+Usage: python build_assets.py
+
+Run on every deploy (no network or app database needed). Output goes to
+app/static/dist/ together with manifest.json, which the app reads at start-up.
+"""
+
+import os
+
+from app.assets import build
+
+STATIC_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app', 'static')
+
+if __name__ == '__main__':
+    manifest = build(STATIC_FOLDER)
+    for source, hashed in sorted(manifest.items()):
+        built = os.path.join(STATIC_FOLDER, 'dist', hashed)
+        original = os.path.getsize(os.path.join(STATIC_FOLDER, source))
+        sizes = [f'{os.path.getsize(built)} B min']
+        for suffix in ('.gz', '.br'):
+            if os.path.exists(built + suffix):
+                sizes.append(f'{os.path.getsize(built + suffix)} B {suffix[1:]}')
+        print(f'{source} -> dist/{hashed} ({original} B; {", ".join(sizes)})')
+    print(f'Manifest written to {os.path.join(STATIC_FOLDER, "dist", "manifest.json")}')
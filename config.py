@@ -8,6 +8,10 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///settle_space.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # SQLite engine profile: 'default' (SQLAlchemy defaults) or 'production' (WAL + tuned pragmas)
+    SQLITE_PROFILE = os.environ.get('SQLITE_PROFILE', 'default')
+    SQLITE_PRAGMAS = {}  # per-deployment overrides, e.g. {'busy_timeout': 10000}
+    
     # Mail settings for 2FA and notifications
     MAIL_SERVER = os.environ.get('MAIL_SERVER') or 'smtp.gmail.com'
     MAIL_PORT = int(os.environ.get('MAIL_PORT') or 587)
@@ -49,11 +53,58 @@ class Config:
     SESSION_COOKIE_SAMESITE = 'Lax'
     PERMANENT_SESSION_LIFETIME = 86400  # 24 hours
     
+    # User loader cache (set USER_CACHE_REDIS_URL to share it across workers)
+    USER_CACHE_ENABLED = os.environ.get('USER_CACHE_ENABLED', 'true').lower() in ['true', 'on', '1']
+    USER_CACHE_TTL = int(os.environ.get('USER_CACHE_TTL') or 300)  # seconds
+    USER_CACHE_MAX_SIZE = 10000
+    USER_CACHE_REDIS_URL = os.environ.get('USER_CACHE_REDIS_URL')
+    
     # 2FA settings
     OTP_EXPIRY_MINUTES = 10
     MAX_OTP_ATTEMPTS = 3
     RATE_LIMIT_PER_MINUTE = 5  # Max OTP requests per minute per user
     
+    # Templates: on-disk bytecode cache shared by all workers (relative to the instance folder)
+    TEMPLATE_BYTECODE_CACHE_DIR = os.environ.get('TEMPLATE_BYTECODE_CACHE_DIR', 'jinja_cache')
+    TEMPLATE_PRELOAD = os.environ.get('TEMPLATE_PRELOAD', 'false').lower() in ['true', 'on', '1']
+    
+    # Full-page cache for anonymous visitors (set PAGE_CACHE_REDIS_URL to share it across workers)
+    PAGE_CACHE_ENABLED = os.environ.get('PAGE_CACHE_ENABLED', 'true').lower() in ['true', 'on', '1']
+    PAGE_CACHE_TTL = int(os.environ.get('PAGE_CACHE_TTL') or 300)  # seconds
+    PAGE_CACHE_PROXY_MAX_AGE = int(os.environ.get('PAGE_CACHE_PROXY_MAX_AGE') or 60)  # s-maxage for upstream proxies
+    PAGE_CACHE_MAX_SIZE = 2000
+    PAGE_CACHE_REDIS_URL = os.environ.get('PAGE_CACHE_REDIS_URL')
+    
+    # Property.favorite_count write-behind buffer
+    FAVORITE_COUNT_BUFFER_ENABLED = os.environ.get('FAVORITE_COUNT_BUFFER_ENABLED', 'true').lower() in ['true', 'on', '1']
+    FAVORITE_COUNT_FLUSH_SIZE = int(os.environ.get('FAVORITE_COUNT_FLUSH_SIZE') or 100)  # pending properties
+    FAVORITE_COUNT_FLUSH_INTERVAL = float(os.environ.get('FAVORITE_COUNT_FLUSH_INTERVAL') or 5)  # seconds
+    
+    # Similar listings panel on the property detail page
+    SIMILAR_LISTINGS_ENABLED = os.environ.get('SIMILAR_LISTINGS_ENABLED', 'true').lower() in ['true', 'on', '1']
+    SIMILAR_LISTINGS_COUNT = int(os.environ.get('SIMILAR_LISTINGS_COUNT') or 4)
+    SIMILAR_LISTINGS_REFRESH_INTERVAL = float(os.environ.get('SIMILAR_LISTINGS_REFRESH_INTERVAL') or 60)  # seconds
+    
+    # Search box autocomplete
+    AUTOCOMPLETE_ENABLED = os.environ.get('AUTOCOMPLETE_ENABLED', 'true').lower() in ['true', 'on', '1']
+    AUTOCOMPLETE_MAX_AGE = int(os.environ.get('AUTOCOMPLETE_MAX_AGE') or 300)  # browser cache seconds
+    AUTOCOMPLETE_REFRESH_INTERVAL = float(os.environ.get('AUTOCOMPLETE_REFRESH_INTERVAL') or 60)  # seconds
+    
+    # Seller inquiry digests (flask send-inquiry-digests)
+    INQUIRY_DIGEST_INTERVAL = int(os.environ.get('INQUIRY_DIGEST_INTERVAL') or 900)  # seconds between runs
+    INQUIRY_DIGEST_BATCH_SIZE = int(os.environ.get('INQUIRY_DIGEST_BATCH_SIZE') or 500)  # inquiries per SMTP session
+    INQUIRY_DIGEST_CLAIM_TIMEOUT = int(os.environ.get('INQUIRY_DIGEST_CLAIM_TIMEOUT') or 1800)  # seconds
+    
+    # Response compression (gzip, or brotli when installed)
+    COMPRESS_ENABLED = os.environ.get('COMPRESS_ENABLED', 'true').lower() in ['true', 'on', '1']
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 500))  # bytes
+    COMPRESS_LEVEL = int(os.environ.get('COMPRESS_LEVEL', 6))
+    COMPRESS_BR_LEVEL = int(os.environ.get('COMPRESS_BR_LEVEL', 4))
+    COMPRESS_MIMETYPES = [
+        'text/html', 'text/css', 'text/plain', 'text/xml', 'text/javascript',
+        'application/javascript', 'application/json', 'image/svg+xml'
+    ]
+    
     # Application settings
     SERVER_URL = os.environ.get('SERVER_URL', 'http://localhost:5000')
     ADMIN_EMAIL = os.environ.get('ADMIN_EMAIL', 'admin@settlespace.com')
@@ -61,6 +112,19 @@ class Config:
     # Logging
     LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
     LOG_FILE = os.environ.get('LOG_FILE', 'settle_space.log')
+    
+    # Request profiling (adds Server-Timing headers and logs slow requests/queries as JSON)
+    PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', 'false').lower() in ['true', 'on', '1']
+    PROFILING_SLOW_REQUEST_MS = int(os.environ.get('PROFILING_SLOW_REQUEST_MS') or 500)
+    PROFILING_SLOW_QUERY_MS = int(os.environ.get('PROFILING_SLOW_QUERY_MS') or 100)
+    PROFILING_LOG_FILE = os.environ.get('PROFILING_LOG_FILE')  # defaults to the app logger
+    
+    # Prometheus metrics endpoint (set PROMETHEUS_MULTIPROC_DIR when running several workers)
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() in ['true', 'on', '1']
+    # /metrics answers only these client addresses, or requests with "Authorization: Bearer <METRICS_TOKEN>"
+    METRICS_ALLOWED_IPS = [ip.strip() for ip in os.environ.get('METRICS_ALLOWED_IPS', '127.0.0.1,::1').split(',')
+                           if ip.strip()]
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
 
 class DevelopmentConfig(Config):
     DEBUG = True
@@ -68,6 +132,8 @@ class DevelopmentConfig(Config):
 class ProductionConfig(Config):
     DEBUG = False
     SESSION_COOKIE_SECURE = True
+    SQLITE_PROFILE = os.environ.get('SQLITE_PROFILE', 'production')
+    TEMPLATE_PRELOAD = os.environ.get('TEMPLATE_PRELOAD', 'true').lower() in ['true', 'on', '1']
     
 class TestingConfig(Config):
     TESTING = True
@@ -0,0 +1,434 @@
+"""
+Generate a large, deterministic synthetic dataset for capacity testing
+Usage: python generate_data.py --users 100000 --properties 250000 [--seed 42] [--database sqlite:///capacity.db]
+
+Creates customers, sellers, properties across buy/rent/pg with their
+category-specific fields, images, payments, inquiries, favorites and OTP
+history. Rows are written with bulk INSERTs in batches on one connection.
+The same seed and counts always produce the same dataset, so performance
+work can be measured against identical data.
+
+Every generated account uses the password printed at the end.
+"""
+
+import argparse
+import os
+import random
+import time
+from array import array
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select, text
+
+from config import Config
+
+PASSWORD = 'Settle@123'
+
+CITIES = {
+    'Mumbai': ['Andheri West', 'Bandra West', 'Powai', 'Goregaon East', 'Malad West', 'Chembur', 'Thane West', 'Borivali'],
+    'Bangalore': ['Koramangala', 'Indiranagar', 'Whitefield', 'HSR Layout', 'Electronic City', 'Jayanagar', 'Hebbal'],
+    'Pune': ['Baner', 'Hinjewadi', 'Kothrud', 'Viman Nagar', 'Wakad', 'Kharadi', 'Aundh'],
+    'Delhi': ['Dwarka', 'Saket', 'Rohini', 'Lajpat Nagar', 'Vasant Kunj', 'Karol Bagh'],
+    'Hyderabad': ['Gachibowli', 'Madhapur', 'Kondapur', 'Banjara Hills', 'Kukatpally'],
+    'Chennai': ['Adyar', 'Velachery', 'Anna Nagar', 'OMR', 'T Nagar'],
+    'Kolkata': ['Salt Lake', 'New Town', 'Ballygunge', 'Behala']
+}
+LOCATIONS = [f'{area}, {city}' for city, areas in CITIES.items() for area in areas]
+
+FIRST_NAMES = ['Aarav', 'Vivaan', 'Aditya', 'Vihaan', 'Arjun', 'Sai', 'Reyansh', 'Ayaan', 'Krishna', 'Ishaan',
+               'Ananya', 'Diya', 'Aadhya', 'Saanvi', 'Pari', 'Anika', 'Navya', 'Myra', 'Sara', 'Priya',
+               'Rahul', 'Rohan', 'Neha', 'Pooja', 'Karan', 'Meera', 'Nikhil', 'Sneha', 'Vikram', 'Kavya']
+LAST_NAMES = ['Sharma', 'Verma', 'Patel', 'Iyer', 'Reddy', 'Nair', 'Gupta', 'Mehta', 'Menezes', 'Das',
+              'Singh', 'Kulkarni', 'Joshi', 'Rao', 'Chatterjee', 'Fernandes', 'Khan', 'Shah']
+
+PROPERTY_TYPES = {
+    'buy': ['apartment', 'house', 'villa', 'plot', 'office', 'shop'],
+    'rent': ['apartment', 'house', 'villa', 'office', 'shop', 'warehouse'],
+    'pg': ['pg', 'hostel']
+}
+AMENITIES = ['Parking', 'Gym', 'Swimming Pool', 'Lift', 'Power Backup', 'Security', 'Garden', 'Club House',
+             'WiFi', 'Air Conditioning', 'Laundry', 'CCTV', 'Play Area', 'Housekeeping', 'Meals']
+ADJECTIVES = ['Spacious', 'Sunny', 'Modern', 'Cozy', 'Premium', 'Well-lit', 'Renovated', 'Luxurious', 'Affordable']
+STATUSES = ['approved', 'pending', 'rejected']
+INQUIRY_MESSAGES = [
+    'Is this property still available? I would like to schedule a visit.',
+    'Can you share more details about the maintenance charges?',
+    'Is the price negotiable? I am looking to move in next month.',
+    'Are pets allowed in this property?',
+    'Could you tell me more about the neighbourhood and nearby schools?'
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--database', help='SQLAlchemy URI (defaults to the app configuration)')
+    parser.add_argument('--users', type=int, default=10000, help='customers + sellers')
+    parser.add_argument('--seller-ratio', type=float, default=0.1)
+    parser.add_argument('--properties', type=int, default=25000)
+    parser.add_argument('--images-per-property', type=int, default=3)
+    parser.add_argument('--inquiries', type=int, default=50000)
+    parser.add_argument('--favorites-per-customer', type=float, default=5.0, help='average')
+    parser.add_argument('--otps-per-user', type=float, default=2.0, help='average')
+    parser.add_argument('--image-pool', type=int, default=24, help='distinct JPEG files to write and reuse (0 = none)')
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--anchor-date', default='2025-01-01', help='latest timestamp in the dataset (YYYY-MM-DD)')
+    parser.add_argument('--reset', action='store_true', help='drop and recreate all tables first')
+    return parser.parse_args()
+
+
+class Generator:
+    def __init__(self, conn, args, tables):
+        self.conn = conn
+        self.args = args
+        self.tables = tables
+        self.rng = random.Random(args.seed)
+        self.anchor = datetime.strptime(args.anchor_date, '%Y-%m-%d')
+
+    def timestamp(self, max_days=730):
+        return self.anchor - timedelta(seconds=self.rng.randrange(max_days * 86400))
+
+    def next_id(self, table):
+        return (self.conn.execute(select(func.max(table.c.id))).scalar() or 0) + 1
+
+    def insert(self, name, rows):
+        """Consume a row generator in batches; returns the number of rows written"""
+        table = self.tables[name]
+        batch = []
+        written = 0
+        started = time.perf_counter()
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.args.batch_size:
+                self.conn.execute(table.insert(), batch)
+                self.conn.commit()
+                written += len(batch)
+                batch = []
+        if batch:
+            self.conn.execute(table.insert(), batch)
+            self.conn.commit()
+            written += len(batch)
+        elapsed = time.perf_counter() - started
+        rate = written / elapsed if elapsed else 0
+        print(f'  {name:<15} {written:>10,} rows  {elapsed:7.1f}s  {rate:>10,.0f} rows/s')
+        return written
+
+    def users(self, password_hash):
+        args = self.args
+        first_id = self.next_id(self.tables['user'])
+        seller_count = max(1, int(args.users * args.seller_ratio))
+        self.seller_ids = array('i', range(first_id, first_id + seller_count))
+        self.customer_ids = array('i', range(first_id + seller_count, first_id + args.users))
+
+        def rows():
+            for i in range(args.users):
+                user_id = first_id + i
+                is_seller = i < seller_count
+                name = f'{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}'
+                yield {
+                    'id': user_id,
+                    'name': name,
+                    'email': f'user{user_id}@synthetic.settlespace.com',
+                    'phone': f'{self.rng.choice("6789")}{user_id % 10 ** 9:09d}',
+                    'password_hash': password_hash,
+                    'role': 'seller' if is_seller else 'customer',
+                    'upi_id': f'user{user_id}@{self.rng.choice(["paytm", "gpay", "ybl", "oksbi"])}' if is_seller else None,
+                    'is_verified': self.rng.random() < 0.85,
+                    'created_at': self.timestamp(),
+                    'two_factor_enabled': self.rng.random() < 0.7,
+                    'two_factor_method': 'sms' if self.rng.random() < 0.2 else 'email'
+                }
+        return self.insert('user', rows())
+
+    def property_fields(self, category):
+        rng = self.rng
+        bedrooms = rng.choice([1, 1, 2, 2, 2, 3, 3, 4, 5])
+        fields = {
+            'category': category,
+            'property_type': rng.choice(PROPERTY_TYPES[category]),
+            'bedrooms': 1 if category == 'pg' else bedrooms,
+            'bathrooms': max(1, bedrooms - rng.randint(0, 1)),
+            'area': 150 + rng.randint(0, 250) if category == 'pg' else 350 + bedrooms * rng.randint(250, 500),
+            'sale_price': None, 'property_age': None, 'monthly_rent': None, 'security_deposit': None,
+            'furnishing_status': None, 'per_bed_price': None, 'gender_preference': None, 'meal_included': False
+        }
+        if category == 'buy':
+            price = int(fields['area'] * rng.randint(4000, 25000) / 1000) * 1000
+            fields.update(sale_price=price, property_age=rng.randint(0, 30))
+        elif category == 'rent':
+            price = int(fields['area'] * rng.randint(15, 80) / 500) * 500
+            fields.update(monthly_rent=price,
+                          security_deposit=price * rng.choice([2, 3, 6, 10]),
+                          furnishing_status=rng.choice(['fully', 'semi', 'unfurnished']))
+        else:
+            price = rng.randrange(4000, 25000, 500)
+            fields.update(per_bed_price=price,
+                          gender_preference=rng.choice(['male', 'female', 'coed']),
+                          meal_included=rng.random() < 0.6)
+        fields['price'] = max(price, 1000)
+        return fields
+
+    def properties(self):
+        from app.services.amenities import mask_for_bits, parse_amenities
+        from app.services.listing_costs import costs
+
+        args = self.args
+        first_id = self.next_id(self.tables['property'])
+        self.first_property_id = first_id
+        self.property_ids = array('i', range(first_id, first_id + args.properties))
+        # Indexed by property_id - first_id; compact enough for millions of listings
+        self.property_sellers = array('i')
+        self.property_status = bytearray()
+        self.property_amenity_masks = array('q')
+        self.approved_ids = array('i')
+
+        def rows():
+            for i in range(args.properties):
+                property_id = first_id + i
+                category = self.rng.choices(['buy', 'rent', 'pg'], weights=[4, 4, 2])[0]
+                fields = self.property_fields(category)
+                fields['monthly_cost'], fields['upfront_cost'] = costs(
+                    category, fields['price'], fields['sale_price'], fields['monthly_rent'],
+                    fields['security_deposit'], fields['per_bed_price'])
+                location = self.rng.choice(LOCATIONS)
+                seller_id = self.rng.choice(self.seller_ids)
+                status = self.rng.choices(STATUSES, weights=[80, 12, 8])[0]
+                created_at = self.timestamp()
+                self.property_sellers.append(seller_id)
+                self.property_status.append(STATUSES.index(status))
+                if status == 'approved':
+                    self.approved_ids.append(property_id)
+                amenities = self.rng.sample(AMENITIES, self.rng.randint(2, 7))
+                amenity_mask = mask_for_bits(parse_amenities(', '.join(amenities)))
+                self.property_amenity_masks.append(amenity_mask)
+                fields.update({
+                    'id': property_id,
+                    'title': f"{self.rng.choice(ADJECTIVES)} {fields['bedrooms']}BHK {fields['property_type']} in {location.split(',')[0]}",
+                    'description': (f"{self.rng.choice(ADJECTIVES)} {fields['property_type']} located in {location}. "
+                                    f"Close to schools, hospitals and public transport with {', '.join(amenities[:3]).lower()}. "
+                                    'Ideal for families and working professionals looking for a well connected neighbourhood.'),
+                    'location': location,
+                    'amenities': ', '.join(amenities),
+                    'amenity_mask': amenity_mask,
+                    'seller_id': seller_id,
+                    'status': status,
+                    'created_at': created_at,
+                    'approved_at': created_at + timedelta(days=self.rng.randint(0, 5)) if status == 'approved' else None,
+                    'is_featured': status == 'approved' and self.rng.random() < 0.03
+                })
+                yield fields
+        return self.insert('property', rows())
+
+    def property_amenities(self):
+        from app.services.amenities import VOCABULARY
+
+        known = self.next_id(self.tables['amenity']) - 1
+        self.insert('amenity', ({'id': bit + 1, 'slug': slug, 'name': name}
+                                for bit, (slug, name, _) in enumerate(VOCABULARY) if bit + 1 > known))
+
+        def rows():
+            for i, mask in enumerate(self.property_amenity_masks):
+                bit = 0
+                while mask:
+                    if mask & 1:
+                        yield {'property_id': self.first_property_id + i, 'amenity_id': bit + 1}
+                    mask >>= 1
+                    bit += 1
+        return self.insert('property_amenity', rows())
+
+    def images(self, image_files):
+        pool = image_files or ['synthetic_missing.jpg']
+
+        def rows():
+            for property_id in self.property_ids:
+                count = self.rng.randint(1, self.args.images_per_property) if self.args.images_per_property else 0
+                for position in range(count):
+                    yield {
+                        'property_id': property_id,
+                        'filename': self.rng.choice(pool),
+                        'is_primary': position == 0,
+                        'created_at': self.timestamp()
+                    }
+        return self.insert('property_image', rows())
+
+    def payments(self, screenshot_files):
+        pool = screenshot_files or ['synthetic_missing.jpg']
+
+        def rows():
+            for property_id, seller_id, status_code in zip(self.property_ids, self.property_sellers, self.property_status):
+                status = STATUSES[status_code]
+                # Most pending listings are still waiting for payment proof
+                if status == 'pending' and self.rng.random() < 0.5:
+                    continue
+                created_at = self.timestamp()
+                yield {
+                    'seller_id': seller_id,
+                    'property_id': property_id,
+                    'amount': Config.LISTING_FEE,
+                    'transaction_id': f'{self.rng.randrange(10 ** 11, 10 ** 12)}',
+                    'screenshot_filename': self.rng.choice(pool),
+                    'status': {'approved': 'verified', 'rejected': 'rejected'}.get(status, 'pending'),
+                    'created_at': created_at,
+                    'verified_at': created_at + timedelta(hours=self.rng.randint(1, 72)) if status == 'approved' else None
+                }
+        return self.insert('payment', rows())
+
+    def inquiries(self):
+        if not self.approved_ids or not self.customer_ids:
+            return 0
+
+        def rows():
+            for _ in range(self.args.inquiries):
+                property_id = self.rng.choice(self.approved_ids)
+                customer_id = self.rng.choice(self.customer_ids)
+                status = self.rng.choices(['open', 'responded', 'closed'], weights=[60, 30, 10])[0]
+                created_at = self.timestamp(365)
+                yield {
+                    'property_id': property_id,
+                    'customer_id': customer_id,
+                    'seller_id': self.property_sellers[property_id - self.first_property_id],
+                    'message': self.rng.choice(INQUIRY_MESSAGES),
+                    'customer_name': f'{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}',
+                    'customer_phone': f'9{self.rng.randrange(10 ** 9):09d}',
+                    'status': status,
+                    'created_at': created_at,
+                    # Sellers have opened everything they acted on and some of the rest
+                    'read_at': created_at + timedelta(hours=self.rng.randint(1, 48))
+                               if status != 'open' or self.rng.random() < 0.5 else None,
+                    # Historical data: digests already went out
+                    'notified_at': created_at + timedelta(minutes=15)
+                }
+        written = self.insert('inquiry', rows())
+
+        # Denormalized User.unread_inquiry_count for the generated sellers
+        self.conn.execute(text(
+            'UPDATE user SET unread_inquiry_count = '
+            '(SELECT COUNT(*) FROM inquiry WHERE inquiry.seller_id = user.id AND inquiry.read_at IS NULL) '
+            'WHERE id BETWEEN :first AND :last'
+        ), {'first': self.seller_ids[0], 'last': self.seller_ids[-1]})
+        self.conn.commit()
+        return written
+
+    def favorites(self):
+        if not self.approved_ids:
+            return 0
+        mean = self.args.favorites_per_customer
+
+        def rows():
+            for customer_id in self.customer_ids:
+                count = min(len(self.approved_ids), int(self.rng.expovariate(1 / mean)) if mean else 0)
+                for property_id in self.rng.sample(self.approved_ids, count):
+                    yield {'user_id': customer_id, 'property_id': property_id, 'created_at': self.timestamp(365)}
+        written = self.insert('favorite', rows())
+
+        # Denormalized Property.favorite_count for the generated listings
+        self.conn.execute(text(
+            'UPDATE property SET favorite_count = '
+            '(SELECT COUNT(*) FROM favorite WHERE favorite.property_id = property.id) '
+            'WHERE id BETWEEN :first AND :last'
+        ), {'first': self.property_ids[0], 'last': self.property_ids[-1]})
+        self.conn.commit()
+        return written
+
+    def otp_codes(self):
+        mean = self.args.otps_per_user
+        user_ids = list(self.seller_ids) + list(self.customer_ids)
+
+        def rows():
+            for user_id in user_ids:
+                count = int(self.rng.expovariate(1 / mean)) if mean else 0
+                for _ in range(count):
+                    created_at = self.timestamp(365)
+                    yield {
+                        'user_id': user_id,
+                        'code': f'{self.rng.randrange(10 ** 6):06d}',
+                        'method': 'email',
+                        'expires_at': created_at + timedelta(minutes=10),
+                        'used': self.rng.random() < 0.8,
+                        'created_at': created_at
+                    }
+        return self.insert('otp_code', rows())
+
+
+def write_image_pool(instance_path, count, seed):
+    """Write a small pool of real JPEGs that generated rows point at"""
+    if count <= 0:
+        return [], []
+    from PIL import Image, ImageDraw
+
+    rng = random.Random(seed)
+    property_dir = os.path.join(instance_path, 'uploads', 'properties')
+    payment_dir = os.path.join(instance_path, 'uploads', 'payments')
+    os.makedirs(property_dir, exist_ok=True)
+    os.makedirs(payment_dir, exist_ok=True)
+
+    property_files, payment_files = [], []
+    for i in range(count):
+        image = Image.new('RGB', (800, 600), tuple(rng.randint(60, 230) for _ in range(3)))
+        draw = ImageDraw.Draw(image)
+        for _ in range(6):
+            x, y = rng.randint(0, 700), rng.randint(0, 500)
+            draw.rectangle([x, y, x + rng.randint(40, 200), y + rng.randint(40, 200)],
+                           fill=tuple(rng.randint(0, 255) for _ in range(3)))
+        filename = f'synthetic_{i}.jpg'
+        image.save(os.path.join(property_dir, filename), quality=80)
+        property_files.append(filename)
+
+        screenshot = Image.new('RGB', (360, 640), (245, 245, 245))
+        ImageDraw.Draw(screenshot).text((20, 40), f'UPI payment #{i}', fill=(20, 20, 20))
+        filename = f'synthetic_payment_{i}.jpg'
+        screenshot.save(os.path.join(payment_dir, filename), quality=80)
+        payment_files.append(filename)
+    return property_files, payment_files
+
+
+def main():
+    args = parse_args()
+
+    from app import create_app, db
+    from app.models import User
+
+    config_class = Config
+    if args.database:
+        config_class = type('GeneratorConfig', (Config,), {'SQLALCHEMY_DATABASE_URI': args.database})
+    app = create_app(config_class)
+
+    with app.app_context():
+        if args.reset:
+            db.drop_all()
+        db.create_all()
+
+        template = User(name='x', email='x', phone='x')
+        template.set_password(PASSWORD)
+
+        print(f'Generating dataset (seed={args.seed}) into {db.engine.url}')
+        property_files, payment_files = write_image_pool(app.instance_path, args.image_pool, args.seed)
+
+        tables = db.metadata.tables
+        started = time.perf_counter()
+        with db.engine.connect() as conn:
+            if db.engine.dialect.name == 'sqlite':
+                # Bulk-load settings for this connection only
+                conn.execute(text('PRAGMA synchronous=OFF'))
+                conn.execute(text('PRAGMA cache_size=-200000'))
+                conn.commit()
+
+            generator = Generator(conn, args, tables)
+            generator.users(template.password_hash)
+            generator.properties()
+            generator.property_amenities()
+            generator.images(property_files)
+            generator.payments(payment_files)
+            generator.inquiries()
+            generator.favorites()
+            generator.otp_codes()
+
+        from app.services.price_rollups import rebuild
+        groups, _, seconds = rebuild()
+        print(f'  {"price_rollup":<15} {groups:>10,} rows  {seconds:7.1f}s')
+
+        print(f'\nDone in {time.perf_counter() - started:.1f}s. All generated accounts use the password: {PASSWORD}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,300 @@
+"""
+Delete user accounts and everything that depends on them, in bulk
+Usage: python purge_users.py [--ids 4,9] [--emails a@x.com,@emails.txt] [--phones @phones.txt]
+                             [--inactive-days 365] [--role customer|seller] [--dry-run] [--yes]
+
+Accounts are chosen by id, email or phone (comma-separated, or @file with one
+value per line), by inactivity, or both. If both are given, an account must
+match both. An account is inactive when it was created before the cutoff and
+has no OTP code, favorite, inquiry, property or payment since then. Admin
+accounts are never purged.
+
+Users are deleted in batches of --batch-size, each batch in one transaction.
+Each dependent table is cleared with one set-based DELETE per batch: OTP codes,
+favorites, inquiries, payments, and the sellers' properties with their images
+and amenity links, plus the duplicate-detection hash bands of those images and
+screenshots. Favorite counts of surviving listings and unread inquiry counters
+of surviving sellers are recounted. Uploaded images and payment screenshots
+that no remaining row references are then removed from instance/uploads by a
+thread pool while the next batch runs.
+
+--dry-run prints what would be deleted and changes nothing.
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, or_, select, union
+
+from config import Config
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database', help='SQLAlchemy URI (defaults to the app configuration)')
+    parser.add_argument('--ids', help='user ids, comma-separated or @file')
+    parser.add_argument('--emails', help='emails, comma-separated or @file')
+    parser.add_argument('--phones', help='phone numbers, comma-separated or @file')
+    parser.add_argument('--inactive-days', type=int, help='only accounts with no activity in this many days')
+    parser.add_argument('--role', choices=['customer', 'seller'])
+    parser.add_argument('--batch-size', type=int, default=500, help='users deleted per transaction')
+    parser.add_argument('--workers', type=int, default=8, help='threads removing uploaded files')
+    parser.add_argument('--dry-run', action='store_true', help='report what would be deleted and stop')
+    parser.add_argument('--yes', action='store_true', help='do not ask for confirmation')
+    args = parser.parse_args()
+    if not (args.ids or args.emails or args.phones or args.inactive_days is not None):
+        parser.error('choose accounts with --ids, --emails, --phones or --inactive-days')
+    return args
+
+
+def read_values(option):
+    """Values from 'a,b,c' or '@path' (one per line); both forms can be mixed"""
+    values = []
+    for part in (option or '').split(','):
+        part = part.strip()
+        if part.startswith('@'):
+            with open(part[1:]) as f:
+                values.extend(line.strip() for line in f if line.strip())
+        elif part:
+            values.append(part)
+    return values
+
+
+def chunks(values, size):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def select_user_ids(args):
+    """Sorted ids of the non-admin accounts matching the options"""
+    from app import db
+    from app.models import Favorite, Inquiry, OTPCode, Payment, Property, User
+
+    conditions = [User.role != 'admin']
+    if args.role:
+        conditions.append(User.role == args.role)
+    if args.inactive_days is not None:
+        cutoff = datetime.utcnow() - timedelta(days=args.inactive_days)
+        active = union(
+            select(OTPCode.user_id).where(OTPCode.created_at >= cutoff),
+            select(Favorite.user_id).where(Favorite.created_at >= cutoff),
+            select(Inquiry.customer_id).where(Inquiry.created_at >= cutoff),
+            select(Property.seller_id).where(Property.created_at >= cutoff),
+            select(Payment.seller_id).where(Payment.created_at >= cutoff),
+        )
+        conditions += [User.created_at < cutoff, User.id.not_in(active)]
+
+    lists = [(User.id, [int(value) for value in read_values(args.ids)]),
+             (User.email, [value.lower() for value in read_values(args.emails)]),  # stored lower-cased
+             (User.phone, read_values(args.phones))]
+    if not any(values for _, values in lists):
+        return sorted(db.session.execute(select(User.id).where(*conditions)).scalars())
+
+    # Resolve long lists a chunk at a time to stay under the bound parameter limit
+    ids = set()
+    for column, values in lists:
+        for chunk in chunks(values, 500):
+            ids.update(db.session.execute(select(User.id).where(column.in_(chunk), *conditions)).scalars())
+    return sorted(ids)
+
+
+def dependents(user_ids):
+    """(table, condition) for every row a batch of users owns, in deletion order"""
+    from app.models import (Favorite, ImageHashBand, Inquiry, OTPCode, Payment, Property, PropertyAmenity,
+                            PropertyImage, User)
+
+    properties = select(Property.id).where(Property.seller_id.in_(user_ids)).scalar_subquery()
+    payments = or_(Payment.seller_id.in_(user_ids), Payment.property_id.in_(properties))
+    images = select(PropertyImage.id).where(PropertyImage.property_id.in_(properties)).scalar_subquery()
+    return [
+        (OTPCode.__table__, OTPCode.user_id.in_(user_ids)),
+        (Favorite.__table__, or_(Favorite.user_id.in_(user_ids), Favorite.property_id.in_(properties))),
+        (Inquiry.__table__, or_(Inquiry.customer_id.in_(user_ids), Inquiry.seller_id.in_(user_ids),
+                                Inquiry.property_id.in_(properties))),
+        (ImageHashBand.__table__, or_(
+            (ImageHashBand.kind == 'payment') & ImageHashBand.ref_id.in_(select(Payment.id).where(payments)),
+            (ImageHashBand.kind == 'property') & ImageHashBand.ref_id.in_(images))),
+        (Payment.__table__, payments),
+        (PropertyImage.__table__, PropertyImage.property_id.in_(properties)),
+        (PropertyAmenity.__table__, PropertyAmenity.property_id.in_(properties)),
+        (Property.__table__, Property.seller_id.in_(user_ids)),
+        (User.__table__, User.id.in_(user_ids)),
+    ]
+
+
+def count_rows(user_ids):
+    from app import db
+
+    return {table.name: db.session.execute(select(func.count()).select_from(table).where(condition)).scalar()
+            for table, condition in dependents(user_ids)}
+
+
+def uploaded_files(user_ids):
+    """(folder, filename) of the images and screenshots a batch of users owns"""
+    from app import db
+    from app.models import Payment, Property, PropertyImage
+
+    properties = select(Property.id).where(Property.seller_id.in_(user_ids)).scalar_subquery()
+    images = db.session.execute(select(PropertyImage.filename).where(PropertyImage.property_id.in_(properties)))
+    screenshots = db.session.execute(select(Payment.screenshot_filename).where(
+        or_(Payment.seller_id.in_(user_ids), Payment.property_id.in_(properties))))
+    return ({('properties', name) for name in images.scalars()} |
+            {('payments', name) for name in screenshots.scalars()})
+
+
+def unreferenced(files):
+    """The files no remaining row points at (synthetic data shares one image pool between listings)"""
+    from app import db
+    from app.models import Payment, PropertyImage
+
+    columns = {'properties': PropertyImage.filename, 'payments': Payment.screenshot_filename}
+    in_use = set()
+    for folder, column in columns.items():
+        names = sorted(name for kind, name in files if kind == folder)
+        for chunk in chunks(names, 500):
+            in_use.update((folder, name) for name in
+                          db.session.execute(select(column).where(column.in_(chunk)).distinct()).scalars())
+    return files - in_use
+
+
+def purge_batch(user_ids):
+    """Delete a batch of users and their dependents in one transaction
+
+    Returns (rows deleted per table, files now unreferenced, sellers whose
+    unread counters were recounted, whether an approved listing was removed).
+    """
+    from app import db
+    from app.models import Favorite, Inquiry, Property, User
+
+    files = uploaded_files(user_ids)
+    properties = select(Property.id).where(Property.seller_id.in_(user_ids)).scalar_subquery()
+    # Surviving listings and sellers whose denormalized counters lose rows
+    favorited = select(Favorite.property_id).where(Favorite.user_id.in_(user_ids),
+                                                   Favorite.property_id.not_in(properties)).distinct()
+    favorited = db.session.execute(favorited).scalars().all()
+    sellers = select(Inquiry.seller_id).where(Inquiry.customer_id.in_(user_ids), Inquiry.read_at.is_(None),
+                                              Inquiry.seller_id.not_in(user_ids)).distinct()
+    sellers = db.session.execute(sellers).scalars().all()
+    rollups_stale = db.session.execute(
+        select(Property.id).where(Property.seller_id.in_(user_ids), Property.status == 'approved').limit(1)
+    ).first() is not None
+
+    deleted = {}
+    for table, condition in dependents(user_ids):
+        deleted[table.name] = db.session.execute(table.delete().where(condition)).rowcount
+
+    if favorited:
+        property_table = Property.__table__
+        recount = (select(func.count()).where(Favorite.property_id == property_table.c.id)
+                   .correlate(property_table).scalar_subquery())
+        db.session.execute(property_table.update().where(property_table.c.id.in_(favorited))
+                           .values(favorite_count=recount))
+    if sellers:
+        user_table = User.__table__
+        recount = (select(func.count()).where(Inquiry.seller_id == user_table.c.id, Inquiry.read_at.is_(None))
+                   .correlate(user_table).scalar_subquery())
+        db.session.execute(user_table.update().where(user_table.c.id.in_(sellers))
+                           .values(unread_inquiry_count=recount))
+    db.session.commit()
+    return deleted, unreferenced(files), sellers, rollups_stale
+
+
+def remove_file(path):
+    try:
+        os.remove(path)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def main():
+    args = parse_args()
+
+    from app import create_app, db
+    from app.models import User
+
+    config_class = Config
+    if args.database:
+        config_class = type('PurgeConfig', (Config,), {'SQLALCHEMY_DATABASE_URI': args.database})
+    app = create_app(config_class)
+
+    with app.app_context():
+        user_ids = select_user_ids(args)
+        if not user_ids:
+            print('No matching accounts.')
+            return
+        roles = {}
+        for chunk in chunks(user_ids, 500):
+            for role, count in db.session.execute(
+                    select(User.role, func.count()).where(User.id.in_(chunk)).group_by(User.role)):
+                roles[role] = roles.get(role, 0) + count
+        print(f"{len(user_ids):,} accounts selected from {db.engine.url}: "
+              + ', '.join(f'{count:,} {role}s' for role, count in sorted(roles.items())))
+
+        if args.dry_run:
+            totals = {}
+            file_count = 0
+            for batch in chunks(user_ids, args.batch_size):
+                for table, count in count_rows(batch).items():
+                    totals[table] = totals.get(table, 0) + count
+                file_count += len(uploaded_files(batch))
+            for table, count in totals.items():
+                print(f'  would delete {count:>10,} {table} rows')
+            print(f'  would check  {file_count:>10,} uploaded files (shared files are kept)')
+            print('Dry run: nothing was changed.')
+            return
+
+        if not args.yes:
+            confirm = input(f'\n⚠️  Permanently delete {len(user_ids):,} accounts and all their data? (yes/no): ')
+            if confirm.lower() != 'yes':
+                print('Purge cancelled.')
+                return
+
+        from app.services.page_cache import page_cache, LISTINGS_TAG, USERS_TAG
+        from app.services.user_cache import user_cache
+
+        started = time.perf_counter()
+        upload_dir = os.path.join(app.instance_path, 'uploads')
+        totals = {}
+        sellers_touched = set()
+        rollups_stale = False
+        futures = []
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            for number, batch in enumerate(chunks(user_ids, args.batch_size), 1):
+                deleted, files, sellers, stale = purge_batch(batch)
+                for table, count in deleted.items():
+                    totals[table] = totals.get(table, 0) + count
+                sellers_touched.update(sellers)
+                rollups_stale = rollups_stale or stale
+                # Files go in the background while the next batch is deleted
+                futures.extend(pool.submit(remove_file, os.path.join(upload_dir, folder, name))
+                               for folder, name in files)
+                for user_id in batch:
+                    user_cache.invalidate(user_id)
+                print(f'  batch {number}: {deleted["user"]:,} accounts, {deleted["property"]:,} properties, '
+                      f'{len(files):,} files queued')
+            removed = sum(future.result() for future in futures)
+
+        for user_id in sellers_touched:
+            user_cache.invalidate(user_id)
+        stale_tags = [USERS_TAG]
+        if totals.get('property'):
+            if rollups_stale:
+                from app.services.price_rollups import rebuild
+                rebuild()
+            stale_tags.append(LISTINGS_TAG)
+        if not page_cache.invalidate(*stale_tags):
+            print(f'⚠️  Page cache not invalidated (PAGE_CACHE_REDIS_URL is not set); running servers show '
+                  f'the old pages for up to {page_cache.ttl}s')
+
+        for table, count in totals.items():
+            print(f'✓ Deleted {count:>10,} {table} rows')
+        print(f'✓ Removed {removed:>10,} uploaded files ({len(futures) - removed:,} already missing)')
+        print(f'\n✅ Purged {totals["user"]:,} accounts in {time.perf_counter() - started:.1f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,232 @@
+# upgrade_db.py - Run this to bring an existing database up to the current schema
+"""
+Usage: python upgrade_db.py [--database instance/settle_space.db] [--status]
+                            [--batch-size 1000] [--pause 0.05] [--max-batch-seconds 0.25]
+
+Applies the pending MIGRATIONS with app.migrations.MigrationRunner. It is
+safe against a live database: schema changes are short, and backfills
+commit in small throttled batches with checkpoints. An interrupted run
+resumes where it stopped. Append new migrations to the end of MIGRATIONS
+and never rename applied ones.
+"""
+import argparse
+import os
+
+from app.migrations import AddColumn, Backfill, Execute, Migration, MigrationRunner
+
+DEFAULT_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'settle_space.db')
+
+
+def backfill_favorite_counts(cursor, after_id, up_to_id):
+    # One grouped pass over favorite per batch; the column default already covers unfavorited listings
+    cursor.execute("""
+        SELECT COUNT(*), property_id FROM favorite WHERE property_id > ? AND property_id <= ? GROUP BY property_id
+    """, (after_id, up_to_id))
+    cursor.executemany("UPDATE property SET favorite_count = ? WHERE id = ?", cursor.fetchall())
+
+
+def backfill_unread_inquiry_counts(cursor, after_id, up_to_id):
+    cursor.execute("""
+        SELECT COUNT(*), seller_id FROM inquiry
+        WHERE seller_id > ? AND seller_id <= ? AND read_at IS NULL GROUP BY seller_id
+    """, (after_id, up_to_id))
+    cursor.executemany("UPDATE user SET unread_inquiry_count = ? WHERE id = ?", cursor.fetchall())
+
+
+def backfill_amenity_tags(cursor, after_id, up_to_id):
+    """Parse the free-text amenities of one batch into masks and property_amenity rows"""
+    from app.services.amenities import mask_for_bits, parse_amenities
+
+    cursor.execute("""
+        SELECT id, amenities FROM property
+        WHERE id > ? AND id <= ? AND amenities IS NOT NULL AND amenities != ''
+    """, (after_id, up_to_id))
+    masks = []
+    links = []
+    for property_id, amenities in cursor.fetchall():
+        bits = parse_amenities(amenities)
+        masks.append((mask_for_bits(bits), property_id))
+        links.extend((property_id, bit + 1) for bit in bits)
+    cursor.executemany("UPDATE property SET amenity_mask = ? WHERE id = ?", masks)
+    cursor.executemany("INSERT OR IGNORE INTO property_amenity (property_id, amenity_id) VALUES (?, ?)", links)
+
+
+def backfill_listing_costs(cursor, after_id, up_to_id):
+    from app.services.listing_costs import costs
+
+    cursor.execute("""
+        SELECT id, category, price, sale_price, monthly_rent, security_deposit, per_bed_price
+        FROM property WHERE id > ? AND id <= ?
+    """, (after_id, up_to_id))
+    cursor.executemany("UPDATE property SET monthly_cost = ?, upfront_cost = ? WHERE id = ?",
+                       [costs(*row[1:]) + (row[0],) for row in cursor.fetchall()])
+
+
+def amenity_vocabulary():
+    from app.services.amenities import VOCABULARY
+
+    return [(bit + 1, slug, name) for bit, (slug, name, _) in enumerate(VOCABULARY)]
+
+
+MIGRATIONS = [
+    # Formerly migrate_2fa.py
+    Migration('add_two_factor', 'User 2FA settings and the otp_code table', [
+        AddColumn('user', 'two_factor_enabled', 'BOOLEAN DEFAULT 0'),
+        AddColumn('user', 'two_factor_method', "VARCHAR(10) DEFAULT 'email'"),
+        Execute("""
+            CREATE TABLE IF NOT EXISTS otp_code (
+                id INTEGER NOT NULL PRIMARY KEY,
+                user_id INTEGER NOT NULL REFERENCES user (id),
+                code VARCHAR(6) NOT NULL,
+                method VARCHAR(10) NOT NULL,
+                expires_at DATETIME NOT NULL,
+                used BOOLEAN,
+                created_at DATETIME
+            )
+        """),
+        Execute("CREATE INDEX IF NOT EXISTS idx_otp_user_id ON otp_code(user_id)"),
+        Execute("CREATE INDEX IF NOT EXISTS idx_otp_expires_at ON otp_code(expires_at)"),
+    ]),
+    Migration('add_property_favorite_count', 'Property.favorite_count + index, counted from the favorite table', [
+        AddColumn('property', 'favorite_count', 'INTEGER NOT NULL DEFAULT 0'),
+        Backfill('property', backfill_favorite_counts, when_added=('property', 'favorite_count')),
+        Execute("CREATE INDEX IF NOT EXISTS ix_property_status_favorite_count ON property(status, favorite_count)"),
+    ]),
+    Migration('add_inquiry_inbox', 'Inquiry.read_at, User.unread_inquiry_count and the inbox indexes', [
+        AddColumn('inquiry', 'read_at', 'DATETIME'),
+        # Anything the seller already acted on counts as read
+        Backfill('inquiry', "UPDATE inquiry SET read_at = created_at WHERE status != 'open' AND id > ? AND id <= ?",
+                 when_added=('inquiry', 'read_at')),
+        AddColumn('user', 'unread_inquiry_count', 'INTEGER NOT NULL DEFAULT 0'),
+        Backfill('user', backfill_unread_inquiry_counts, when_added=('user', 'unread_inquiry_count')),
+        Execute("CREATE INDEX IF NOT EXISTS ix_inquiry_seller_created ON inquiry(seller_id, created_at)"),
+        Execute("CREATE INDEX IF NOT EXISTS ix_inquiry_seller_status_created ON inquiry(seller_id, status, created_at)"),
+        Execute("CREATE INDEX IF NOT EXISTS ix_inquiry_seller_property_created "
+                "ON inquiry(seller_id, property_id, created_at)"),
+        Execute("CREATE INDEX IF NOT EXISTS ix_inquiry_customer_created ON inquiry(customer_id, created_at)"),
+    ]),
+    Migration('add_inquiry_digest_state', 'Inquiry digest delivery columns; existing inquiries count as notified', [
+        AddColumn('inquiry', 'notified_at', 'DATETIME'),
+        Backfill('inquiry', "UPDATE inquiry SET notified_at = created_at WHERE id > ? AND id <= ?",
+                 when_added=('inquiry', 'notified_at')),
+        AddColumn('inquiry', 'notify_token', 'VARCHAR(32)'),
+        AddColumn('inquiry', 'notify_claimed_at', 'DATETIME'),
+        Execute("CREATE INDEX IF NOT EXISTS ix_inquiry_notified ON inquiry(notified_at, id)"),
+    ]),
+    Migration('add_price_rollups', 'PriceRollup table (fill it with `flask --app run rebuild-price-rollups`)', [
+        Execute("""
+            CREATE TABLE IF NOT EXISTS price_rollup (
+                id INTEGER NOT NULL PRIMARY KEY,
+                location VARCHAR(200) NOT NULL,
+                category VARCHAR(20) NOT NULL,
+                property_type VARCHAR(50) NOT NULL,
+                listing_count INTEGER NOT NULL,
+                price_mean FLOAT,
+                price_median FLOAT,
+                price_p25 FLOAT,
+                price_p75 FLOAT,
+                price_p90 FLOAT,
+                ppsf_mean FLOAT,
+                ppsf_median FLOAT,
+                ppsf_p25 FLOAT,
+                ppsf_p75 FLOAT,
+                ppsf_p90 FLOAT,
+                updated_at DATETIME,
+                CONSTRAINT unique_price_rollup_group UNIQUE (location, category, property_type)
+            )
+        """),
+        Execute("CREATE INDEX IF NOT EXISTS ix_price_rollup_listing_count ON price_rollup(listing_count)"),
+        Execute("CREATE INDEX IF NOT EXISTS ix_property_category_type_status "
+                "ON property(category, property_type, status)"),
+    ]),
+    Migration('add_amenity_tags', 'Amenity vocabulary, property_amenity and Property.amenity_mask from the free text', [
+        Execute("""
+            CREATE TABLE IF NOT EXISTS amenity (
+                id INTEGER NOT NULL PRIMARY KEY,
+                slug VARCHAR(50) NOT NULL UNIQUE,
+                name VARCHAR(50) NOT NULL
+            )
+        """),
+        Execute("INSERT OR IGNORE INTO amenity (id, slug, name) VALUES (?, ?, ?)", amenity_vocabulary()),
+        Execute("""
+            CREATE TABLE IF NOT EXISTS property_amenity (
+                property_id INTEGER NOT NULL REFERENCES property (id),
+                amenity_id INTEGER NOT NULL REFERENCES amenity (id),
+                PRIMARY KEY (property_id, amenity_id)
+            )
+        """),
+        Execute("CREATE INDEX IF NOT EXISTS ix_property_amenity_amenity ON property_amenity(amenity_id, property_id)"),
+        AddColumn('property', 'amenity_mask', 'BIGINT NOT NULL DEFAULT 0'),
+        Backfill('property', backfill_amenity_tags, when_added=('property', 'amenity_mask')),
+    ]),
+    Migration('add_listing_costs', 'Property.monthly_cost/upfront_cost and their indexes', [
+        AddColumn('property', 'monthly_cost', 'INTEGER'),
+        AddColumn('property', 'upfront_cost', 'INTEGER'),
+        Backfill('property', backfill_listing_costs, when_added=('property', 'monthly_cost')),
+        # Built after the backfill so each index is written once
+        Execute("CREATE INDEX IF NOT EXISTS ix_property_status_monthly_cost ON property(status, monthly_cost)"),
+        Execute("CREATE INDEX IF NOT EXISTS ix_property_status_upfront_cost ON property(status, upfront_cost)"),
+    ]),
+    # Hashing means decoding every stored file, so it runs outside the migration
+    Migration('add_image_hashes', 'Perceptual hash columns and image_hash_band (fill them with '
+              '`flask --app run index-image-hashes`)', [
+        AddColumn('property_image', 'phash', 'BIGINT'),
+        AddColumn('payment', 'screenshot_phash', 'BIGINT'),
+        Execute("""
+            CREATE TABLE IF NOT EXISTS image_hash_band (
+                kind VARCHAR(10) NOT NULL,
+                band INTEGER NOT NULL,
+                value INTEGER NOT NULL,
+                ref_id INTEGER NOT NULL,
+                PRIMARY KEY (kind, band, value, ref_id)
+            )
+        """),
+        Execute("CREATE INDEX IF NOT EXISTS ix_image_hash_band_ref ON image_hash_band(kind, ref_id)"),
+    ]),
+]
+
+
+def upgrade_database(db_path, **options):
+    if not os.path.exists(db_path):
+        print(f"Database not found at: {db_path}")
+        return False
+
+    runner = MigrationRunner(db_path, **options)
+    try:
+        applied = runner.run(MIGRATIONS)
+        print(f"\n✅ Database upgrade completed successfully! ({len(applied)} migrations applied)")
+        return True
+    except Exception as e:
+        print(f"❌ Upgrade failed: {str(e)}")
+        print("Completed batches are kept; run the upgrade again to resume.")
+        return False
+    finally:
+        runner.close()
+
+
+def print_status(db_path):
+    if not os.path.exists(db_path):
+        print(f"Database not found at: {db_path}")
+        return False
+    runner = MigrationRunner(db_path)
+    try:
+        for name, state in runner.status(MIGRATIONS):
+            print(f"  {name:<30} {state}")
+        return True
+    finally:
+        runner.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Bring an existing SQLite database up to the current schema')
+    parser.add_argument('--database', default=DEFAULT_DB)
+    parser.add_argument('--status', action='store_true', help='list applied and pending migrations and stop')
+    parser.add_argument('--batch-size', type=int, default=1000, help='largest backfill batch (rows per transaction)')
+    parser.add_argument('--pause', type=float, default=0.05, help='seconds to sleep between backfill batches')
+    parser.add_argument('--max-batch-seconds', type=float, default=0.25,
+                        help='halve the batch size when a batch holds the write lock longer than this')
+    args = parser.parse_args()
+    if args.status:
+        raise SystemExit(0 if print_status(args.database) else 1)
+    raise SystemExit(0 if upgrade_database(args.database, batch_size=args.batch_size, pause=args.pause,
+                                           max_batch_seconds=args.max_batch_seconds) else 1)